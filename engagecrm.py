@@ -1,25 +1,4491 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
-from ttkthemes import ThemedTk
-from tkcalendar import DateEntry
-from datetime import datetime
+from datetime import datetime, timedelta
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import configparser
+import contextlib
+import csv
+import difflib
+import functools
+import gzip
+import itertools
+import json
+import marshal
+import math
 import sqlite3
 import os
-import pandas as pd
+import pathlib
+import queue
+import re
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import tracemalloc
+import urllib.parse
+import zipfile
+import zlib
+
+
+def load_gui():
+    """Import the Tk toolkit; headless commands never call this"""
+    global tk, ttk, messagebox, filedialog, ThemedTk, DateEntry
+    import tkinter as tk
+    from tkinter import ttk, messagebox, filedialog
+    from ttkthemes import ThemedTk
+    from tkcalendar import DateEntry
+
+
+# Settings file read at startup, next to this script unless --config is
+# given; relative paths in it are relative to the file itself
+CONFIG_FILENAME = 'engagecrm.ini'
+DEFAULT_CONFIG = {
+    'database': {
+        'path': 'engagement_tracker.db',
+        'recent': '',
+    },
+    # Connection tuning applied to every database opened
+    'pragmas': {
+        'cache_size': '-32000',
+        'mmap_size': '268435456',
+        'synchronous': 'NORMAL',
+        'temp_store': 'MEMORY',
+        'busy_timeout': '5000',
+    },
+    # Named databases offered by the workspace switcher: name = path
+    'workspaces': {},
+}
+
+# Pragmas the [pragmas] section may set
+TUNING_PRAGMAS = {
+    'cache_size', 'mmap_size', 'synchronous', 'temp_store', 'busy_timeout',
+    'wal_autocheckpoint', 'journal_size_limit',
+}
+
+# Recently used databases remembered, and how many stay open for instant
+# switching
+RECENT_WORKSPACES = 8
+WARM_WORKSPACES = 3
+
+
+def default_config_path():
+    """Return the engagecrm.ini next to this script"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), CONFIG_FILENAME)
+
+
+def load_config(path=None):
+    """Read the settings file over the defaults
+
+    A missing file is not an error; the defaults are used and the file is
+    only written once something (the recent workspaces) is saved.
+    """
+    config = configparser.ConfigParser()
+    # Keep workspace names as typed
+    config.optionxform = str
+    config.read_dict(DEFAULT_CONFIG)
+    config.path = os.path.abspath(path or default_config_path())
+    config.read(config.path, encoding='utf-8')
+    return config
+
+
+def save_config(config):
+    """Write the settings back to the file they were read from"""
+    with open(config.path, 'w', encoding='utf-8') as f:
+        config.write(f)
+
+
+def config_relative_path(config, path):
+    """Resolve a path from the settings file against the file's folder"""
+    path = os.path.expanduser(path)
+    return os.path.abspath(os.path.join(os.path.dirname(config.path), path))
+
+
+def configured_database(config, override=None):
+    """Return the database path from the command line or the settings"""
+    if override:
+        return os.path.abspath(override)
+    return config_relative_path(config, config['database']['path'])
+
+
+def read_only_uri(path):
+    """Return an SQLite URI opening a database file read-only
+
+    The path is percent-encoded, so '#', '?' and '%' in it are not taken
+    for the URI's fragment or query.
+    """
+    return pathlib.Path(path).resolve().as_uri() + '?mode=ro'
+
+
+def apply_pragmas(conn, config):
+    """Apply the [pragmas] tuning settings to a connection"""
+    cursor = conn.cursor()
+    for name, value in config['pragmas'].items():
+        if name not in TUNING_PRAGMAS:
+            raise ValueError(f"Unsupported pragma in {CONFIG_FILENAME}: {name}")
+        if not re.fullmatch(r'-?\w+', value):
+            raise ValueError(f"Invalid value for pragma {name}: {value!r}")
+        cursor.execute(f"PRAGMA {name}={value}")
+
+
+def recent_workspaces(config):
+    """Return the recently used database paths, most recent first"""
+    return [
+        line.strip() for line in config['database']['recent'].splitlines()
+        if line.strip()
+    ]
+
+
+def remember_workspace(config, db_path):
+    """Move a database to the front of the recent list and save it"""
+    recent = [db_path] + [
+        path for path in recent_workspaces(config) if path != db_path
+    ]
+    config['database']['recent'] = '\n'.join(recent[:RECENT_WORKSPACES])
+    try:
+        save_config(config)
+    except OSError:
+        # A read-only install still works, it just forgets the list
+        pass
+
+
+def workspace_choices(config):
+    """Return {label: path} for the named and recent workspaces"""
+    choices = {}
+    for name, path in config['workspaces'].items():
+        choices[name] = config_relative_path(config, path)
+    for path in recent_workspaces(config):
+        if path not in choices.values():
+            choices[path] = path
+    return choices
+
+
+# Archived engagements live in one SQLite file per calendar year
+ARCHIVE_DIRNAME = 'archive'
+
+# SQLite refuses more than 10 attached databases by default; one is left
+# for the report window compute_reports() shares between its workers
+MAX_ATTACHED_ARCHIVES = 9
+
+# Tables moved into the yearly archive files, parent first, with the
+# column linking each row to its engagement and the columns copied
+ARCHIVED_TABLES = {
+    'engagements': ('id', (
+        'id', 'date_time', 'type_id', 'unit_id', 'project_id',
+        'summary', 'status_id', 'action_items'
+    )),
+    'engagement_participants': ('engagement_id', (
+        'engagement_id', 'researcher_id'
+    )),
+    'action_items': ('engagement_id', (
+        'id', 'engagement_id', 'line', 'description', 'owner_id',
+        'due_date', 'status'
+    )),
+}
+
+
+def archive_path(db_path, year):
+    """Return the archive file holding one year of engagements"""
+    base = os.path.splitext(os.path.basename(db_path))[0]
+    return os.path.join(
+        os.path.dirname(db_path),
+        ARCHIVE_DIRNAME,
+        f"{base}_{year}.db"
+    )
+
+
+def list_archive_years(db_path):
+    """Return the years that have an archive file, oldest first"""
+    folder = os.path.join(os.path.dirname(db_path), ARCHIVE_DIRNAME)
+    if not os.path.isdir(folder):
+        return []
+
+    base = os.path.splitext(os.path.basename(db_path))[0]
+    pattern = re.compile(rf"^{re.escape(base)}_(\d{{4}})\.db$")
+    years = []
+    for filename in os.listdir(folder):
+        match = pattern.match(filename)
+        if match:
+            years.append(int(match.group(1)))
+    return sorted(years)
+
+
+def create_archive_tables(cursor, schema):
+    """Create the archive copies of the engagement tables in a schema"""
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {schema}.engagements (
+            id INTEGER PRIMARY KEY,
+            date_time DATE NOT NULL,
+            type_id INTEGER,
+            unit_id INTEGER,
+            project_id INTEGER,
+            summary TEXT,
+            status_id INTEGER,
+            action_items TEXT
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {schema}.engagement_participants (
+            engagement_id INTEGER,
+            researcher_id INTEGER,
+            PRIMARY KEY (engagement_id, researcher_id)
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {schema}.action_items (
+            id INTEGER PRIMARY KEY,
+            engagement_id INTEGER NOT NULL,
+            line INTEGER NOT NULL,
+            description TEXT NOT NULL,
+            owner_id INTEGER,
+            due_date DATE,
+            status TEXT NOT NULL
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS {schema}.idx_engagements_date_time
+        ON engagements (date_time)
+    ''')
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS {schema}.idx_engagements_unit_date
+        ON engagements (unit_id, date_time)
+    ''')
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS {schema}.idx_engagements_project_date
+        ON engagements (project_id, date_time)
+    ''')
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS {schema}.idx_action_items_engagement
+        ON action_items (engagement_id)
+    ''')
+    # Global search keeps finding engagements once they are archived
+    if create_fts_table(cursor, schema, 'engagements'):
+        cursor.execute(
+            f"INSERT INTO {schema}.engagements_fts (engagements_fts) "
+            "VALUES ('rebuild')"
+        )
+
+
+def create_archive_views(cursor, schemas):
+    """(Re)create the UNION views over the hot tables and attached archives
+
+    The views are TEMP because a view stored in the main database may not
+    reference other attached databases.
+    """
+    for table, (_, columns) in ARCHIVED_TABLES.items():
+        column_list = ', '.join(columns)
+        selects = [f"SELECT {column_list} FROM main.{table}"]
+        for schema in schemas:
+            selects.append(f"SELECT {column_list} FROM {schema}.{table}")
+
+        cursor.execute(f"DROP VIEW IF EXISTS temp.all_{table}")
+        union = " UNION ALL ".join(selects)
+        cursor.execute(f"CREATE TEMP VIEW all_{table} AS {union}")
+
+
+def attach_archives(conn, db_path, start_date=None, end_date=None):
+    """Attach the archive years overlapping a date range
+
+    Archives outside the range are detached so reports never pay for years
+    they do not ask about. Returns the list of attached years.
+    """
+    first_year = start_date.year if start_date else 0
+    last_year = end_date.year if end_date else 9999
+    years = [
+        year for year in list_archive_years(db_path)
+        if first_year <= year <= last_year
+    ]
+    if len(years) > MAX_ATTACHED_ARCHIVES:
+        raise ValueError(
+            f"The selected period spans {len(years)} archived years; "
+            f"at most {MAX_ATTACHED_ARCHIVES} can be reported at once."
+        )
+
+    # ATTACH and DETACH are not allowed inside a transaction
+    conn.commit()
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA database_list")
+    attached = {
+        row[1] for row in cursor.fetchall()
+        if row[1].startswith('archive_')
+    }
+    wanted = {f"archive_{year}" for year in years}
+
+    # Drop the views first so no view points at a database being detached
+    create_archive_views(cursor, [])
+    for schema in attached - wanted:
+        cursor.execute(f"DETACH DATABASE {schema}")
+    for year in years:
+        schema = f"archive_{year}"
+        if schema not in attached:
+            cursor.execute(
+                f"ATTACH DATABASE ? AS {schema}",
+                (archive_path(db_path, year),)
+            )
+
+    create_archive_views(cursor, [f"archive_{year}" for year in years])
+    return years
+
+
+def detach_archives(conn):
+    """Detach every archive and point the views back at the hot tables"""
+    conn.commit()
+    cursor = conn.cursor()
+    create_archive_views(cursor, [])
+    cursor.execute("PRAGMA database_list")
+    for row in cursor.fetchall():
+        if row[1].startswith('archive_'):
+            cursor.execute(f"DETACH DATABASE {row[1]}")
+
+
+def archive_engagements(conn, db_path, cutoff_date):
+    """Move engagements dated before the cutoff into yearly archive files
+
+    Each year is copied and removed from the hot tables in one
+    transaction. Returns a dict of year to number of engagements moved.
+    """
+    cutoff = cutoff_date.strftime('%Y-%m-%d')
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT DISTINCT substr(date_time, 1, 4)
+        FROM engagements
+        WHERE date_time < ?
+    ''', (cutoff,))
+    years = sorted(int(row[0]) for row in cursor.fetchall())
+
+    os.makedirs(
+        os.path.join(os.path.dirname(db_path), ARCHIVE_DIRNAME),
+        exist_ok=True
+    )
+
+    # Reports re-attach whatever they need afterwards
+    detach_archives(conn)
+
+    moved = {}
+    for year in years:
+        schema = f"archive_{year}"
+        year_start = f"{year}-01-01"
+        year_end = min(f"{year + 1}-01-01", cutoff)
+
+        cursor.execute(
+            f"ATTACH DATABASE ? AS {schema}",
+            (archive_path(db_path, year),)
+        )
+        try:
+            create_archive_tables(cursor, schema)
+            conn.commit()
+
+            with conn:
+                cursor.execute('''
+                    CREATE TEMP TABLE IF NOT EXISTS archive_batch (
+                        id INTEGER PRIMARY KEY
+                    )
+                ''')
+                cursor.execute("DELETE FROM temp.archive_batch")
+                cursor.execute('''
+                    INSERT INTO temp.archive_batch (id)
+                    SELECT id FROM main.engagements
+                    WHERE date_time >= ? AND date_time < ?
+                ''', (year_start, year_end))
+                
+                # Archived weeks keep their counts in weekly_rollup
+                cursor.execute('''
+                    CREATE TEMP TABLE IF NOT EXISTS rollup_snapshot AS
+                    SELECT * FROM main.weekly_rollup WHERE 0
+                ''')
+                cursor.execute("DELETE FROM temp.rollup_snapshot")
+                cursor.execute(f'''
+                    INSERT INTO temp.rollup_snapshot
+                    SELECT * FROM main.weekly_rollup
+                    WHERE week_start >= {WEEK_START_SQL.format('?')}
+                        AND week_start < ?
+                ''', (year_start, year_end))
+
+                for table, (key, columns) in ARCHIVED_TABLES.items():
+                    column_list = ', '.join(columns)
+                    cursor.execute(f'''
+                        INSERT OR REPLACE INTO {schema}.{table} ({column_list})
+                        SELECT {column_list} FROM main.{table}
+                        WHERE {key} IN (SELECT id FROM temp.archive_batch)
+                    ''')
+
+                # Index the year as it now stands, replaced rows included
+                cursor.execute(
+                    f"INSERT INTO {schema}.engagements_fts (engagements_fts) "
+                    "VALUES ('rebuild')"
+                )
+
+                # Children first so nothing is left pointing at a moved row
+                for table in reversed(list(ARCHIVED_TABLES)):
+                    key = ARCHIVED_TABLES[table][0]
+                    cursor.execute(f'''
+                        DELETE FROM main.{table}
+                        WHERE {key} IN (SELECT id FROM temp.archive_batch)
+                    ''')
+                moved[year] = cursor.rowcount
+
+                cursor.execute('''
+                    INSERT OR REPLACE INTO main.weekly_rollup
+                    SELECT * FROM temp.rollup_snapshot
+                ''')
+                cursor.execute("DELETE FROM temp.rollup_snapshot")
+                cursor.execute("DELETE FROM temp.archive_batch")
+        finally:
+            conn.commit()
+            cursor.execute(f"DETACH DATABASE {schema}")
+
+    return moved
+
+
+# Online backups are written here, next to the database
+BACKUP_DIRNAME = 'backups'
+
+# Snapshot schedule and how gently each snapshot copies pages
+BACKUP_INTERVAL_SECONDS = 4 * 60 * 60
+BACKUP_KEEP = 10
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_SLEEP = 0.05
+
+
+def list_backups(db_path):
+    """Return the completed snapshots of a database, oldest first"""
+    folder = os.path.join(os.path.dirname(db_path), BACKUP_DIRNAME)
+    if not os.path.isdir(folder):
+        return []
+
+    base = os.path.splitext(os.path.basename(db_path))[0]
+    pattern = re.compile(rf"^{re.escape(base)}_\d{{8}}_\d{{6}}\.db$")
+    return sorted(
+        os.path.join(folder, filename)
+        for filename in os.listdir(folder)
+        if pattern.match(filename)
+    )
+
+
+def backup_database(db_path, pages=BACKUP_PAGES_PER_STEP,
+                    sleep=BACKUP_STEP_SLEEP, progress=None):
+    """Take an online snapshot of the database and verify it
+
+    Pages are copied a bounded number at a time with a pause in between,
+    so other connections can keep writing while the snapshot is taken.
+    Returns the snapshot path; raises sqlite3.DatabaseError if the copy
+    fails PRAGMA integrity_check.
+    """
+    folder = os.path.join(os.path.dirname(db_path), BACKUP_DIRNAME)
+    os.makedirs(folder, exist_ok=True)
+
+    base = os.path.splitext(os.path.basename(db_path))[0]
+    target = os.path.join(folder, f"{base}_{datetime.now():%Y%m%d_%H%M%S}.db")
+    partial = target + '.partial'
+
+    # The backup runs on its own connections so it can leave the UI thread
+    source = sqlite3.connect(db_path, isolation_level=None)
+    dest = sqlite3.connect(partial)
+    try:
+        # Pin one WAL read snapshot for the whole copy; otherwise every
+        # commit from the app would restart the backup from page one
+        source.execute("BEGIN")
+        source.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        
+        # sqlite3 only sleeps between steps when one comes back busy, which
+        # a pinned snapshot never does, so the pause is taken here
+        def step_done(status, remaining, total):
+            if progress:
+                progress(status, remaining, total)
+            if remaining:
+                time.sleep(sleep)
+        
+        source.backup(dest, pages=pages, progress=step_done, sleep=sleep)
+        source.execute("COMMIT")
+        result = dest.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        dest.close()
+        source.close()
+
+    if result != 'ok':
+        os.remove(partial)
+        raise sqlite3.DatabaseError(f"Backup failed integrity check: {result}")
+
+    os.replace(partial, target)
+    return target
+
+
+def rotate_backups(db_path, keep=BACKUP_KEEP):
+    """Delete all but the newest snapshots and any abandoned partial copies"""
+    folder = os.path.join(os.path.dirname(db_path), BACKUP_DIRNAME)
+    if not os.path.isdir(folder):
+        return []
+
+    removed = list_backups(db_path)[:-keep] if keep else []
+    for filename in os.listdir(folder):
+        if filename.endswith('.db.partial'):
+            removed.append(os.path.join(folder, filename))
+
+    for path in removed:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return removed
+
+
+class BackupScheduler(threading.Thread):
+    """Background thread taking a rotated online backup on a schedule
+
+    Results are handed to ``on_complete`` as ``(path, error)`` from the
+    worker thread; GUI callers should queue them for the Tk loop.
+    """
+
+    def __init__(self, db_path, on_complete=None,
+                 interval=BACKUP_INTERVAL_SECONDS, keep=BACKUP_KEEP):
+        super().__init__(name='backup-scheduler', daemon=True)
+        self.db_path = db_path
+        self.on_complete = on_complete
+        self.interval = interval
+        self.keep = keep
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+    def backup_now(self):
+        """Ask for a snapshot without waiting for the next interval"""
+        self._wake.set()
+
+    def stop(self):
+        """Stop the scheduler after any snapshot in progress"""
+        self._stopping.set()
+        self._wake.set()
+
+    def run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopping.is_set():
+                break
+
+            path, error = None, None
+            try:
+                path = backup_database(self.db_path)
+                rotate_backups(self.db_path, self.keep)
+            except (OSError, sqlite3.Error) as e:
+                error = e
+
+            if self.on_complete:
+                self.on_complete(path, error)
+
+
+# Idle time before maintenance runs, and the time box for each step
+MAINTENANCE_IDLE_SECONDS = 5 * 60
+MAINTENANCE_STEP_SECONDS = 2.0
+
+# Free pages returned to the file system per incremental_vacuum call
+VACUUM_PAGES_PER_STEP = 256
+
+
+def enable_incremental_vacuum(conn):
+    """Switch the database to auto_vacuum=INCREMENTAL if it is not yet
+
+    Changing auto_vacuum on an existing database only takes effect after
+    a full VACUUM, which rebuilds the whole file and cannot be time-boxed,
+    so it is only run when asked for from the Admin tab. Returns whether
+    the database was converted.
+    """
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA auto_vacuum")
+    if cursor.fetchone()[0] == 2:
+        return False
+    conn.commit()
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    cursor.execute("VACUUM")
+    return True
+
+
+def database_size(conn, db_path):
+    """Return (bytes on disk including the WAL, free pages)"""
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA freelist_count")
+    free_pages = cursor.fetchone()[0]
+
+    size = 0
+    for path in (db_path, db_path + '-wal'):
+        if os.path.exists(path):
+            size += os.path.getsize(path)
+    return size, free_pages
+
+
+def probe_latency(conn, repeat=3):
+    """Time the engagement list query in milliseconds (best of repeat)"""
+    cursor = conn.cursor()
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute('''
+            SELECT e.id, e.date_time, t.name, u.name, p.name, s.name
+            FROM engagements e
+            LEFT JOIN engagement_types t ON e.type_id = t.id
+            LEFT JOIN engagement_statuses s ON e.status_id = s.id
+            LEFT JOIN units u ON e.unit_id = u.id
+            LEFT JOIN projects p ON e.project_id = p.id
+            ORDER BY e.date_time DESC
+            LIMIT 200
+        ''')
+        cursor.fetchall()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 3)
+
+
+def run_maintenance(conn, db_path, step_seconds=MAINTENANCE_STEP_SECONDS):
+    """Run the maintenance steps, each time-boxed, and log their effect
+
+    Steps are PRAGMA optimize, ANALYZE, incremental vacuum and a WAL
+    checkpoint. A progress handler interrupts any step that runs past
+    its time box. Each step's duration, outcome, database size, free
+    pages and probe query latency before and after go to
+    maintenance_log. Returns the logged rows.
+    """
+    cursor = conn.cursor()
+    conn.commit()
+    run_at = datetime.now().isoformat(timespec='seconds')
+
+    def incremental_vacuum(deadline):
+        free_pages = None
+        while time.monotonic() < deadline:
+            cursor.execute("PRAGMA freelist_count")
+            remaining = cursor.fetchone()[0]
+            # Nothing left, or a database that cannot vacuum incrementally
+            if remaining == 0 or remaining == free_pages:
+                break
+            free_pages = remaining
+            cursor.execute(
+                f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_STEP})"
+            )
+            cursor.fetchall()
+
+    steps = [
+        ('optimize', lambda deadline: cursor.execute("PRAGMA optimize")),
+        ('analyze', lambda deadline: (
+            cursor.execute("PRAGMA analysis_limit=1000"),
+            cursor.execute("ANALYZE")
+        )),
+        ('incremental_vacuum', incremental_vacuum),
+        ('wal_checkpoint', lambda deadline: cursor.execute(
+            "PRAGMA wal_checkpoint(TRUNCATE)"
+        ).fetchall()),
+    ]
+
+    results = []
+    for name, step in steps:
+        size_before, free_before = database_size(conn, db_path)
+        probe_before = probe_latency(conn)
+
+        started = time.monotonic()
+        deadline = started + step_seconds
+        conn.set_progress_handler(
+            lambda: 1 if time.monotonic() > deadline else 0,
+            1000
+        )
+        try:
+            step(deadline)
+            conn.commit()
+            status = 'ok'
+        except sqlite3.OperationalError as e:
+            conn.rollback()
+            status = 'timed out' if 'interrupt' in str(e) else str(e)
+        finally:
+            conn.set_progress_handler(None, 0)
+        seconds = round(time.monotonic() - started, 3)
+
+        size_after, free_after = database_size(conn, db_path)
+        results.append((
+            run_at, name, status, seconds,
+            size_before, size_after, free_before, free_after,
+            probe_before, probe_latency(conn)
+        ))
+
+    cursor.executemany('''
+        INSERT INTO maintenance_log (
+            run_at, step, status, seconds,
+            size_before, size_after, free_pages_before, free_pages_after,
+            probe_ms_before, probe_ms_after
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', results)
+    conn.commit()
+    return results
+
+
+# Full-text search: source table -> (result label, title SQL, indexed
+# columns). Each table gets an external-content FTS5 index kept in sync
+# by triggers, keyed by the source row id.
+SEARCH_SOURCES = {
+    'engagements': (
+        'Engagement',
+        "t.date_time || ' ' || IFNULL("
+        "(SELECT name FROM engagement_types WHERE id = t.type_id), '')",
+        ('summary', 'action_items')
+    ),
+    'units': ('Organization', 't.name', ('name', 'notes')),
+    'researchers': ('Personnel', 't.name', ('name', 'expertise', 'notes')),
+    'projects': ('Project', 't.name', ('name', 'description', 'notes')),
+    'weekly_reviews': (
+        'Review',
+        "'Week of ' || t.week_start",
+        ('summary', 'highlights', 'challenges', 'next_steps')
+    ),
+}
+
+# Snippet highlight markers, split out again when the results are shown
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+
+def create_fts_table(cursor, schema, table):
+    """Create a table's external-content FTS5 index in a schema
+
+    Returns True if the index is new and still needs a rebuild.
+    """
+    fts = f"{table}_fts"
+    cursor.execute(
+        f"SELECT 1 FROM {schema}.sqlite_master WHERE type='table' AND name=?",
+        (fts,)
+    )
+    if cursor.fetchone() is not None:
+        return False
+
+    column_list = ', '.join(SEARCH_SOURCES[table][2])
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE {schema}.{fts} USING fts5(
+            {column_list},
+            content='{table}',
+            content_rowid='id',
+            tokenize='porter unicode61',
+            prefix='2 3'
+        )
+    ''')
+    return True
+
+
+def create_search_index(cursor):
+    """Create the FTS5 indexes and their sync triggers if missing"""
+    for table, (_, _, columns) in SEARCH_SOURCES.items():
+        fts = f"{table}_fts"
+        created = create_fts_table(cursor, 'main', table)
+
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f"new.{col}" for col in columns)
+        old_values = ', '.join(f"old.{col}" for col in columns)
+
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts}_insert
+            AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts} (rowid, {column_list})
+                VALUES (new.id, {new_values});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts}_delete
+            AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {column_list})
+                VALUES ('delete', old.id, {old_values});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts}_update
+            AFTER UPDATE OF {column_list} ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {column_list})
+                VALUES ('delete', old.id, {old_values});
+                INSERT INTO {fts} (rowid, {column_list})
+                VALUES (new.id, {new_values});
+            END
+        ''')
+
+        # Index rows written before the index existed
+        if created:
+            cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def make_match_query(text):
+    """Turn free text into an FTS5 query of quoted terms
+
+    Only the last word is a prefix term, since it is usually still being
+    typed; the earlier words must match whole.
+    """
+    words = [f'"{word}"' for word in re.findall(r'\w+', text)]
+    if words:
+        words[-1] += '*'
+    return ' '.join(words)
+
+
+def search_archives(conn, db_path, query, limit):
+    """Search the archived engagements of every archive year
+
+    Each archive file is opened on its own connection rather than
+    attached, so there is no limit on the years searched and the
+    archives attached for reports are left alone. Returns (rank, table,
+    id, label, title, snippet) tuples as search_records collects them.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, name FROM engagement_types")
+    types = dict(cursor.fetchall())
+
+    results = []
+    for year in list_archive_years(db_path):
+        archive = sqlite3.connect(archive_path(db_path, year))
+        try:
+            archive_cursor = archive.cursor()
+            # Archives written before they were indexed get it built once
+            if create_fts_table(archive_cursor, 'main', 'engagements'):
+                archive_cursor.execute(
+                    "INSERT INTO engagements_fts (engagements_fts) "
+                    "VALUES ('rebuild')"
+                )
+                archive.commit()
+            archive_cursor.execute('''
+                SELECT
+                    f.rowid,
+                    t.date_time,
+                    t.type_id,
+                    snippet(engagements_fts, -1, ?, ?, '...', 16),
+                    bm25(engagements_fts)
+                FROM engagements_fts f
+                JOIN engagements t ON t.id = f.rowid
+                WHERE engagements_fts MATCH ?
+                ORDER BY bm25(engagements_fts)
+                LIMIT ?
+            ''', (MATCH_START, MATCH_END, query, limit))
+            for row_id, date_time, type_id, snippet, rank in archive_cursor:
+                title = f"{date_time} {types.get(type_id) or ''}"
+                results.append((
+                    rank, 'archived_engagements', row_id,
+                    'Archived Engagement', title, snippet
+                ))
+        finally:
+            archive.close()
+    return results
+
+
+def search_records(conn, text, limit=50, db_path=None):
+    """Search every indexed table and return the best matches overall
+
+    Returns (table, id, label, title, snippet) tuples ordered by bm25
+    rank; matched terms in the snippet are wrapped in MATCH_START and
+    MATCH_END. With db_path, archived engagements are searched too and
+    come back under the 'archived_engagements' table.
+    """
+    query = make_match_query(text)
+    if not query:
+        return []
+
+    cursor = conn.cursor()
+    results = []
+    if db_path:
+        results.extend(search_archives(conn, db_path, query, limit))
+    for table, (label, title, _) in SEARCH_SOURCES.items():
+        fts = f"{table}_fts"
+        cursor.execute(f'''
+            SELECT
+                f.rowid,
+                {title},
+                snippet({fts}, -1, ?, ?, '...', 16),
+                bm25({fts})
+            FROM {fts} f
+            JOIN {table} t ON t.id = f.rowid
+            WHERE {fts} MATCH ?
+            ORDER BY bm25({fts})
+            LIMIT ?
+        ''', (MATCH_START, MATCH_END, query, limit))
+        for row_id, row_title, snippet, rank in cursor.fetchall():
+            results.append((rank, table, row_id, label, row_title, snippet))
+
+    results.sort(key=lambda result: result[0])
+    return [result[1:] for result in results[:limit]]
+
+
+# Monday of the week containing a date; weekly_rollup and weekly reviews
+# are matched on this
+WEEK_START_SQL = "date({}, '-6 days', 'weekday 1')"
+
+
+def rollup_upsert(week_sql, rows_sql, delta):
+    """SQL adding delta to the weekly_rollup rows selected by rows_sql
+
+    rows_sql must select (dimension, key) pairs; week_sql is the date the
+    week is taken from.
+    """
+    week = WEEK_START_SQL.format(week_sql)
+    return f'''
+        INSERT INTO weekly_rollup (week_start, dimension, key, engagement_count)
+        SELECT {week}, dimension, key, {delta}
+        FROM ({rows_sql})
+        WHERE true
+        ON CONFLICT (week_start, dimension, key) DO UPDATE SET
+            engagement_count = engagement_count + excluded.engagement_count;
+    '''
+
+
+def engagement_dimensions(row):
+    """SELECT of the (dimension, key) pairs an engagement row counts under"""
+    return f'''
+        SELECT 'total' AS dimension, '' AS key
+        UNION ALL SELECT 'type', {row}.type_id
+            WHERE {row}.type_id IS NOT NULL
+        UNION ALL SELECT 'unit', {row}.unit_id
+            WHERE {row}.unit_id IS NOT NULL
+        UNION ALL SELECT 'project', {row}.project_id
+            WHERE {row}.project_id IS NOT NULL
+    '''
+
+
+def participant_dimensions(engagement_id):
+    """SELECT of the researcher pairs for an engagement's participants"""
+    return f'''
+        SELECT 'researcher' AS dimension, researcher_id AS key
+        FROM engagement_participants
+        WHERE engagement_id = {engagement_id}
+    '''
+
+
+def create_weekly_rollup(cursor):
+    """Create the weekly engagement rollup and the triggers maintaining it
+
+    weekly_rollup holds engagement counts per Monday-aligned week by
+    'total', 'type', 'unit', 'project' and 'researcher'; triggers apply
+    each change as a +1/-1 delta, so the table never needs recomputing.
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='weekly_rollup'"
+    )
+    exists = cursor.fetchone() is not None
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS weekly_rollup (
+            week_start DATE NOT NULL,
+            dimension TEXT NOT NULL,
+            key NOT NULL,
+            engagement_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (week_start, dimension, key)
+        ) WITHOUT ROWID
+    ''')
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS weekly_rollup_engagement_insert
+        AFTER INSERT ON engagements BEGIN
+            {rollup_upsert('new.date_time', engagement_dimensions('new'), 1)}
+        END
+    ''')
+
+    # BEFORE so the participants are still there when the engagement goes,
+    # whether or not they are removed by a cascade
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS weekly_rollup_engagement_delete
+        BEFORE DELETE ON engagements BEGIN
+            {rollup_upsert('old.date_time', engagement_dimensions('old'), -1)}
+            {rollup_upsert('old.date_time', participant_dimensions('old.id'), -1)}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS weekly_rollup_engagement_update
+        AFTER UPDATE OF date_time, type_id, unit_id, project_id ON engagements
+        BEGIN
+            {rollup_upsert('old.date_time', engagement_dimensions('old'), -1)}
+            {rollup_upsert('new.date_time', engagement_dimensions('new'), 1)}
+            {rollup_upsert('old.date_time', participant_dimensions('new.id'), -1)}
+            {rollup_upsert('new.date_time', participant_dimensions('new.id'), 1)}
+        END
+    ''')
+
+    # Participants count in the week of their engagement, if it still exists
+    for event, row, delta in (('INSERT', 'new', 1), ('DELETE', 'old', -1)):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS weekly_rollup_participant_{event.lower()}
+            AFTER {event} ON engagement_participants BEGIN
+                INSERT INTO weekly_rollup (
+                    week_start, dimension, key, engagement_count
+                )
+                SELECT
+                    {WEEK_START_SQL.format('date_time')},
+                    'researcher',
+                    {row}.researcher_id,
+                    {delta}
+                FROM engagements
+                WHERE id = {row}.engagement_id
+                ON CONFLICT (week_start, dimension, key) DO UPDATE SET
+                    engagement_count = engagement_count
+                        + excluded.engagement_count;
+            END
+        ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS weekly_rollup_participant_update
+        AFTER UPDATE ON engagement_participants BEGIN
+            INSERT INTO weekly_rollup (
+                week_start, dimension, key, engagement_count
+            )
+            SELECT {WEEK_START_SQL.format('e.date_time')}, 'researcher', p.key, p.delta
+            FROM engagements e, (
+                SELECT old.engagement_id AS engagement_id,
+                    old.researcher_id AS key, -1 AS delta
+                UNION ALL
+                SELECT new.engagement_id, new.researcher_id, 1
+            ) p
+            WHERE e.id = p.engagement_id
+            ON CONFLICT (week_start, dimension, key) DO UPDATE SET
+                engagement_count = engagement_count
+                    + excluded.engagement_count;
+        END
+    ''')
+
+    if not exists:
+        rebuild_weekly_rollup(cursor)
+
+
+def rebuild_weekly_rollup(cursor):
+    """Recount weekly_rollup from the engagements in the hot tables"""
+    week = WEEK_START_SQL.format('e.date_time')
+    cursor.execute("DELETE FROM weekly_rollup")
+    cursor.execute(f'''
+        INSERT INTO weekly_rollup (week_start, dimension, key, engagement_count)
+        SELECT week_start, dimension, key, COUNT(*)
+        FROM (
+            SELECT {week} AS week_start, 'total' AS dimension, '' AS key
+            FROM engagements e
+            UNION ALL
+            SELECT {week}, 'type', e.type_id FROM engagements e
+            WHERE e.type_id IS NOT NULL
+            UNION ALL
+            SELECT {week}, 'unit', e.unit_id FROM engagements e
+            WHERE e.unit_id IS NOT NULL
+            UNION ALL
+            SELECT {week}, 'project', e.project_id FROM engagements e
+            WHERE e.project_id IS NOT NULL
+            UNION ALL
+            SELECT {week}, 'researcher', ep.researcher_id
+            FROM engagement_participants ep
+            JOIN engagements e ON e.id = ep.engagement_id
+        )
+        GROUP BY week_start, dimension, key
+    ''')
+
+
+# Participant suggestions shown for a unit and project
+SUGGESTION_LIMIT = 8
+
+
+def affinity_upsert(rows_sql, delta):
+    """SQL adding delta to the participant_affinity rows selected by rows_sql
+
+    rows_sql must select (dimension, key, researcher_id) triples.
+    """
+    return f'''
+        INSERT INTO participant_affinity (
+            dimension, key, researcher_id, engagement_count
+        )
+        SELECT dimension, key, researcher_id, {delta}
+        FROM ({rows_sql})
+        WHERE true
+        ON CONFLICT (dimension, key, researcher_id) DO UPDATE SET
+            engagement_count = engagement_count + excluded.engagement_count;
+    '''
+
+
+def affinity_pairs(engagement, researcher, source):
+    """SELECT of the (dimension, key, researcher_id) triples for participants
+
+    engagement is the alias of the engagement row, researcher the
+    expression for the participant and source a FROM ... WHERE clause
+    producing them.
+    """
+    return f'''
+        SELECT 'unit' AS dimension, {engagement}.unit_id AS key,
+            {researcher} AS researcher_id
+        {source} AND {engagement}.unit_id IS NOT NULL
+        UNION ALL
+        SELECT 'project', {engagement}.project_id, {researcher}
+        {source} AND {engagement}.project_id IS NOT NULL
+    '''
+
+
+def create_participant_affinity(cursor):
+    """Create the participant co-occurrence counts and their triggers
+
+    participant_affinity counts, per unit and per project, the engagements
+    each researcher took part in. Like weekly_rollup it is kept current by
+    +1/-1 deltas from triggers, and rows that reach zero are dropped.
+    Archived engagements leave the counts, so suggestions follow the work
+    in the hot tables.
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master "
+        "WHERE type='table' AND name='participant_affinity'"
+    )
+    exists = cursor.fetchone() is not None
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS participant_affinity (
+            dimension TEXT NOT NULL,
+            key INTEGER NOT NULL,
+            researcher_id INTEGER NOT NULL,
+            engagement_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, key, researcher_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS participant_affinity_prune
+        AFTER UPDATE OF engagement_count ON participant_affinity
+        WHEN new.engagement_count <= 0 BEGIN
+            DELETE FROM participant_affinity
+            WHERE dimension = new.dimension
+                AND key = new.key
+                AND researcher_id = new.researcher_id;
+        END
+    ''')
+    
+    # BEFORE so the participants are still there when the engagement goes
+    team = "FROM engagement_participants WHERE engagement_id = {}.id"
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS participant_affinity_engagement_delete
+        BEFORE DELETE ON engagements BEGIN
+            {affinity_upsert(affinity_pairs('old', 'researcher_id', team.format('old')), -1)}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS participant_affinity_engagement_update
+        AFTER UPDATE OF unit_id, project_id ON engagements BEGIN
+            {affinity_upsert(affinity_pairs('old', 'researcher_id', team.format('new')), -1)}
+            {affinity_upsert(affinity_pairs('new', 'researcher_id', team.format('new')), 1)}
+        END
+    ''')
+    
+    # Participants count under their engagement's unit and project
+    engagement = "FROM engagements e WHERE e.id = {}.engagement_id"
+    for event, row, delta in (('INSERT', 'new', 1), ('DELETE', 'old', -1)):
+        pairs = affinity_pairs('e', f'{row}.researcher_id', engagement.format(row))
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS participant_affinity_participant_{event.lower()}
+            AFTER {event} ON engagement_participants BEGIN
+                {affinity_upsert(pairs, delta)}
+            END
+        ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS participant_affinity_participant_update
+        AFTER UPDATE ON engagement_participants BEGIN
+            {affinity_upsert(affinity_pairs('e', 'old.researcher_id', engagement.format('old')), -1)}
+            {affinity_upsert(affinity_pairs('e', 'new.researcher_id', engagement.format('new')), 1)}
+        END
+    ''')
+    
+    if not exists:
+        rebuild_participant_affinity(cursor)
+
+
+def rebuild_participant_affinity(cursor):
+    """Recount participant_affinity from the engagements in the hot tables"""
+    cursor.execute("DELETE FROM participant_affinity")
+    for dimension in ('unit', 'project'):
+        cursor.execute(f'''
+            INSERT INTO participant_affinity (
+                dimension, key, researcher_id, engagement_count
+            )
+            SELECT '{dimension}', e.{dimension}_id, ep.researcher_id, COUNT(*)
+            FROM engagement_participants ep
+            JOIN engagements e ON e.id = ep.engagement_id
+            WHERE e.{dimension}_id IS NOT NULL
+            GROUP BY e.{dimension}_id, ep.researcher_id
+        ''')
+
+
+def suggest_participants(conn, unit_id, project_id, limit=SUGGESTION_LIMIT):
+    """Researchers who most often worked with a unit and project
+
+    Returns (researcher id, name, engagements together) rows, ranked by
+    engagements with the unit plus engagements on the project.
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT r.id, r.name, SUM(a.engagement_count) AS together
+        FROM participant_affinity a
+        JOIN researchers r ON r.id = a.researcher_id
+        WHERE (a.dimension = 'unit' AND a.key = ?)
+            OR (a.dimension = 'project' AND a.key = ?)
+        GROUP BY r.id
+        ORDER BY together DESC, r.name
+        LIMIT ?
+    ''', (unit_id, project_id, limit))
+    return cursor.fetchall()
+
+
+def weekly_stats(conn, week_start):
+    """Return {dimension: [(name, count), ...]} for the week of a date
+
+    Names are resolved for types, units, projects and researchers; the
+    'total' dimension holds a single ('', count) pair.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT
+            w.dimension,
+            CASE w.dimension
+                WHEN 'type' THEN t.name
+                WHEN 'unit' THEN u.name
+                WHEN 'project' THEN p.name
+                WHEN 'researcher' THEN r.name
+                ELSE w.key
+            END,
+            w.engagement_count
+        FROM weekly_rollup w
+        LEFT JOIN engagement_types t ON w.dimension = 'type' AND t.id = w.key
+        LEFT JOIN units u ON w.dimension = 'unit' AND u.id = w.key
+        LEFT JOIN projects p ON w.dimension = 'project' AND p.id = w.key
+        LEFT JOIN researchers r
+            ON w.dimension = 'researcher' AND r.id = w.key
+        WHERE w.week_start = {WEEK_START_SQL.format('?')}
+            AND w.engagement_count > 0
+        ORDER BY w.dimension, w.engagement_count DESC
+    ''', (week_start.isoformat(),))
+
+    stats = {}
+    for dimension, name, count in cursor.fetchall():
+        stats.setdefault(dimension, []).append((name, count))
+    return stats
+
+
+# Abbreviations expanded before organization and personnel names are compared
+NAME_ABBREVIATIONS = {
+    'bde': 'brigade',
+    'bn': 'battalion',
+    'btn': 'battalion',
+    'co': 'company',
+    'coy': 'company',
+    'div': 'division',
+    'regt': 'regiment',
+    'sqn': 'squadron',
+    'sqdn': 'squadron',
+    'bty': 'battery',
+    'det': 'detachment',
+    'plt': 'platoon',
+    'grp': 'group',
+    'cmd': 'command',
+    'ctr': 'center',
+    'cntr': 'center',
+    'centre': 'center',
+    'hq': 'headquarters',
+    'hqs': 'headquarters',
+    'dept': 'department',
+    'lab': 'laboratory',
+    'univ': 'university',
+    'inst': 'institute',
+}
+
+
+def normalize_name(name):
+    """Lower-case a name, expand abbreviations and strip ordinal suffixes"""
+    tokens = []
+    for token in re.findall(r'[a-z0-9]+', (name or '').lower()):
+        ordinal = re.fullmatch(r'(\d+)(?:st|nd|rd|th)', token)
+        if ordinal:
+            token = ordinal.group(1)
+        tokens.append(NAME_ABBREVIATIONS.get(token, token))
+    return ' '.join(tokens)
+
+
+def name_trigrams(normalized):
+    """Return the set of padded character trigrams of each word"""
+    trigrams = set()
+    for token in normalized.split():
+        padded = f"  {token} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def find_duplicates(records, threshold=0.75, block_key=None):
+    """Find likely duplicate names without comparing every pair
+
+    ``records`` is a list of (id, name). Names are only compared when they
+    share a blocking key and one of their rarest trigrams (prefix
+    filtering over an inverted trigram index), so the work grows with the
+    number of similar names rather than with n^2. The score averages
+    trigram Jaccard similarity and difflib's ratio. Returns
+    (score, id_a, id_b) tuples, best first.
+    """
+    normalized = [normalize_name(name) for _, name in records]
+    trigrams = [name_trigrams(name) for name in normalized]
+
+    # The ratio is at most 1, so a match needs at least this Jaccard
+    min_jaccard = max(2 * threshold - 1, 0.1)
+
+    # Blocks: by default names with different numbers never match
+    if block_key is None:
+        def block_key(name):
+            return tuple(token for token in name.split() if token.isdigit())
+
+    blocks = {}
+    for i, name in enumerate(normalized):
+        if name:
+            blocks.setdefault(block_key(name), []).append(i)
+
+    candidates = set()
+    for members in blocks.values():
+        # Rarity within the block; trigrams of the block key never help
+        frequency = Counter(
+            trigram for i in members for trigram in trigrams[i]
+        )
+        index = {}
+        for i in members:
+            # Two sets this similar must share one of their rarest trigrams
+            ordered = sorted(trigrams[i], key=lambda t: (frequency[t], t))
+            prefix = len(ordered) - math.ceil(min_jaccard * len(ordered)) + 1
+            for trigram in ordered[:prefix]:
+                postings = index.setdefault(trigram, [])
+                candidates.update((j, i) for j in postings)
+                postings.append(i)
+
+    duplicates = []
+    for a, b in candidates:
+        if normalized[a] == normalized[b]:
+            score = 1.0
+        else:
+            shared = len(trigrams[a] & trigrams[b])
+            jaccard = shared / len(trigrams[a] | trigrams[b])
+            if jaccard < min_jaccard:
+                continue
+            matcher = difflib.SequenceMatcher(
+                None,
+                normalized[a],
+                normalized[b]
+            )
+            # quick_ratio() bounds ratio() from above at a fraction of the cost
+            if (jaccard + matcher.quick_ratio()) / 2 < threshold:
+                continue
+            score = (jaccard + matcher.ratio()) / 2
+        if score >= threshold:
+            duplicates.append((round(score, 3), records[a][0], records[b][0]))
+
+    duplicates.sort(key=lambda duplicate: -duplicate[0])
+    return duplicates
+
+
+def personnel_block_key(name):
+    """Block personnel names on their sorted word initials"""
+    return ''.join(sorted(token[0] for token in name.split()))
+
+
+def find_duplicate_units(conn, threshold=0.75):
+    """Return (score, unit_a, unit_b) with units as (id, name, engagements)"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT u.id, u.name, COUNT(e.id)
+        FROM units u
+        LEFT JOIN engagements e ON e.unit_id = u.id
+        GROUP BY u.id
+    ''')
+    units = {row[0]: row for row in cursor.fetchall()}
+    pairs = find_duplicates([(row[0], row[1]) for row in units.values()], threshold)
+    return [(score, units[a], units[b]) for score, a, b in pairs]
+
+
+def find_duplicate_researchers(conn, threshold=0.75):
+    """Return (score, person_a, person_b) as (id, name, engagements)"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT r.id, r.name, COUNT(ep.engagement_id)
+        FROM researchers r
+        LEFT JOIN engagement_participants ep ON ep.researcher_id = r.id
+        GROUP BY r.id
+    ''')
+    people = {row[0]: row for row in cursor.fetchall()}
+    pairs = find_duplicates(
+        [(row[0], row[1]) for row in people.values()],
+        threshold,
+        personnel_block_key
+    )
+    return [(score, people[a], people[b]) for score, a, b in pairs]
+
+
+def repoint_archives(conn, db_path, statements):
+    """Run repointing statements against every archive file in turn"""
+    detach_archives(conn)
+    cursor = conn.cursor()
+    for year in list_archive_years(db_path):
+        schema = f"archive_{year}"
+        cursor.execute(
+            f"ATTACH DATABASE ? AS {schema}",
+            (archive_path(db_path, year),)
+        )
+        try:
+            with conn:
+                for sql, params in statements:
+                    cursor.execute(sql.format(schema=schema), params)
+        finally:
+            cursor.execute(f"DETACH DATABASE {schema}")
+
+
+def fold_rollup_key(cursor, dimension, keep_id, drop_id):
+    """Move archived weekly_rollup counts from a merged key to the kept one
+
+    Counts for hot engagements already moved with the triggers; what is
+    left under the dropped key belongs to archived weeks.
+    """
+    cursor.execute('''
+        INSERT INTO weekly_rollup (week_start, dimension, key, engagement_count)
+        SELECT week_start, dimension, ?, engagement_count
+        FROM weekly_rollup
+        WHERE dimension = ? AND key = ? AND engagement_count <> 0
+        ON CONFLICT (week_start, dimension, key) DO UPDATE SET
+            engagement_count = engagement_count + excluded.engagement_count
+    ''', (keep_id, dimension, drop_id))
+    cursor.execute(
+        "DELETE FROM weekly_rollup WHERE dimension = ? AND key = ?",
+        (dimension, drop_id)
+    )
+
+
+def merge_units(conn, db_path, keep_id, drop_id):
+    """Merge one unit into another and delete it
+
+    Engagements are repointed and the duplicate removed in a single
+    transaction; archived engagements are repointed afterwards.
+    """
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE engagements SET unit_id = ? WHERE unit_id = ?",
+            (keep_id, drop_id)
+        )
+        fold_rollup_key(cursor, 'unit', keep_id, drop_id)
+        cursor.execute("DELETE FROM units WHERE id = ?", (drop_id,))
+
+    repoint_archives(conn, db_path, [(
+        "UPDATE {schema}.engagements SET unit_id = ? WHERE unit_id = ?",
+        (keep_id, drop_id)
+    )])
+
+
+def merge_researchers(conn, db_path, keep_id, drop_id):
+    """Merge one researcher into another and delete them
+
+    Participations are repointed, skipping engagements the kept researcher
+    already attended, and the duplicate removed in a single transaction.
+    """
+    statements = [
+        ('''
+            UPDATE OR IGNORE {schema}.engagement_participants
+            SET researcher_id = ?
+            WHERE researcher_id = ?
+        ''', (keep_id, drop_id)),
+        ('''
+            DELETE FROM {schema}.engagement_participants
+            WHERE researcher_id = ?
+        ''', (drop_id,)),
+        ('''
+            UPDATE {schema}.action_items SET owner_id = ?
+            WHERE owner_id = ?
+        ''', (keep_id, drop_id)),
+    ]
+    with conn:
+        cursor = conn.cursor()
+        for sql, params in statements:
+            cursor.execute(sql.format(schema='main'), params)
+        fold_rollup_key(cursor, 'researcher', keep_id, drop_id)
+        cursor.execute("DELETE FROM researchers WHERE id = ?", (drop_id,))
+
+    repoint_archives(conn, db_path, statements)
+
+
+# Calendar: fill colors for engagement types or units, assigned by a hash
+# of the name so a type keeps its color from window to window
+CALENDAR_PALETTE = (
+    '#4e79a7', '#f28e2b', '#e15759', '#76b7b2', '#59a14f',
+    '#edc948', '#b07aa1', '#ff9da7', '#9c755f', '#bab0ac',
+)
+
+# Date windows kept for instant paging, including the prefetched ones on
+# either side of the window shown
+CALENDAR_CACHE_WINDOWS = 8
+
+
+def calendar_window(mode, anchor):
+    """Return (first day, number of days) of the window holding a date
+
+    'Week' is the Monday-to-Sunday week; 'Month' is the six whole weeks
+    starting on the Monday on or before the 1st.
+    """
+    if mode == 'Week':
+        return anchor - timedelta(days=anchor.weekday()), 7
+    first = anchor.replace(day=1)
+    return first - timedelta(days=first.weekday()), 42
+
+
+def shift_calendar_window(mode, start, steps):
+    """Return a date inside the window steps windows away"""
+    if mode == 'Week':
+        return start + timedelta(days=7 * steps)
+    # The middle of a month grid always falls in the month it shows
+    middle = start + timedelta(days=14)
+    month = middle.month - 1 + steps
+    return middle.replace(
+        year=middle.year + month // 12,
+        month=month % 12 + 1,
+        day=1
+    )
+
+
+def fetch_calendar_window(conn, start_date, end_date):
+    """Return the engagements dated in [start_date, end_date)
+
+    A range seek on idx_engagements_date_time, so the cost follows the
+    window, not the history. Rows are (id, day, type, unit, summary).
+    """
+    return conn.execute('''
+        SELECT
+            e.id,
+            substr(e.date_time, 1, 10) AS day,
+            t.name AS type_name,
+            u.name AS unit_name,
+            substr(e.summary, 1, 60) AS summary
+        FROM engagements e
+        LEFT JOIN engagement_types t ON e.type_id = t.id
+        LEFT JOIN units u ON e.unit_id = u.id
+        WHERE e.date_time >= ? AND e.date_time < ?
+        ORDER BY e.date_time, e.id
+    ''', (start_date.isoformat(), end_date.isoformat())).fetchall()
+
+
+def calendar_color(key):
+    """Fill color for an engagement type or unit name"""
+    if key is None:
+        return '#d0d0d0'
+    return CALENDAR_PALETTE[zlib.crc32(str(key).encode('utf-8')) % len(CALENDAR_PALETTE)]
+
+
+# Lookup tables for the coded columns and the names each starts with.
+# Names typed into a combobox that are not listed yet are added.
+LOOKUP_TABLES = {
+    'engagement_types': (
+        'Initial Meeting', 'Follow-up Meeting', 'Training Session',
+        'Field Test', 'Demonstration', 'Project Review', 'Other'
+    ),
+    'engagement_statuses': ('Open', 'In Progress', 'Completed', 'Cancelled'),
+    'project_statuses': (
+        'Planning', 'In Progress', 'On Hold', 'Completed', 'Cancelled'
+    ),
+    'unit_types': (
+        'Combat Unit', 'Support Unit', 'Training Unit', 'Research Unit', 'Other'
+    ),
+}
+
+# (table, former text column) -> (integer code column, lookup table)
+CODED_COLUMNS = {
+    ('engagements', 'type'): ('type_id', 'engagement_types'),
+    ('engagements', 'status'): ('status_id', 'engagement_statuses'),
+    ('projects', 'status'): ('status_id', 'project_statuses'),
+    ('units', 'type'): ('type_id', 'unit_types'),
+}
+
+
+def create_lookup_tables(cursor):
+    """Create the lookup tables, filling new ones with their default names"""
+    for table, names in LOOKUP_TABLES.items():
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        ''')
+        cursor.execute(f"SELECT 1 FROM {table} LIMIT 1")
+        if cursor.fetchone() is None:
+            cursor.executemany(
+                f"INSERT INTO {table} (name) VALUES (?)",
+                [(name,) for name in names]
+            )
+
+
+def lookup_sql(table):
+    """SQL expression for the code of the name bound to its ? parameter"""
+    return f"(SELECT id FROM {table} WHERE name = ?)"
+
+
+def add_lookup(cursor, table, name):
+    """Add a name to a lookup table unless it is blank or already there"""
+    if name and name.strip():
+        cursor.execute(
+            f"INSERT OR IGNORE INTO {table} (name) VALUES (?)",
+            (name,)
+        )
+
+
+def lookup_names(conn, table):
+    """Names in a lookup table, for a combobox, in the order they were added"""
+    return [row[0] for row in conn.execute(f"SELECT name FROM {table} ORDER BY id")]
+
+
+# PRAGMA user_version once each one-time migration has run
+FOREIGN_KEYS_VERSION = 1
+ACTION_ITEMS_VERSION = 2
+
+# Engagement tables and their ON DELETE actions: removing an organization
+# or project keeps its engagements but clears the link, while removing an
+# engagement or a researcher removes the participation rows with it.
+# Action items go with their engagement and lose a removed owner.
+ENGAGEMENT_SCHEMAS = {
+    'engagements': '''
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date_time DATE NOT NULL,
+            type_id INTEGER REFERENCES engagement_types(id),
+            unit_id INTEGER,
+            project_id INTEGER,
+            summary TEXT,
+            status_id INTEGER REFERENCES engagement_statuses(id),
+            action_items TEXT,
+            FOREIGN KEY (unit_id) REFERENCES units(id) ON DELETE SET NULL,
+            FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE SET NULL
+        )
+    ''',
+    'engagement_participants': '''
+        CREATE TABLE IF NOT EXISTS {table} (
+            engagement_id INTEGER,
+            researcher_id INTEGER,
+            PRIMARY KEY (engagement_id, researcher_id),
+            FOREIGN KEY (engagement_id) REFERENCES engagements(id)
+                ON DELETE CASCADE,
+            FOREIGN KEY (researcher_id) REFERENCES researchers(id)
+                ON DELETE CASCADE
+        )
+    ''',
+    'action_items': '''
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            engagement_id INTEGER NOT NULL,
+            line INTEGER NOT NULL,
+            description TEXT NOT NULL,
+            owner_id INTEGER,
+            due_date DATE,
+            status TEXT NOT NULL DEFAULT 'Open',
+            FOREIGN KEY (engagement_id) REFERENCES engagements(id)
+                ON DELETE CASCADE,
+            FOREIGN KEY (owner_id) REFERENCES researchers(id)
+                ON DELETE SET NULL
+        )
+    ''',
+}
+FOREIGN_KEY_ACTIONS = {
+    'engagements': {
+        'unit_id': 'SET NULL',
+        'project_id': 'SET NULL',
+        'type_id': 'NO ACTION',
+        'status_id': 'NO ACTION',
+    },
+    'engagement_participants': {
+        'engagement_id': 'CASCADE',
+        'researcher_id': 'CASCADE',
+    },
+    'action_items': {'engagement_id': 'CASCADE', 'owner_id': 'SET NULL'},
+}
+
+# Links left behind before foreign keys were enforced, in the hot tables
+# ({schema} = main) and in each archive file
+ORPHAN_SWEEP = [
+    ('''
+        DELETE FROM {schema}.engagement_participants
+        WHERE engagement_id NOT IN (SELECT id FROM {schema}.engagements)
+    ''', ()),
+    ('''
+        DELETE FROM {schema}.engagement_participants
+        WHERE researcher_id NOT IN (SELECT id FROM main.researchers)
+    ''', ()),
+    ('''
+        UPDATE {schema}.engagements SET unit_id = NULL
+        WHERE unit_id NOT IN (SELECT id FROM main.units)
+    ''', ()),
+    ('''
+        UPDATE {schema}.engagements SET project_id = NULL
+        WHERE project_id NOT IN (SELECT id FROM main.projects)
+    ''', ()),
+]
+
+# weekly_rollup keys of deleted records; archived weeks are not recounted
+# by the triggers
+ROLLUP_ORPHAN_SWEEP = '''
+    DELETE FROM weekly_rollup
+    WHERE (dimension = 'unit' AND key NOT IN (SELECT id FROM units))
+        OR (dimension = 'project' AND key NOT IN (SELECT id FROM projects))
+        OR (dimension = 'researcher'
+            AND key NOT IN (SELECT id FROM researchers))
+'''
+
+
+def has_delete_actions(cursor, table):
+    """Whether a table already declares its ON DELETE actions"""
+    cursor.execute(f"PRAGMA foreign_key_list({table})")
+    actions = {row[3]: row[6] for row in cursor.fetchall()}
+    return actions == FOREIGN_KEY_ACTIONS[table]
+
+
+def sweep_orphans(conn, db_path):
+    """Remove participations and clear links pointing at deleted records"""
+    cursor = conn.cursor()
+    with conn:
+        for sql, params in ORPHAN_SWEEP:
+            cursor.execute(sql.format(schema='main'), params)
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master "
+            "WHERE type='table' AND name='weekly_rollup'"
+        )
+        if cursor.fetchone():
+            cursor.execute(ROLLUP_ORPHAN_SWEEP)
+    repoint_archives(conn, db_path, ORPHAN_SWEEP)
+
+
+def migrate_foreign_keys(conn, db_path):
+    """Sweep orphans and rebuild the engagement tables with ON DELETE actions
+
+    Runs once per database, tracked by PRAGMA user_version. SQLite cannot
+    alter a foreign key, so each table is copied into a new one and
+    renamed; its triggers go with the old table and are recreated by
+    create_search_index(), create_weekly_rollup() and
+    create_participant_affinity(), like the archive views by
+    create_archive_views(). Returns whether anything was migrated.
+    """
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA user_version")
+    if cursor.fetchone()[0] >= FOREIGN_KEYS_VERSION:
+        return False
+
+    sweep_orphans(conn, db_path)
+
+    # The pragma is a no-op inside a transaction
+    conn.commit()
+    cursor.execute("PRAGMA foreign_keys=OFF")
+    try:
+        # sqlite3 does not open a transaction before DDL by itself, so one
+        # is opened here and the rebuild is applied whole or not at all
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name='engagements'")
+            row = cursor.fetchone()
+            for table, schema in ENGAGEMENT_SCHEMAS.items():
+                if has_delete_actions(cursor, table):
+                    continue
+                cursor.execute(
+                    "SELECT name FROM sqlite_master "
+                    "WHERE type='trigger' AND tbl_name IN "
+                    "('engagements', 'engagement_participants')"
+                )
+                for (trigger,) in cursor.fetchall():
+                    cursor.execute(f"DROP TRIGGER {trigger}")
+                # The rename rejects views over the dropped table
+                for view_table in ARCHIVED_TABLES:
+                    cursor.execute(f"DROP VIEW IF EXISTS temp.all_{view_table}")
+                columns = ', '.join(ARCHIVED_TABLES[table][1])
+                cursor.execute(schema.format(table=f"{table}_new"))
+                cursor.execute(f'''
+                    INSERT INTO {table}_new ({columns})
+                    SELECT {columns} FROM {table}
+                ''')
+                cursor.execute(f"DROP TABLE {table}")
+                cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+            # Keep ids of archived engagements from being handed out again
+            if row:
+                cursor.execute(
+                    "UPDATE sqlite_sequence SET seq = MAX(seq, ?) "
+                    "WHERE name='engagements'",
+                    (row[0],)
+                )
+            cursor.execute("PRAGMA foreign_key_check")
+            if cursor.fetchall():
+                raise sqlite3.IntegrityError("foreign key check failed")
+            cursor.execute(f"PRAGMA user_version = {FOREIGN_KEYS_VERSION}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    finally:
+        cursor.execute("PRAGMA foreign_keys=ON")
+    return True
+
+
+# Action item lines: an optional bullet or number and [ ] / [x] check box,
+# then the text. "@Name" names the owner and a YYYY-MM-DD date is the due
+# date; a checked box marks the item done.
+ACTION_ITEM_LINE = re.compile(
+    r'^(?P<prefix>\s*(?:[-*•]|\d+[.)])?\s*)'
+    r'(?:\[(?P<mark>[ xX])\]\s*)?(?P<text>.*?)\s*$'
+)
+ACTION_ITEM_DATE = re.compile(r'\b\d{4}-\d{2}-\d{2}\b')
+
+# Rows per due-date group in the Open Action Items list
+ACTION_ITEMS_PAGE = 500
+
+
+def parse_action_items(text, researchers):
+    """Split an engagement's action item text into structured items
+
+    researchers is a list of (id, name) used to resolve "@Name" owners,
+    preferring the longest name that matches. Returns (line number,
+    description, owner id, due date, status) tuples.
+    """
+    names = sorted(
+        ((name.lower(), researcher_id) for researcher_id, name in researchers if name),
+        key=lambda pair: -len(pair[0])
+    )
+    items = []
+    for line_number, line in enumerate((text or '').splitlines()):
+        match = ACTION_ITEM_LINE.match(line)
+        description = match.group('text')
+        if not description:
+            continue
+        
+        owner_id = None
+        lowered = description.lower()
+        for mention in re.finditer('@', description):
+            owner_id = next(
+                (
+                    researcher_id for name, researcher_id in names
+                    if lowered.startswith(name, mention.end())
+                ),
+                None
+            )
+            if owner_id is not None:
+                break
+        
+        due_date = None
+        for found in ACTION_ITEM_DATE.findall(description):
+            try:
+                due_date = datetime.strptime(found, '%Y-%m-%d').date().isoformat()
+                break
+            except ValueError:
+                continue
+        
+        status = 'Done' if match.group('mark') in ('x', 'X') else 'Open'
+        items.append((line_number, description, owner_id, due_date, status))
+    return items
+
+
+def insert_action_items(cursor, schema, engagement_id, items, first_id=None):
+    """Insert parsed items for an engagement, with explicit ids if given"""
+    cursor.executemany(f'''
+        INSERT INTO {schema}.action_items (
+            id, engagement_id, line, description, owner_id, due_date, status
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [
+        (None if first_id is None else first_id + offset, engagement_id) + item
+        for offset, item in enumerate(items)
+    ])
+
+
+def sync_action_items(conn, engagement_id, text):
+    """Replace an engagement's action item rows with those parsed from text"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, name FROM researchers")
+    items = parse_action_items(text, cursor.fetchall())
+    cursor.execute(
+        "DELETE FROM action_items WHERE engagement_id = ?",
+        (engagement_id,)
+    )
+    insert_action_items(cursor, 'main', engagement_id, items)
+
+
+def reserve_action_item_ids(cursor, count):
+    """Take count ids from the action_items sequence; returns the first
+
+    Archived items are given ids from the hot table's sequence so the
+    all_action_items view and later archiving never see two rows share one.
+    """
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'action_items'")
+    row = cursor.fetchone()
+    first = (row[0] if row else 0) + 1
+    if row:
+        cursor.execute(
+            "UPDATE sqlite_sequence SET seq = ? WHERE name = 'action_items'",
+            (first + count - 1,)
+        )
+    else:
+        cursor.execute(
+            "INSERT INTO sqlite_sequence (name, seq) VALUES ('action_items', ?)",
+            (first + count - 1,)
+        )
+    return first
+
+
+def migrate_action_items(conn, db_path):
+    """Parse existing action item text into action_items rows
+
+    Runs once per database, tracked by PRAGMA user_version, over the hot
+    engagements and every archive file. Returns the number of items made.
+    """
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA user_version")
+    if cursor.fetchone()[0] >= ACTION_ITEMS_VERSION:
+        return 0
+    
+    cursor.execute("SELECT id, name FROM researchers")
+    researchers = cursor.fetchall()
+    
+    def engagement_items(schema):
+        cursor.execute(f'''
+            SELECT id, action_items FROM {schema}.engagements
+            WHERE action_items IS NOT NULL AND action_items <> ''
+        ''')
+        for engagement_id, text in cursor.fetchall():
+            items = parse_action_items(text, researchers)
+            if items:
+                yield engagement_id, items
+    
+    created = 0
+    with conn:
+        cursor.execute("DELETE FROM action_items")
+        for engagement_id, items in list(engagement_items('main')):
+            insert_action_items(cursor, 'main', engagement_id, items)
+            created += len(items)
+    
+    detach_archives(conn)
+    for year in list_archive_years(db_path):
+        schema = f"archive_{year}"
+        cursor.execute(
+            f"ATTACH DATABASE ? AS {schema}",
+            (archive_path(db_path, year),)
+        )
+        try:
+            with conn:
+                create_archive_tables(cursor, schema)
+                cursor.execute(f"DELETE FROM {schema}.action_items")
+                for engagement_id, items in list(engagement_items(schema)):
+                    first = reserve_action_item_ids(cursor, len(items))
+                    insert_action_items(cursor, schema, engagement_id, items, first)
+                    created += len(items)
+        finally:
+            cursor.execute(f"DETACH DATABASE {schema}")
+    
+    cursor.execute(f"PRAGMA user_version = {ACTION_ITEMS_VERSION}")
+    conn.commit()
+    return created
+
+
+def set_action_item_status(conn, item_id, status):
+    """Mark an action item Open or Done, ticking its line in the text too"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT e.id, e.action_items, a.line
+        FROM action_items a
+        JOIN engagements e ON e.id = a.engagement_id
+        WHERE a.id = ?
+    ''', (item_id,))
+    row = cursor.fetchone()
+    if row is None:
+        raise ValueError("The action item no longer exists.")
+    engagement_id, text, line = row
+    
+    lines = (text or '').splitlines()
+    match = ACTION_ITEM_LINE.match(lines[line])
+    mark = 'x' if status == 'Done' else ' '
+    lines[line] = f"{match.group('prefix')}[{mark}] {match.group('text')}"
+    cursor.execute(
+        "UPDATE engagements SET action_items = ? WHERE id = ?",
+        ('\n'.join(lines), engagement_id)
+    )
+    cursor.execute(
+        "UPDATE action_items SET status = ? WHERE id = ?",
+        (status, item_id)
+    )
+
+
+def open_action_items(conn, owner_id=None, limit=ACTION_ITEMS_PAGE):
+    """Open action items, soonest due first and undated ones after
+
+    Each half is a range scan of an index on (status, due_date), or
+    (owner_id, status, due_date) for one owner, stopped after limit rows.
+    Returns (id, due date, description, owner, engagement date,
+    organization, engagement id) rows.
+    """
+    owner = "AND a.owner_id = ?" if owner_id is not None else ""
+    params = (owner_id,) if owner_id is not None else ()
+    select = f'''
+        SELECT
+            a.id,
+            a.due_date,
+            a.description,
+            r.name,
+            substr(e.date_time, 1, 10),
+            u.name,
+            a.engagement_id
+        FROM action_items a
+        JOIN engagements e ON e.id = a.engagement_id
+        LEFT JOIN researchers r ON r.id = a.owner_id
+        LEFT JOIN units u ON u.id = e.unit_id
+        WHERE a.status = 'Open' {owner}
+    '''
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT * FROM (
+            {select} AND a.due_date IS NOT NULL
+            ORDER BY a.due_date
+            LIMIT ?
+        )
+        UNION ALL
+        SELECT * FROM (
+            {select} AND a.due_date IS NULL
+            ORDER BY a.id
+            LIMIT ?
+        )
+    ''', params + (limit,) + params + (limit,))
+    return cursor.fetchall()
+
+
+def pending_coded_columns(cursor, schema):
+    """The CODED_COLUMNS entries whose text column a schema still has"""
+    pending = []
+    for (table, column), (code, lookup) in CODED_COLUMNS.items():
+        cursor.execute(f"PRAGMA {schema}.table_info({table})")
+        if column in {row[1] for row in cursor.fetchall()}:
+            pending.append((table, column, code, lookup))
+    return pending
+
+
+def convert_coded_columns(cursor, schema, pending):
+    """Swap text columns for codes, adding any names the lookups lack"""
+    for table, column, code, lookup in pending:
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO main.{lookup} (name)
+            SELECT DISTINCT {column} FROM {schema}.{table}
+            WHERE trim({column}) <> ''
+            ORDER BY {column}
+        ''')
+        # Archive files hold no lookup tables to reference
+        references = f" REFERENCES {lookup}(id)" if schema == 'main' else ''
+        cursor.execute(
+            f"ALTER TABLE {schema}.{table} ADD COLUMN {code} INTEGER{references}"
+        )
+        cursor.execute(f'''
+            UPDATE {schema}.{table} SET {code} = (
+                SELECT l.id FROM main.{lookup} l WHERE l.name = {table}.{column}
+            )
+        ''')
+        cursor.execute(f"ALTER TABLE {schema}.{table} DROP COLUMN {column}")
+
+
+def migrate_lookup_codes(conn, db_path):
+    """Replace repeated text values with integer codes into lookup tables
+
+    Runs while the hot tables still have a text column; archive files are
+    converted first, each in its own transaction, so an interrupted run
+    picks up where it stopped. Triggers naming the old columns are dropped
+    and recreated by create_weekly_rollup() and friends; weekly_rollup's
+    'type' keys become codes too. Returns whether anything was migrated.
+    """
+    cursor = conn.cursor()
+    pending = pending_coded_columns(cursor, 'main')
+    if not pending:
+        return False
+    
+    # ATTACH is not allowed in a transaction, and the views name the columns
+    conn.commit()
+    for table in ARCHIVED_TABLES:
+        cursor.execute(f"DROP VIEW IF EXISTS temp.all_{table}")
+    for year in list_archive_years(db_path):
+        schema = f"archive_{year}"
+        cursor.execute(
+            f"ATTACH DATABASE ? AS {schema}",
+            (archive_path(db_path, year),)
+        )
+        try:
+            with conn:
+                convert_coded_columns(
+                    cursor,
+                    schema,
+                    pending_coded_columns(cursor, schema)
+                )
+        finally:
+            cursor.execute(f"DETACH DATABASE {schema}")
+    
+    with conn:
+        cursor.execute(
+            "SELECT name FROM sqlite_master "
+            "WHERE type='trigger' AND tbl_name = 'engagements'"
+        )
+        for (trigger,) in cursor.fetchall():
+            cursor.execute(f"DROP TRIGGER {trigger}")
+        convert_coded_columns(cursor, 'main', pending)
+        
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master "
+            "WHERE type='table' AND name='weekly_rollup'"
+        )
+        if cursor.fetchone():
+            cursor.execute('''
+                INSERT OR IGNORE INTO engagement_types (name)
+                SELECT DISTINCT key FROM weekly_rollup
+                WHERE dimension = 'type' AND trim(key) <> ''
+                ORDER BY key
+            ''')
+            cursor.execute('''
+                DELETE FROM weekly_rollup
+                WHERE dimension = 'type' AND trim(key) = ''
+            ''')
+            cursor.execute('''
+                UPDATE weekly_rollup SET key = (
+                    SELECT t.id FROM engagement_types t
+                    WHERE t.name = weekly_rollup.key
+                )
+                WHERE dimension = 'type'
+            ''')
+    return True
+
+
+def remove_unit(conn, db_path, unit_id):
+    """Delete an organization, clearing it from hot and archived engagements"""
+    with conn:
+        cursor = conn.cursor()
+        # ON DELETE SET NULL clears the hot engagements
+        cursor.execute("DELETE FROM units WHERE id = ?", (unit_id,))
+        cursor.execute(
+            "DELETE FROM weekly_rollup WHERE dimension = 'unit' AND key = ?",
+            (unit_id,)
+        )
+    repoint_archives(conn, db_path, [(
+        "UPDATE {schema}.engagements SET unit_id = NULL WHERE unit_id = ?",
+        (unit_id,)
+    )])
+
+
+def benchmark_deletes(sizes, deletes=50, children=10):
+    """Time parent deletes against child tables of growing size
+
+    Each parent keeps the same number of children at every size, so with
+    the child column indexed the cost per delete should stay flat (an
+    index probe) while without it every delete scans the child table.
+    Yields (engagements, parent table, indexed, ms per delete).
+    """
+    for size in sizes:
+        for indexed in (True, False):
+            conn = sqlite3.connect(':memory:')
+            cursor = conn.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            for parent in ('units', 'projects', 'researchers'):
+                cursor.execute(
+                    f"CREATE TABLE {parent} (id INTEGER PRIMARY KEY, name TEXT)"
+                )
+            create_lookup_tables(cursor)
+            for table, schema in ENGAGEMENT_SCHEMAS.items():
+                cursor.execute(schema.format(table=table))
+            parents = size // children
+            for parent in ('units', 'researchers'):
+                cursor.executemany(
+                    f"INSERT INTO {parent} (id, name) VALUES (?, '')",
+                    ((i,) for i in range(parents))
+                )
+            cursor.executemany(
+                "INSERT INTO engagements (id, date_time, type_id, unit_id) "
+                "VALUES (?, '2024-01-01', 1, ?)",
+                ((i, i % parents) for i in range(size))
+            )
+            cursor.executemany(
+                "INSERT INTO engagement_participants VALUES (?, ?)",
+                ((i, i % parents) for i in range(size))
+            )
+            if indexed:
+                cursor.execute(
+                    "CREATE INDEX idx_engagements_unit ON engagements (unit_id)"
+                )
+                cursor.execute(
+                    "CREATE INDEX idx_participants_researcher "
+                    "ON engagement_participants (researcher_id)"
+                )
+            conn.commit()
+
+            for parent in ('units', 'researchers', 'engagements'):
+                rows = size if parent == 'engagements' else parents
+                step = max(rows // deletes, 1)
+                ids = range(0, step * deletes, step)
+                started = time.perf_counter()
+                for parent_id in ids:
+                    cursor.execute(f"DELETE FROM {parent} WHERE id = ?", (parent_id,))
+                conn.commit()
+                elapsed = time.perf_counter() - started
+                yield size, parent, indexed, elapsed * 1000 / len(ids)
+            conn.close()
+
+
+# Characters of long text shown in the list views; the full text loads
+# into the detail pane when a row is selected
+PREVIEW_CHARS = 80
+
+# Full records kept for the detail panes, and rows prefetched on each side
+# of the selection
+DETAIL_CACHE_SIZE = 500
+DETAIL_PREFETCH = 3
+
+# Table -> (SELECT of id + detail fields for the ids in {ids}, field labels)
+DETAIL_QUERIES = {
+    'engagements': ('''
+        SELECT
+            e.id,
+            e.date_time,
+            t.name,
+            u.name,
+            p.name,
+            s.name,
+            (
+                SELECT GROUP_CONCAT(r.name, ', ')
+                FROM engagement_participants ep
+                JOIN researchers r ON ep.researcher_id = r.id
+                WHERE ep.engagement_id = e.id
+            ),
+            e.summary,
+            e.action_items
+        FROM engagements e
+        LEFT JOIN engagement_types t ON e.type_id = t.id
+        LEFT JOIN engagement_statuses s ON e.status_id = s.id
+        LEFT JOIN units u ON e.unit_id = u.id
+        LEFT JOIN projects p ON e.project_id = p.id
+        WHERE e.id IN ({ids})
+    ''', (
+        'Date', 'Type', 'Unit', 'Project', 'Status', 'Participants',
+        'Summary', 'Action Items'
+    )),
+    'weekly_reviews': ('''
+        SELECT id, week_start, summary, highlights, challenges, next_steps
+        FROM weekly_reviews
+        WHERE id IN ({ids})
+    ''', ('Week Start', 'Summary', 'Highlights', 'Challenges', 'Next Steps')),
+    'units': ('''
+        SELECT u.id, u.name, t.name, u.location, u.commander, u.poc, u.notes
+        FROM units u
+        LEFT JOIN unit_types t ON u.type_id = t.id
+        WHERE u.id IN ({ids})
+    ''', ('Name', 'Type', 'Location', 'Commander', 'POC', 'Notes')),
+}
+
+
+def preview_sql(column, alias=None):
+    """SQL for the first PREVIEW_CHARS characters of a text column"""
+    return f'''
+        CASE WHEN length({column}) > {PREVIEW_CHARS}
+            THEN substr({column}, 1, {PREVIEW_CHARS}) || '...'
+            ELSE {column}
+        END AS {alias or column.split('.')[-1]}
+    '''
+
+
+def load_details(conn, table, record_ids):
+    """Return {id: [(label, value), ...]} with the full text of records"""
+    sql, labels = DETAIL_QUERIES[table]
+    placeholders = ', '.join('?' * len(record_ids))
+    cursor = conn.cursor()
+    cursor.execute(sql.format(ids=placeholders), list(record_ids))
+    return {
+        row[0]: list(zip(labels, row[1:]))
+        for row in cursor.fetchall()
+    }
+
+
+def create_report_window_tables(cursor, schema):
+    """Create the report window tables in a schema if missing"""
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {schema}.report_engagements (
+            id INTEGER PRIMARY KEY,
+            date_time DATE,
+            type_id INTEGER,
+            unit_id INTEGER,
+            project_id INTEGER,
+            status_id INTEGER
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {schema}.report_participants (
+            engagement_id INTEGER,
+            researcher_id INTEGER
+        )
+    ''')
+
+
+def prepare_report_window(conn, start_date, end_date):
+    """Copy the engagements of a report period into TEMP tables
+
+    Every engagement report reads report_engagements and
+    report_participants, so several reports over the same period share a
+    single range scan of the engagement tables.
+    """
+    cursor = conn.cursor()
+    create_report_window_tables(cursor, 'temp')
+    cursor.execute("DELETE FROM temp.report_engagements")
+    cursor.execute("DELETE FROM temp.report_participants")
+
+    # Plain range comparisons so the date_time index can be used
+    cursor.execute('''
+        INSERT INTO temp.report_engagements
+        SELECT id, date_time, type_id, unit_id, project_id, status_id
+        FROM all_engagements
+        WHERE date_time >= ? AND date_time < date(?, '+1 day')
+    ''', (start_date.isoformat(), end_date.isoformat()))
+    cursor.execute('''
+        INSERT INTO temp.report_participants
+        SELECT ep.engagement_id, ep.researcher_id
+        FROM all_engagement_participants ep
+        JOIN temp.report_engagements e ON e.id = ep.engagement_id
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS temp.idx_report_participants
+        ON report_participants (engagement_id)
+    ''')
+    conn.commit()
+
+
+def save_report_window(conn, path):
+    """Copy a prepared report window into a new database file
+
+    Connections that attach the file with attach_report_window() read the
+    window from it instead of scanning the engagement tables again.
+    """
+    cursor = conn.cursor()
+    cursor.execute("ATTACH DATABASE ? AS report_window", (path,))
+    try:
+        create_report_window_tables(cursor, 'report_window')
+        for table in ('report_engagements', 'report_participants'):
+            cursor.execute(f'''
+                INSERT INTO report_window.{table} SELECT * FROM temp.{table}
+            ''')
+        cursor.execute('''
+            CREATE INDEX report_window.idx_report_participants
+            ON report_participants (engagement_id)
+        ''')
+        conn.commit()
+    finally:
+        cursor.execute("DETACH DATABASE report_window")
+
+
+def attach_report_window(conn, path):
+    """Read the report window from a file written by save_report_window()
+
+    TEMP views stand in for the TEMP tables the reports read.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        "ATTACH DATABASE ? AS report_window",
+        (read_only_uri(path),)
+    )
+    for table in ('report_engagements', 'report_participants'):
+        cursor.execute(f'''
+            CREATE TEMP VIEW {table} AS SELECT * FROM report_window.{table}
+        ''')
+
+
+def unit_engagement_summary(conn, start_date, end_date):
+    """Engagement counts per unit with the projects and researchers involved"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT
+            u.name as unit_name,
+            COUNT(e.id) as engagement_count,
+            GROUP_CONCAT(DISTINCT p.name) as projects,
+            GROUP_CONCAT(DISTINCT r.name) as researchers
+        FROM units u
+        LEFT JOIN temp.report_engagements e ON u.id = e.unit_id
+        LEFT JOIN projects p ON e.project_id = p.id
+        LEFT JOIN temp.report_participants ep ON e.id = ep.engagement_id
+        LEFT JOIN researchers r ON ep.researcher_id = r.id
+        GROUP BY u.id
+        ORDER BY engagement_count DESC
+    ''')
+    columns = ['Unit', 'Total Engagements', 'Projects', 'Researchers']
+    return columns, cursor.fetchall()
+
+
+def researcher_activity(conn, start_date, end_date):
+    """Engagement counts per researcher with the units and projects involved"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT
+            r.name as researcher_name,
+            COUNT(e.id) as engagement_count,
+            GROUP_CONCAT(DISTINCT u.name) as units,
+            GROUP_CONCAT(DISTINCT p.name) as projects
+        FROM researchers r
+        LEFT JOIN temp.report_participants ep ON r.id = ep.researcher_id
+        LEFT JOIN temp.report_engagements e ON ep.engagement_id = e.id
+        LEFT JOIN units u ON e.unit_id = u.id
+        LEFT JOIN projects p ON e.project_id = p.id
+        GROUP BY r.id
+        ORDER BY engagement_count DESC
+    ''')
+    columns = ['Researcher', 'Total Engagements', 'Units', 'Projects']
+    return columns, cursor.fetchall()
+
+
+def project_status(conn, start_date, end_date):
+    """Engagement counts per project with the units and researchers involved"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT
+            p.name as project_name,
+            s.name as status,
+            COUNT(e.id) as engagement_count,
+            GROUP_CONCAT(DISTINCT u.name) as units,
+            GROUP_CONCAT(DISTINCT r.name) as researchers
+        FROM projects p
+        LEFT JOIN project_statuses s ON p.status_id = s.id
+        LEFT JOIN temp.report_engagements e ON p.id = e.project_id
+        LEFT JOIN units u ON e.unit_id = u.id
+        LEFT JOIN temp.report_participants ep ON e.id = ep.engagement_id
+        LEFT JOIN researchers r ON ep.researcher_id = r.id
+        GROUP BY p.id
+        ORDER BY engagement_count DESC
+    ''')
+    columns = [
+        'Project', 'Status', 'Total Engagements', 'Units', 'Researchers'
+    ]
+    return columns, cursor.fetchall()
+
+
+def weekly_review_summary(conn, start_date, end_date):
+    """Weekly reviews whose week starts within the period"""
+    week = WEEK_START_SQL.format('r.week_start')
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT
+            r.week_start,
+            COALESCE(w.engagement_count, 0),
+            (
+                SELECT GROUP_CONCAT(l.name || ': ' || t.engagement_count, ', ')
+                FROM weekly_rollup t
+                JOIN engagement_types l ON l.id = t.key
+                WHERE t.week_start = {week}
+                    AND t.dimension = 'type'
+                    AND t.engagement_count > 0
+            ),
+            r.summary,
+            r.highlights,
+            r.challenges,
+            r.next_steps
+        FROM weekly_reviews r
+        LEFT JOIN weekly_rollup w
+            ON w.week_start = {week}
+            AND w.dimension = 'total'
+            AND w.key = ''
+        WHERE date(r.week_start) BETWEEN date(?) AND date(?)
+        ORDER BY r.week_start DESC
+    ''', (start_date.isoformat(), end_date.isoformat()))
+    columns = [
+        'Week Starting', 'Engagements', 'Engagements by Type', 'Summary',
+        'Highlights', 'Challenges', 'Next Steps'
+    ]
+    return columns, cursor.fetchall()
+
+
+def format_list_report(labels):
+    """Build a line formatter for reports of counts and concatenated names
+
+    ``labels`` gives, per column, either a "Label:" shown before a single
+    value or a "Heading:" shown above the comma-separated names.
+    """
+    def format_rows(rows):
+        for row in rows:
+            for (label, is_list), value in zip(labels, row):
+                if not is_list:
+                    yield f"{label}: {value}"
+                elif value:
+                    yield f"{label}:"
+                    for name in value.split(','):
+                        yield f"  - {name.strip()}"
+            yield "-" * 50
+    return format_rows
+
+
+def format_weekly_reviews(rows):
+    """Line formatter for the Weekly Review Summary report"""
+    for row in rows:
+        yield f"Week Starting: {row[0]}"
+        yield f"Engagements: {row[1]}" + (f" ({row[2]})" if row[2] else "")
+        if row[3]:
+            yield "Summary:"
+            yield row[3]
+        if row[4]:
+            yield "\nHighlights:"
+            yield row[4]
+        if row[5]:
+            yield "\nChallenges:"
+            yield row[5]
+        if row[6]:
+            yield "\nNext Steps:"
+            yield row[6]
+        yield "-" * 50
+
+
+def format_project_status(rows):
+    """Line formatter for the Project Status report"""
+    format_rows = format_list_report([
+        ('Project', False),
+        ('Status', False),
+        ('Total Engagements', False),
+        ('Units Involved', True),
+        ('Researchers Involved', True),
+    ])
+    return format_rows(
+        (row[0], row[1] or 'Not Started') + tuple(row[2:]) for row in rows
+    )
+
+
+def engagement_cadence(conn, start_date, end_date):
+    """Weekly and monthly engagement cadence per unit and per project
+
+    The period's engagements are read once and binned into dense
+    entity x week and entity x month count matrices with NumPy, from
+    which averages, the rolling four-week trend and activity are derived
+    without any per-row Python.
+    """
+    import numpy as np
+    import pandas as pd
+
+    engagements = pd.read_sql_query('''
+        SELECT substr(date_time, 1, 10) AS day, unit_id, project_id
+        FROM temp.report_engagements
+    ''', conn)
+    days = pd.to_datetime(engagements['day'], format='%Y-%m-%d')
+
+    # Monday-aligned weeks and calendar months covering the period
+    start = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date)
+    first_week = start - pd.Timedelta(days=start.weekday())
+    n_weeks = (end - first_week).days // 7 + 1
+    n_months = (end.year - start.year) * 12 + end.month - start.month + 1
+    week = ((days - first_week).dt.days // 7).to_numpy()
+    month = (
+        (days.dt.year - start.year) * 12 + days.dt.month - start.month
+    ).to_numpy()
+
+    # The hot tables and the archives attached for this period
+    schemas = ['main'] + [
+        row[1] for row in conn.execute("PRAGMA database_list")
+        if row[1].startswith('archive_')
+    ]
+
+    rows = []
+    for level, table, key in (
+        ('Unit', 'units', 'unit_id'),
+        ('Project', 'projects', 'project_id'),
+    ):
+        entities = pd.read_sql_query(
+            f"SELECT id, name FROM {table} ORDER BY name",
+            conn
+        )
+        # One index seek per entity on ({key}, date_time) in each schema;
+        # going through the all_engagements view would materialize the
+        # union instead once archives are attached
+        last_contact = pd.concat([
+            pd.read_sql_query(f'''
+                SELECT
+                    t.id,
+                    (
+                        SELECT substr(MAX(e.date_time), 1, 10)
+                        FROM {schema}.engagements e
+                        WHERE e.{key} = t.id
+                            AND e.date_time < date(?, '+1 day')
+                    ) AS day
+                FROM main.{table} t
+            ''', conn, params=(end_date.isoformat(),))
+            for schema in schemas
+        ]).groupby('id')['day'].max()
+
+        n = len(entities)
+        position = pd.Index(entities['id']).get_indexer(engagements[key])
+        valid = position >= 0
+        weekly = np.bincount(
+            position[valid] * n_weeks + week[valid],
+            minlength=n * n_weeks
+        ).reshape(n, n_weeks)
+        monthly = np.bincount(
+            position[valid] * n_months + month[valid],
+            minlength=n * n_months
+        ).reshape(n, n_months)
+
+        # Rolling four-week sums from the cumulative weekly counts
+        cumulative = np.cumsum(weekly, axis=1)
+        padded = np.hstack([np.zeros((n, 8), dtype=cumulative.dtype), cumulative])
+        last_4 = padded[:, -1] - padded[:, -5]
+        previous_4 = padded[:, -5] - padded[:, -9]
+        trend = np.divide(
+            (last_4 - previous_4) * 100.0,
+            previous_4,
+            out=np.full(n, np.nan),
+            where=previous_4 > 0
+        )
+
+        last_day = pd.to_datetime(
+            entities['id'].map(last_contact)
+        )
+        total = weekly.sum(axis=1)
+        frame = pd.DataFrame({
+            'Level': level,
+            'Name': entities['name'],
+            'Total Engagements': total,
+            'Active Weeks': (weekly > 0).sum(axis=1),
+            'Avg per Week': np.round(total / n_weeks, 2),
+            'Avg per Month': np.round(monthly.mean(axis=1), 2),
+            'Last Contact': last_day.dt.strftime('%Y-%m-%d'),
+            'Days Since Last Contact': (end - last_day).dt.days.astype('Int64'),
+            'Last 4 Weeks': last_4,
+            'Previous 4 Weeks': previous_4,
+            'Trend %': np.round(trend, 1),
+        })
+        frame = frame.astype(object).where(frame.notna(), None)
+        rows.extend(frame.itertuples(index=False, name=None))
+
+    columns = [
+        'Level', 'Name', 'Total Engagements', 'Active Weeks',
+        'Avg per Week', 'Avg per Month', 'Last Contact',
+        'Days Since Last Contact', 'Last 4 Weeks', 'Previous 4 Weeks',
+        'Trend %'
+    ]
+    return columns, rows
+
+
+def format_cadence(rows):
+    """Line formatter for the Engagement Cadence report"""
+    for row in rows:
+        (level, name, total, active_weeks, per_week, per_month,
+         last_contact, days_since, last_4, previous_4, trend) = row
+        yield f"{level}: {name}"
+        yield (
+            f"Total Engagements: {total} in {active_weeks} active weeks "
+            f"({per_week} per week, {per_month} per month)"
+        )
+        if last_contact:
+            yield f"Last Contact: {last_contact} ({days_since} days ago)"
+        else:
+            yield "Last Contact: never"
+        trend_text = f", {trend:+}%" if trend is not None else ""
+        yield f"Last 4 Weeks: {last_4} (previous 4: {previous_4}{trend_text})"
+        yield "-" * 50
+
+
+# Engagements in one week at which a researcher counts as over-committed
+WORKLOAD_HIGH = 5
+
+# Heatmap colors for 0, 1, ... WORKLOAD_HIGH or more engagements in a week
+WORKLOAD_PALETTE = (
+    '#f7f7f7', '#fde0c5', '#facba6', '#f8b58b', '#f59e72', '#e4572e'
+)
+
+
+def id_positions(ids, values):
+    """Positions of values in a sorted id array, and which were found"""
+    import numpy as np
+    
+    positions = np.searchsorted(ids, values)
+    found = positions < len(ids)
+    found[found] = ids[positions[found]] == values[found]
+    return positions, found
+
+
+def workload_matrix(conn, start_date, end_date):
+    """Researcher x week engagement counts over a prepared report window
+
+    One bulk query fetches every (researcher, day offset) participation in
+    the window and NumPy bins them into a dense array. Returns (researcher
+    names, week start dates, counts) with a row per researcher, in id
+    order, and a column per Monday-aligned week.
+    """
+    import numpy as np
+    
+    first_monday = start_date - timedelta(days=start_date.weekday())
+    n_weeks = (end_date - first_monday).days // 7 + 1
+    weeks = [first_monday + timedelta(weeks=i) for i in range(n_weeks)]
+    
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, name FROM researchers ORDER BY id")
+    researchers = cursor.fetchall()
+    ids = np.array([row[0] for row in researchers], dtype=np.int64)
+    names = [row[1] for row in researchers]
+    
+    cursor.execute('''
+        SELECT
+            ep.researcher_id,
+            CAST(julianday(substr(e.date_time, 1, 10)) - julianday(?) AS INTEGER)
+        FROM temp.report_participants ep
+        JOIN temp.report_engagements e ON e.id = ep.engagement_id
+    ''', (first_monday.isoformat(),))
+    pairs = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 2)
+    
+    # Participations of deleted researchers drop out
+    row, known = id_positions(ids, pairs[:, 0])
+    week = pairs[:, 1] // 7
+    known &= (week >= 0) & (week < n_weeks)
+    
+    counts = np.bincount(
+        row[known] * n_weeks + week[known],
+        minlength=len(ids) * n_weeks
+    ).reshape(len(ids), n_weeks).astype(np.int32)
+    return names, weeks, counts
+
+
+def workload_order(counts):
+    """Row order for a workload matrix: most engagements, then highest peak"""
+    import numpy as np
+    
+    peaks = counts.max(axis=1) if counts.shape[1] else np.zeros(len(counts))
+    return np.lexsort((-peaks, -counts.sum(axis=1)))
+
+
+def workload_table(names, weeks, counts):
+    """Report columns and rows for a workload matrix, busiest first"""
+    columns = [
+        'Researcher', 'Total Engagements', 'Peak Week', 'Peak Count',
+        f'Weeks With {WORKLOAD_HIGH}+'
+    ] + [week.isoformat() for week in weeks]
+    
+    rows = []
+    for i in workload_order(counts):
+        week_counts = counts[i].tolist()
+        total = sum(week_counts)
+        peak = max(week_counts, default=0)
+        rows.append((
+            names[i],
+            total,
+            weeks[week_counts.index(peak)].isoformat() if total else None,
+            peak,
+            sum(1 for count in week_counts if count >= WORKLOAD_HIGH),
+        ) + tuple(week_counts))
+    return columns, rows
+
+
+def researcher_workload(conn, start_date, end_date):
+    """Per-week engagement counts for each researcher"""
+    return workload_table(*workload_matrix(conn, start_date, end_date))
+
+
+def format_workload(rows):
+    """Line formatter for the Researcher Workload report"""
+    for row in rows:
+        name, total, peak_week, peak, busy = row[:5]
+        if not total:
+            continue
+        yield f"Researcher: {name}"
+        yield f"Total Engagements: {total}"
+        yield f"Busiest Week: {peak_week} ({peak} engagements)"
+        yield f"Weeks With {WORKLOAD_HIGH} or More: {busy}"
+        yield "-" * 50
+
+
+def cached_workload(conn, db_path, start_date, end_date, cache):
+    """Return the workload matrix, reusing it while the data is unchanged
+
+    The cache entry is keyed by database and period and checked against
+    PRAGMA data_version (commits by other connections) and total_changes
+    (commits by this one), both read after the window was prepared.
+    """
+    def version():
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        return data_version, conn.total_changes
+    
+    key = (db_path, start_date, end_date)
+    if key in cache and cache[key][0] == version():
+        return cache[key][1]
+    
+    attach_archives(conn, db_path, start_date, end_date)
+    try:
+        prepare_report_window(conn, start_date, end_date)
+        result = workload_matrix(conn, start_date, end_date)
+    finally:
+        detach_archives(conn)
+    cache.clear()
+    cache[key] = (version(), result)
+    return result
+
+
+# Power iteration limits for eigenvector centrality in the network report
+NETWORK_ITERATIONS = 100
+NETWORK_TOLERANCE = 1e-6
+
+
+def network_matrices(conn):
+    """Sparse researcher x unit and researcher x researcher counts
+
+    One pass over the prepared report window gives a researcher x
+    engagement incidence matrix; the co-engagement counts are its product
+    with its transpose, whose diagonal is each researcher's engagement
+    count. Returns (researcher names, researcher x unit engagement counts,
+    researcher x researcher shared engagement counts), rows in id order.
+    """
+    import numpy as np
+    from scipy import sparse
+    
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, name FROM researchers ORDER BY id")
+    researchers = cursor.fetchall()
+    ids = np.array([row[0] for row in researchers], dtype=np.int64)
+    names = [row[1] for row in researchers]
+    cursor.execute("SELECT id FROM units ORDER BY id")
+    unit_ids = np.array([row[0] for row in cursor.fetchall()], dtype=np.int64)
+    
+    cursor.execute('''
+        SELECT ep.researcher_id, ep.engagement_id, IFNULL(e.unit_id, -1)
+        FROM temp.report_participants ep
+        JOIN temp.report_engagements e ON e.id = ep.engagement_id
+    ''')
+    triples = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 3)
+    
+    row, known = id_positions(ids, triples[:, 0])
+    row, triples = row[known], triples[known]
+    engagement_ids, column = np.unique(triples[:, 1], return_inverse=True)
+    ones = np.ones(len(row), dtype=np.int32)
+    incidence = sparse.csr_matrix(
+        (ones, (row, column)),
+        shape=(len(ids), len(engagement_ids))
+    )
+    
+    unit, in_unit = id_positions(unit_ids, triples[:, 2])
+    by_unit = sparse.csr_matrix(
+        (ones[in_unit], (row[in_unit], unit[in_unit])),
+        shape=(len(ids), len(unit_ids))
+    )
+    return names, by_unit, (incidence @ incidence.T).tocsr()
+
+
+def eigenvector_centrality(adjacency):
+    """Leading eigenvector of a symmetric sparse matrix, scaled to max 1
+
+    Power iteration on A + I, which shares A's eigenvectors but cannot
+    oscillate on bipartite components.
+    """
+    import numpy as np
+    
+    x = np.ones(adjacency.shape[0])
+    for _ in range(NETWORK_ITERATIONS):
+        step = adjacency @ x + x
+        norm = np.abs(step).max() if len(step) else 0
+        if not norm:
+            break
+        step /= norm
+        converged = np.abs(step - x).max() < NETWORK_TOLERANCE
+        x = step
+        if converged:
+            break
+    return x
+
+
+def researcher_network(conn, start_date, end_date):
+    """Units, collaborators and centrality per researcher, broadest first"""
+    import numpy as np
+    from scipy import sparse
+    
+    names, by_unit, co = network_matrices(conn)
+    engagements = co.diagonal()
+    units = by_unit.getnnz(axis=1)
+    
+    # Effective units: exp of the entropy of engagements over units, so one
+    # visit to a unit counts for less than a steady relationship
+    totals = np.asarray(by_unit.sum(axis=1)).ravel()
+    shares = (sparse.diags(1 / np.maximum(totals, 1)) @ by_unit).tocsr()
+    shares.data = -shares.data * np.log(shares.data)
+    effective_units = np.where(
+        totals > 0,
+        np.exp(np.asarray(shares.sum(axis=1)).ravel()),
+        0
+    )
+    
+    partners = (co - sparse.diags(engagements, dtype=co.dtype)).tocsr()
+    partners.eliminate_zeros()
+    collaborators = partners.getnnz(axis=1)
+    co_engagements = np.asarray(partners.sum(axis=1)).ravel()
+    
+    # Jaccard overlap of engagement sets with each collaborator
+    pairs = partners.tocoo()
+    overlap = sparse.csr_matrix(
+        (
+            pairs.data / (engagements[pairs.row] + engagements[pairs.col] - pairs.data),
+            (pairs.row, pairs.col)
+        ),
+        shape=partners.shape
+    )
+    closest = np.asarray(overlap.argmax(axis=1)).ravel()
+    best_overlap = overlap.max(axis=1).toarray().ravel()
+    centrality = eigenvector_centrality(partners) * (engagements > 0)
+    
+    rows = []
+    for i in np.lexsort((-centrality, -effective_units, -units)):
+        rows.append((
+            names[i],
+            int(engagements[i]),
+            int(units[i]),
+            round(float(effective_units[i]), 1),
+            int(collaborators[i]),
+            int(co_engagements[i]),
+            names[closest[i]] if collaborators[i] else None,
+            round(float(best_overlap[i]), 2),
+            round(float(centrality[i]), 3),
+        ))
+    
+    columns = [
+        'Researcher', 'Engagements', 'Units', 'Effective Units',
+        'Collaborators', 'Shared Engagements', 'Closest Collaborator',
+        'Overlap', 'Centrality'
+    ]
+    return columns, rows
+
+
+def format_network(rows):
+    """Line formatter for the Researcher Network report"""
+    for row in rows:
+        (name, engagements, units, effective_units, collaborators,
+         shared, closest, overlap, centrality) = row
+        if not engagements:
+            continue
+        yield f"Researcher: {name}"
+        yield (
+            f"Engagements: {engagements} across {units} units "
+            f"({effective_units} effective)"
+        )
+        yield f"Collaborators: {collaborators} ({shared} shared engagements)"
+        if closest:
+            yield f"Closest Collaborator: {closest} (overlap {overlap})"
+        yield f"Centrality: {centrality}"
+        yield "-" * 50
+
+
+def benchmark_network(sizes, researchers=10000, units=2000):
+    """Time the network report on synthetic engagements
+
+    Each engagement gets one to four random participants and a random
+    unit. Yields (engagements, participations, seconds to prepare the
+    report window, seconds to compute the report).
+    """
+    import random
+    
+    for size in sizes:
+        rng = random.Random(size)
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.cursor()
+        for parent in ('units', 'projects', 'researchers'):
+            cursor.execute(
+                f"CREATE TABLE {parent} (id INTEGER PRIMARY KEY, name TEXT)"
+            )
+        create_lookup_tables(cursor)
+        for table, schema in ENGAGEMENT_SCHEMAS.items():
+            cursor.execute(schema.format(table=table))
+        cursor.executemany(
+            "INSERT INTO researchers (id, name) VALUES (?, ?)",
+            ((i, f"Person {i}") for i in range(1, researchers + 1))
+        )
+        cursor.executemany(
+            "INSERT INTO units (id, name) VALUES (?, ?)",
+            ((i, f"Organization {i}") for i in range(1, units + 1))
+        )
+        cursor.executemany(
+            "INSERT INTO engagements (id, date_time, type_id, unit_id) "
+            "VALUES (?, '2024-01-01', 1, ?)",
+            ((i, rng.randint(1, units)) for i in range(1, size + 1))
+        )
+        cursor.executemany(
+            "INSERT OR IGNORE INTO engagement_participants VALUES (?, ?)",
+            (
+                (i, rng.randint(1, researchers))
+                for i in range(1, size + 1)
+                for _ in range(rng.randint(1, 4))
+            )
+        )
+        conn.commit()
+        create_archive_views(cursor, [])
+        
+        day = datetime(2024, 1, 1).date()
+        started = time.perf_counter()
+        prepare_report_window(conn, day, day)
+        prepared = time.perf_counter()
+        researcher_network(conn, day, day)
+        finished = time.perf_counter()
+        participations = cursor.execute(
+            "SELECT COUNT(*) FROM engagement_participants"
+        ).fetchone()[0]
+        conn.close()
+        yield size, participations, prepared - started, finished - prepared
+
+
+# Report name -> (data function, line formatter, export file prefix)
+REPORT_TYPES = {
+    'Unit Engagement Summary': (
+        unit_engagement_summary,
+        format_list_report([
+            ('Unit', False),
+            ('Total Engagements', False),
+            ('Projects Involved', True),
+            ('Researchers Involved', True),
+        ]),
+        'unit_engagement_report'
+    ),
+    'Researcher Activity': (
+        researcher_activity,
+        format_list_report([
+            ('Researcher', False),
+            ('Total Engagements', False),
+            ('Units Engaged', True),
+            ('Projects Involved', True),
+        ]),
+        'researcher_activity_report'
+    ),
+    'Project Status': (
+        project_status,
+        format_project_status,
+        'project_status_report'
+    ),
+    'Weekly Review Summary': (
+        weekly_review_summary,
+        format_weekly_reviews,
+        'weekly_review_report'
+    ),
+    'Engagement Cadence': (
+        engagement_cadence,
+        format_cadence,
+        'engagement_cadence_report'
+    ),
+    'Researcher Workload': (
+        researcher_workload,
+        format_workload,
+        'researcher_workload_report'
+    ),
+    'Researcher Network': (
+        researcher_network,
+        format_network,
+        'researcher_network_report'
+    ),
+}
+
+
+def run_report(conn, report_type, start_date, end_date):
+    """Return (columns, rows) for a report over a prepared report window"""
+    fetch = REPORT_TYPES[report_type][0]
+    return fetch(conn, start_date, end_date)
+
+
+def report_lines(report_type, rows, start_date, end_date):
+    """Yield the preview text of a report, line by line"""
+    yield f"{report_type} Report"
+    yield f"Period: {start_date} to {end_date}\n"
+    yield from REPORT_TYPES[report_type][1](rows)
+
+
+# Preview lines per page, and pages kept in the preview widget at once
+REPORT_PAGE_LINES = 200
+REPORT_WINDOW_PAGES = 3
+
+
+class ReportPages:
+    """Pages of report preview lines, read from a line iterator on demand
+
+    Pages already read are kept so the preview can scroll back; pages past
+    the furthest one shown are never formatted.
+    """
+
+    def __init__(self, lines, page_lines=REPORT_PAGE_LINES):
+        self._lines = iter(lines)
+        self.page_lines = page_lines
+        self.pages = []
+        self.complete = False
+
+    def page(self, number):
+        """Return page number as a list of lines, or None past the end"""
+        while len(self.pages) <= number and not self.complete:
+            page = []
+            for line in self._lines:
+                page.append(line)
+                if len(page) == self.page_lines:
+                    break
+            else:
+                self.complete = True
+            if page:
+                self.pages.append(page)
+        return self.pages[number] if number < len(self.pages) else None
+
+
+def report_filename(report_type, extension, folder=''):
+    """Return a timestamped export file name for a report"""
+    prefix = REPORT_TYPES[report_type][2]
+    return os.path.join(
+        folder,
+        f"{prefix}_{datetime.now():%Y%m%d_%H%M%S}.{extension}"
+    )
+
+
+def open_report_connection(db_path, start_date, end_date, window=None):
+    """Open a read-only connection prepared for reports over a period
+
+    With window, the path of a file from save_report_window(), the period
+    is read from that file instead of being prepared again.
+    """
+    conn = sqlite3.connect(read_only_uri(db_path), uri=True)
+    try:
+        attach_archives(conn, db_path, start_date, end_date)
+        if window:
+            attach_report_window(conn, window)
+        else:
+            prepare_report_window(conn, start_date, end_date)
+    except (ValueError, sqlite3.Error):
+        conn.close()
+        raise
+    return conn
+
+
+def compute_reports(db_path, report_types, start_date, end_date,
+                    max_workers=None):
+    """Compute several reports concurrently
+
+    The period's engagements are prepared once and saved to a scratch
+    database; each report then runs on its own read-only connection
+    reading that window, in a worker thread. sqlite3 releases the GIL
+    while a query runs, so the total time is close to that of the
+    slowest report. Returns a dict of report type to (columns, rows) in
+    the order requested.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        window = os.path.join(folder, 'report_window.db')
+        conn = open_report_connection(db_path, start_date, end_date)
+        try:
+            save_report_window(conn, window)
+        finally:
+            conn.close()
+
+        def compute(report_type):
+            conn = open_report_connection(db_path, start_date, end_date, window)
+            try:
+                return run_report(conn, report_type, start_date, end_date)
+            finally:
+                conn.close()
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers or len(report_types),
+            thread_name_prefix='report'
+        ) as pool:
+            futures = {
+                report_type: pool.submit(compute, report_type)
+                for report_type in report_types
+            }
+            return {
+                report_type: future.result()
+                for report_type, future in futures.items()
+            }
+
+
+def write_workbook(path, reports):
+    """Write several reports as the sheets of one Excel workbook"""
+    import pandas as pd
+    with pd.ExcelWriter(path) as writer:
+        for report_type, (columns, rows) in reports.items():
+            pd.DataFrame(rows, columns=columns).to_excel(
+                writer,
+                sheet_name=report_type[:31],
+                index=False
+            )
+
+
+# Rows handed to an export writer at a time
+EXPORT_CHUNK_ROWS = 5000
+
+# Export format -> (file extension, file dialog label, writer). Writers take
+# (path, columns, rows) where rows is any iterable of tuples, including a
+# cursor, and are registered with @exporter.
+EXPORTERS = {}
+
+
+def exporter(name, extension, label):
+    """Register a function writing (path, columns, rows) as an export format"""
+    def register(write):
+        EXPORTERS[name] = (extension, label, write)
+        return write
+    return register
+
+
+def row_chunks(rows, size=EXPORT_CHUNK_ROWS):
+    """Yield lists of up to size rows from a list, iterator or cursor"""
+    if hasattr(rows, 'fetchmany'):
+        while True:
+            chunk = rows.fetchmany(size)
+            if not chunk:
+                return
+            yield chunk
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+@exporter('xlsx', 'xlsx', "Excel workbook")
+def write_xlsx(path, columns, rows):
+    """Write report rows to an Excel sheet
+
+    openpyxl needs the whole sheet in memory, so this is the one writer
+    that does not stream.
+    """
+    import pandas as pd
+    pd.DataFrame(list(rows), columns=columns).to_excel(path, index=False)
+
+
+@exporter('csv', 'csv', "CSV")
+def write_csv(path, columns, rows):
+    """Stream report rows to a CSV file"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for chunk in row_chunks(rows):
+            writer.writerows(chunk)
+
+
+def json_default(value):
+    """Encode the NumPy scalars and dates that reports may contain"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+@exporter('jsonl', 'jsonl', "JSON Lines")
+def write_jsonl(path, columns, rows):
+    """Stream report rows to a JSON Lines file, one object per row"""
+    encoder = json.JSONEncoder(default=json_default, ensure_ascii=False)
+    with open(path, 'w', encoding='utf-8') as f:
+        for chunk in row_chunks(rows):
+            f.writelines(
+                encoder.encode(dict(zip(columns, row))) + '\n'
+                for row in chunk
+            )
+
+
+def arrow_batches(columns, rows):
+    """Yield (schema, record batch) per chunk of rows, for pyarrow writers
+
+    Column types come from the first chunk; columns that are empty there
+    are written as strings, converting any values later chunks hold.
+    """
+    import pyarrow as pa
+    schema = None
+    as_text = set()
+    for chunk in row_chunks(rows):
+        values = list(zip(*chunk))
+        if schema is None:
+            fields = []
+            for i, (name, column) in enumerate(zip(columns, values)):
+                column_type = pa.array(column).type
+                if pa.types.is_null(column_type):
+                    column_type = pa.string()
+                    as_text.add(i)
+                fields.append(pa.field(name, column_type))
+            schema = pa.schema(fields)
+        for i in as_text:
+            values[i] = [None if v is None else str(v) for v in values[i]]
+        arrays = [
+            pa.array(column, type=field.type)
+            for column, field in zip(values, schema)
+        ]
+        yield schema, pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_arrow(path, columns, rows, open_writer):
+    """Stream record batches to the writer open_writer(path, schema) returns"""
+    import pyarrow as pa
+    writer = None
+    try:
+        for schema, batch in arrow_batches(columns, rows):
+            if writer is None:
+                writer = open_writer(path, schema)
+            writer.write_batch(batch)
+        if writer is None:
+            # No rows: still write the column names
+            schema = pa.schema([pa.field(name, pa.string()) for name in columns])
+            writer = open_writer(path, schema)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+@exporter('parquet', 'parquet', "Parquet")
+def write_parquet(path, columns, rows):
+    """Stream report rows to a Parquet file, one row group per chunk"""
+    import pyarrow.parquet as pq
+    write_arrow(path, columns, rows, pq.ParquetWriter)
+
+
+@exporter('feather', 'feather', "Feather (Arrow IPC)")
+def write_feather(path, columns, rows):
+    """Stream report rows to a Feather v2 (Arrow IPC) file"""
+    import pyarrow as pa
+    write_arrow(path, columns, rows, pa.ipc.new_file)
+
+
+def write_report(path, columns, rows, file_format):
+    """Write report rows to a file in one of the EXPORTERS formats"""
+    EXPORTERS[file_format][2](path, columns, rows)
+
+
+def benchmark_exporters(row_count, folder, formats=None):
+    """Time each export writer on synthetic report rows
+
+    Yields (format, seconds, rows per second, file size in bytes).
+    """
+    columns = ['Name', 'Type', 'Engagements', 'Average', 'Last Contact', 'Names']
+    rows = [
+        (
+            f"Organization {i}",
+            ('Meeting', 'Site Visit', 'Workshop')[i % 3],
+            i % 97,
+            (i % 1000) / 7,
+            f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            ', '.join(f"Person {j}" for j in range(i % 5)),
+        )
+        for i in range(row_count)
+    ]
+    for file_format in formats or list(EXPORTERS):
+        extension = EXPORTERS[file_format][0]
+        path = os.path.join(folder, f"benchmark.{extension}")
+        started = time.perf_counter()
+        write_report(path, columns, rows, file_format)
+        elapsed = time.perf_counter() - started
+        yield file_format, elapsed, row_count / elapsed, os.path.getsize(path)
+        os.remove(path)
+
+
+# How often the Tk loop collects finished data service requests
+DATA_POLL_MS = 20
+
+
+def open_connection(db_path, config):
+    """Open a connection with the app's settings applied"""
+    conn = sqlite3.connect(
+        db_path,
+        detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+    )
+    apply_pragmas(conn, config)
+    conn.execute("PRAGMA foreign_keys=ON")
+    # Reports read the all_* views, which live in each connection
+    create_archive_views(conn.cursor(), [])
+    return conn
+
+
+def execute_write(conn, sql, params=(), lookups=()):
+    """Run one write statement and return the new row id
+
+    lookups are (table, name) pairs added first, for statements that
+    code a name with lookup_sql().
+    """
+    for table, name in lookups:
+        add_lookup(conn, table, name)
+    return conn.execute(sql, params).lastrowid
+
+
+def fetch_all(conn, sql, params=()):
+    """Run a query and return all its rows"""
+    return conn.execute(sql, params).fetchall()
+
+
+def write_engagement(conn, values, researcher_ids, engagement_id=None):
+    """Insert or update an engagement and replace its participants
+
+    values are (date_time, type, unit_id, project_id, summary, status,
+    action_items), with the type and status by name; names not in their
+    lookup table yet are added. The action item rows are parsed again
+    from the text. Returns the engagement id.
+    """
+    cursor = conn.cursor()
+    add_lookup(cursor, 'engagement_types', values[1])
+    add_lookup(cursor, 'engagement_statuses', values[5])
+    engagement_type = lookup_sql('engagement_types')
+    status = lookup_sql('engagement_statuses')
+    if engagement_id is None:
+        cursor.execute(f'''
+            INSERT INTO engagements (
+                date_time, type_id, unit_id, project_id,
+                summary, status_id, action_items
+            )
+            VALUES (?, {engagement_type}, ?, ?, ?, {status}, ?)
+        ''', values)
+        engagement_id = cursor.lastrowid
+    else:
+        cursor.execute(f'''
+            UPDATE engagements SET
+                date_time = ?,
+                type_id = {engagement_type},
+                unit_id = ?,
+                project_id = ?,
+                summary = ?,
+                status_id = {status},
+                action_items = ?
+            WHERE id = ?
+        ''', tuple(values) + (engagement_id,))
+        cursor.execute(
+            "DELETE FROM engagement_participants WHERE engagement_id = ?",
+            (engagement_id,)
+        )
+    
+    cursor.executemany('''
+        INSERT INTO engagement_participants (engagement_id, researcher_id)
+        VALUES (?, ?)
+    ''', [(engagement_id, researcher_id) for researcher_id in researcher_ids])
+    sync_action_items(conn, engagement_id, values[6])
+    return engagement_id
+
+
+class DataService(threading.Thread):
+    """Run database requests on a dedicated thread and connection
+
+    submit(job, *args) queues job(conn, *args) and returns a Future. Jobs
+    run one at a time in order, each in its own transaction: committed when
+    the job returns, rolled back if it raises.
+    """
+
+    def __init__(self, db_path, config):
+        super().__init__(name='data-service', daemon=True)
+        self.db_path = db_path
+        self.config = config
+        self._requests = queue.Queue()
+        # Warm connections by database path, most recent last
+        self._connections = OrderedDict()
+
+    def submit(self, job, *args):
+        """Queue job(conn, *args) and return a Future for its result"""
+        future = Future()
+        self._requests.put((future, job, args))
+        return future
+
+    def switch(self, db_path):
+        """Send the requests queued after this one to another database"""
+        def use(conn):
+            self.db_path = db_path
+        return self.submit(use)
+
+    def stop(self):
+        """Stop once the requests already queued have run"""
+        self._requests.put(None)
+
+    def connection(self):
+        """Return the connection for the current database"""
+        conn = self._connections.pop(self.db_path, None)
+        if conn is None:
+            conn = open_connection(self.db_path, self.config)
+        self._connections[self.db_path] = conn
+        while len(self._connections) > WARM_WORKSPACES:
+            _, old = self._connections.popitem(last=False)
+            old.close()
+        return conn
+
+    def run(self):
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            future, job, args = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                conn = self.connection()
+                with conn:
+                    result = job(conn, *args)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        
+        for conn in self._connections.values():
+            conn.close()
+
+
+# JSON API: rows per page by default and at most, pool size, and how many
+# computed reports are kept for paging through
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+API_POOL_SIZE = 4
+API_REPORT_CACHE = 16
+
+# Smaller bodies are not worth compressing
+API_GZIP_MIN_BYTES = 1024
+
+# Resource -> query of its rows after an id, in id order (keyset paging)
+API_RESOURCES = {
+    'units': "SELECT * FROM units WHERE id > ? ORDER BY id LIMIT ?",
+    'researchers': "SELECT * FROM researchers WHERE id > ? ORDER BY id LIMIT ?",
+    'projects': "SELECT * FROM projects WHERE id > ? ORDER BY id LIMIT ?",
+    'engagements': '''
+        SELECT
+            e.*,
+            (
+                SELECT json_group_array(ep.researcher_id)
+                FROM engagement_participants ep
+                WHERE ep.engagement_id = e.id
+            ) AS participant_ids
+        FROM engagements e
+        WHERE e.id > ?
+        ORDER BY e.id
+        LIMIT ?
+    ''',
+    'weekly_reviews': (
+        "SELECT * FROM weekly_reviews WHERE id > ? ORDER BY id LIMIT ?"
+    ),
+    'engagement_types': (
+        "SELECT * FROM engagement_types WHERE id > ? ORDER BY id LIMIT ?"
+    ),
+    'engagement_statuses': (
+        "SELECT * FROM engagement_statuses WHERE id > ? ORDER BY id LIMIT ?"
+    ),
+    'project_statuses': (
+        "SELECT * FROM project_statuses WHERE id > ? ORDER BY id LIMIT ?"
+    ),
+    'unit_types': "SELECT * FROM unit_types WHERE id > ? ORDER BY id LIMIT ?",
+}
+
+
+def report_slug(report_type):
+    """URL name of a report, e.g. 'unit-engagement-summary'"""
+    return report_type.lower().replace(' ', '-')
+
+
+class ReadPool:
+    """A fixed set of read-only connections shared by request threads"""
+
+    def __init__(self, db_path, size=API_POOL_SIZE):
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(sqlite3.connect(
+                read_only_uri(db_path),
+                uri=True,
+                check_same_thread=False
+            ))
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Borrow a connection, waiting if all are in use"""
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+            self._idle.put(conn)
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+class DataGeneration:
+    """Count the commits made to the database by anyone
+
+    PRAGMA data_version on one watching connection changes whenever another
+    connection or process commits; each change starts a new generation,
+    which the API uses as its ETag.
+    """
+
+    def __init__(self, db_path):
+        self._conn = sqlite3.connect(
+            read_only_uri(db_path),
+            uri=True,
+            check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self._version = None
+        self.generation = 0
+
+    def current(self):
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._version:
+                self._version = version
+                self.generation += 1
+            return self.generation
+
+    def close(self):
+        self._conn.close()
+
+
+class ApiServer(ThreadingHTTPServer):
+    """Read-only JSON API over a database, for other local tools"""
+
+    daemon_threads = True
+
+    def __init__(self, db_path, port, pool_size=API_POOL_SIZE):
+        super().__init__(('127.0.0.1', port), ApiHandler)
+        self.db_path = db_path
+        self.pool = ReadPool(db_path, pool_size)
+        self.data_generation = DataGeneration(db_path)
+        # ETags from an earlier run must not match this one's generations
+        self.instance = f"{int(time.time()):x}"
+        self.reports = OrderedDict()
+        self.reports_lock = threading.Lock()
+
+    def etag(self):
+        return f'"{self.instance}-{self.data_generation.current()}"'
+
+    def report(self, report_type, start_date, end_date, etag):
+        """Return (columns, rows) of a report, computed once per generation"""
+        key = (report_type, start_date, end_date, etag)
+        with self.reports_lock:
+            if key in self.reports:
+                self.reports.move_to_end(key)
+                return self.reports[key]
+        
+        with self.pool.connection() as conn:
+            try:
+                attach_archives(conn, self.db_path, start_date, end_date)
+                prepare_report_window(conn, start_date, end_date)
+                result = run_report(conn, report_type, start_date, end_date)
+            finally:
+                detach_archives(conn)
+        
+        with self.reports_lock:
+            self.reports[key] = result
+            while len(self.reports) > API_REPORT_CACHE:
+                self.reports.popitem(last=False)
+        return result
+
+    def server_close(self):
+        super().server_close()
+        self.pool.close()
+        self.data_generation.close()
+
+
+class ApiError(Exception):
+    """A request the API answers with an HTTP error status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """GET handler for the JSON API
+
+    /                          resources and reports available
+    /<resource>?after=&limit=  rows in id order; 'next' links the next page
+    /reports/<name>?from=&to=&offset=&limit=
+                               a report's rows over a period
+    """
+
+    server_version = 'EngageCRM'
+
+    def do_GET(self):
+        # Refuse names other than the loopback ones (DNS rebinding)
+        host = (self.headers.get('Host') or '').rsplit(':', 1)[0]
+        if host not in ('127.0.0.1', 'localhost'):
+            self.send_error(403, "Only local requests are served")
+            return
+        
+        url = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        etag = self.server.etag()
+        known = (self.headers.get('If-None-Match') or '').split(',')
+        if etag in (tag.strip() for tag in known):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        
+        parts = [part for part in url.path.split('/') if part]
+        try:
+            if not parts:
+                payload = self.index()
+            elif parts[0] in API_RESOURCES and len(parts) == 1:
+                payload = self.resource_page(parts[0], query)
+            elif parts[0] == 'reports' and len(parts) == 2:
+                payload = self.report_page(parts[1], query, etag)
+            else:
+                raise ApiError(404, "Not found")
+        except ApiError as e:
+            self.send_json({'error': str(e)}, status=e.status)
+            return
+        except (ValueError, sqlite3.Error) as e:
+            self.send_json({'error': str(e)}, status=400)
+            return
+        self.send_json(payload, etag=etag)
+
+    def index(self):
+        return {
+            'resources': [f"/{name}" for name in API_RESOURCES],
+            'reports': [
+                f"/reports/{report_slug(report_type)}"
+                for report_type in REPORT_TYPES
+            ],
+        }
+
+    def int_param(self, query, name, default, maximum=None, minimum=0):
+        try:
+            value = int(query.get(name, [default])[0])
+        except ValueError:
+            raise ApiError(400, f"{name} must be an integer")
+        if value < minimum:
+            raise ApiError(400, f"{name} must be at least {minimum}")
+        return min(value, maximum) if maximum else value
+
+    def resource_page(self, resource, query):
+        limit = self.int_param(
+            query, 'limit', API_PAGE_SIZE, API_MAX_PAGE_SIZE, minimum=1
+        )
+        after = self.int_param(query, 'after', 0)
+        with self.server.pool.connection() as conn:
+            cursor = conn.execute(API_RESOURCES[resource], (after, limit))
+            columns = [column[0] for column in cursor.description]
+            items = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        for item in items:
+            if 'participant_ids' in item:
+                item['participant_ids'] = json.loads(item['participant_ids'])
+        
+        next_page = None
+        if len(items) == limit:
+            next_page = f"/{resource}?after={items[-1]['id']}&limit={limit}"
+        return {'items': items, 'next': next_page}
+
+    def report_page(self, slug, query, etag):
+        names = {report_slug(report_type): report_type for report_type in REPORT_TYPES}
+        if slug not in names:
+            raise ApiError(404, f"No report named {slug}")
+        try:
+            start_date = parse_date(query['from'][0])
+            end_date = parse_date(query['to'][0])
+        except (KeyError, argparse.ArgumentTypeError):
+            raise ApiError(400, "from and to are required as YYYY-MM-DD")
+        limit = self.int_param(
+            query, 'limit', API_PAGE_SIZE, API_MAX_PAGE_SIZE, minimum=1
+        )
+        offset = self.int_param(query, 'offset', 0)
+        
+        columns, rows = self.server.report(names[slug], start_date, end_date, etag)
+        page = rows[offset:offset + limit]
+        next_page = None
+        if offset + limit < len(rows):
+            next_page = (
+                f"/reports/{slug}?from={start_date}&to={end_date}"
+                f"&offset={offset + limit}&limit={limit}"
+            )
+        return {
+            'columns': list(columns),
+            'rows': [list(row) for row in page],
+            'total': len(rows),
+            'next': next_page,
+        }
+
+    def send_json(self, payload, status=200, etag=None):
+        body = json.dumps(payload, default=json_default).encode('utf-8')
+        accepts_gzip = 'gzip' in (self.headers.get('Accept-Encoding') or '')
+        gzipped = accepts_gzip and len(body) >= API_GZIP_MIN_BYTES
+        if gzipped:
+            body = gzip.compress(body, compresslevel=5)
+        
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StartupProfile:
+    """Wall-clock time of each startup phase, written out as JSON
+
+    lap(name) closes the phase running since the previous lap; record()
+    times a phase that ran alongside others, such as a list refresh
+    finishing on the data service. With a cProfile path the main thread
+    is also profiled from creation until finish().
+    """
+
+    def __init__(self, path, budget=None, cprofile_path=None):
+        self.path = path
+        self.budget = budget
+        self.cprofile_path = cprofile_path
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.last_lap = self.started
+        self.phases = []
+        self.result = None
+        self.profiler = None
+        if cprofile_path:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def record(self, name, started):
+        """Add a phase that began at a perf_counter() time and ends now"""
+        self.phases.append({
+            'name': name,
+            'start': round(started - self.started, 6),
+            'seconds': round(time.perf_counter() - started, 6),
+        })
+
+    def lap(self, name):
+        """Add the phase since the previous lap"""
+        self.record(name, self.last_lap)
+        self.last_lap = time.perf_counter()
+
+    def finish(self, db_path):
+        """Write the breakdown with the database's size and return it"""
+        total = time.perf_counter() - self.started
+        top_functions = None
+        if self.profiler:
+            import pstats
+            
+            self.profiler.disable()
+            self.profiler.dump_stats(self.cprofile_path)
+            top_functions = profile_functions(pstats.Stats(self.profiler))
+        
+        # Engagements are counted in a separate connection, after the clock
+        # has stopped
+        conn = sqlite3.connect(read_only_uri(db_path), uri=True)
+        try:
+            engagements = conn.execute(
+                "SELECT COUNT(*) FROM engagements"
+            ).fetchone()[0]
+            size, _ = database_size(conn, db_path)
+        finally:
+            conn.close()
+        
+        self.result = {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'database': db_path,
+            'database_bytes': size,
+            'engagements': engagements,
+            'python': sys.version.split()[0],
+            'total_seconds': round(total, 6),
+            'budget_seconds': self.budget,
+            'over_budget': self.budget is not None and total > self.budget,
+            'phases': self.phases,
+            'cprofile': self.cprofile_path,
+            'top_functions': top_functions,
+        }
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.result, f, indent=2)
+        return self.result
+
+
+# Diagnostics bundles are saved in this folder next to the database; each
+# lists this many functions, allocation sites and statements per action
+DIAGNOSTICS_DIRNAME = 'diagnostics'
+DIAGNOSTICS_TOP = 25
+DIAGNOSTICS_ACTIONS = 5
+
+# Literals folded out of traced SQL so repeated statements are counted as one
+SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def profile_functions(stats, limit=DIAGNOSTICS_TOP):
+    """The functions with the most cumulative time in pstats.Stats"""
+    slowest = sorted(stats.stats.items(), key=lambda item: -item[1][3])
+    return [
+        {
+            'function': f"{os.path.basename(filename)}:{line}({name})",
+            'calls': calls,
+            'own_seconds': round(own, 6),
+            'cumulative_seconds': round(cumulative, 6),
+        }
+        for (filename, line, name), (_, calls, own, cumulative, _)
+        in slowest[:limit]
+    ]
+
+
+def memory_snapshot():
+    """A tracemalloc snapshot leaving out the profiling tools' allocations"""
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '*cProfile.py'),
+        tracemalloc.Filter(False, '*pstats.py'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ))
+
+
+class ThreadProfile:
+    """Profile the calling thread into the stats layout pstats reads
+
+    From Python 3.12 cProfile is one process-wide tool, so a second
+    profiler cannot start while another thread is being profiled. This
+    collects through sys.setprofile, which is per thread, so the Tk
+    thread and the threads it hands work to are profiled side by side.
+    """
+
+    def __init__(self):
+        # code object or C function label -> [primitive calls, calls,
+        # own seconds, cumulative seconds, {caller: [the same four]}]
+        self.counts = {}
+        # Open calls as [frame, function, started, seconds in callees]
+        self.stack = []
+        # How many times each function is open, to tell recursive calls
+        self.open = Counter()
+        self.previous = None
+        self.stats = {}
+
+    def enable(self):
+        self.previous = sys.getprofile()
+        sys.setprofile(self.dispatch)
+
+    def disable(self):
+        sys.setprofile(self.previous)
+        # Calls still open are counted up to now
+        now = time.perf_counter()
+        while self.stack:
+            self.leave(now)
+
+    def create_stats(self):
+        """Fill self.stats as pstats.Stats expects to find it"""
+        def key(function):
+            if isinstance(function, str):
+                return ('~', 0, function)
+            return (function.co_filename, function.co_firstlineno, function.co_name)
+        
+        self.stats = {
+            # pstats lists calls before primitive calls for the callers
+            key(function): (*totals, {
+                key(caller): (calls, primitive, own, cumulative)
+                for caller, (primitive, calls, own, cumulative) in callers.items()
+            })
+            for function, (*totals, callers) in self.counts.items()
+        }
+
+    def dispatch(self, frame, event, arg):
+        now = time.perf_counter()
+        if event == 'call':
+            function = frame.f_code
+        elif event == 'c_call':
+            function = builtin_label(arg)
+        else:
+            # return, c_return or c_exception; returns from calls made
+            # before enable() have no entry
+            stack = self.stack
+            if stack and stack[-1][0] is frame and (
+                (event == 'return') != isinstance(stack[-1][1], str)
+            ):
+                self.leave(now)
+            return
+        self.stack.append([frame, function, now, 0.0])
+        self.open[function] += 1
+
+    def leave(self, now):
+        """Count the innermost open call as returned at now"""
+        _, function, started, inner = self.stack.pop()
+        seconds = now - started
+        self.open[function] -= 1
+        # Only the outermost of recursive calls adds cumulative time
+        outermost = not self.open[function]
+        counts = self.counts.get(function)
+        if counts is None:
+            counts = self.counts[function] = [0, 0, 0.0, 0.0, {}]
+        rows = [counts]
+        if self.stack:
+            caller = self.stack[-1]
+            caller[3] += seconds
+            row = counts[4].get(caller[1])
+            if row is None:
+                row = counts[4][caller[1]] = [0, 0, 0.0, 0.0]
+            rows.append(row)
+        for row in rows:
+            row[1] += 1
+            row[2] += seconds - inner
+            if outermost:
+                row[0] += 1
+                row[3] += seconds
+
+
+def builtin_label(function):
+    """Name a C function the way cProfile does"""
+    name = getattr(function, '__name__', repr(function))
+    owner = getattr(function, '__objclass__', None)
+    bound = getattr(function, '__self__', None)
+    if owner is None and bound is not None and not isinstance(bound, type(sys)):
+        owner = type(bound)
+    if owner is None:
+        module = getattr(function, '__module__', None)
+        return f"<built-in method {module}.{name}>" if module else f"<built-in method {name}>"
+    owner_name = owner.__qualname__
+    if owner.__module__ != 'builtins':
+        owner_name = f"{owner.__module__}.{owner_name}"
+    return f"<method '{name}' of '{owner_name}' objects>"
+
+
+class DiagnosticAction:
+    """Timings, profiles, SQL and memory gathered for one UI action"""
+
+    def __init__(self, name, number):
+        self.name = name
+        self.number = number
+        self.started = time.perf_counter()
+        # The action stays open while its Tk-side call runs and until every
+        # piece of work it sent off the Tk thread has been handled
+        self.open = True
+        self.pending = 0
+        self.profiles = []
+        self.jobs = []
+        self.statements = Counter()
+        self.snapshot = memory_snapshot()
+        self.summary = None
+        self.stats = None
+
+    def note_sql(self, statement):
+        """Count a traced statement with its literals folded out"""
+        self.statements[SQL_LITERALS.sub('?', ' '.join(statement.split()))] += 1
+
+    def summarize(self, started):
+        """Fold the gathered data into the action's summary"""
+        import pstats
+        
+        seconds = time.perf_counter() - self.started
+        self.stats = pstats.Stats(*self.profiles)
+        sqlite_calls = sorted(
+            (
+                (name, calls, cumulative)
+                for (filename, _, name), (_, calls, _, cumulative, _)
+                in self.stats.stats.items()
+                if filename == '~' and 'sqlite3.' in name
+            ),
+            key=lambda call: -call[2]
+        )
+        
+        allocations = memory_snapshot().compare_to(self.snapshot, 'lineno')
+        self.summary = {
+            'action': self.name,
+            'start': round(self.started - started, 6),
+            'seconds': round(seconds, 6),
+            'jobs': self.jobs,
+            'profile': f"{self.number:02d}_{self.name}.prof",
+            'traced_memory_bytes': tracemalloc.get_traced_memory()[0],
+            'top_functions': profile_functions(self.stats),
+            'top_allocations': [
+                {
+                    'site': f"{frame.filename}:{frame.lineno}",
+                    'size_diff': stat.size_diff,
+                    'count_diff': stat.count_diff,
+                    'size': stat.size,
+                }
+                for stat in allocations[:DIAGNOSTICS_TOP]
+                for frame in stat.traceback[:1]
+            ],
+            'sql': {
+                'statements': sum(self.statements.values()),
+                'top_statements': [
+                    {'sql': statement, 'count': count}
+                    for statement, count
+                    in self.statements.most_common(DIAGNOSTICS_TOP)
+                ],
+                'sqlite_calls': [
+                    {'call': name, 'calls': calls, 'seconds': round(cumulative, 6)}
+                    for name, calls, cumulative in sqlite_calls
+                ],
+            },
+        }
+        # The snapshot is the bulk of the memory an action holds
+        self.snapshot = None
+
+
+class DiagnosticsCapture:
+    """Profile the next few UI actions and save them as a bundle
+
+    Each action is profiled with a ThreadProfile wherever its work runs:
+    on the Tk thread, on the data service and on worker threads handed
+    work with follow(). SQL run on the way is counted through trace callbacks and
+    tracemalloc snapshots taken around the action show where memory went.
+    Once the actions are done, a zip with summary.json and a pstats file
+    per action is written and on_complete(path) is called on the Tk loop.
+    """
+
+    def __init__(self, db_path, actions, main_conn, on_complete):
+        self.db_path = db_path
+        self.remaining = actions
+        self.main_conn = main_conn
+        self.on_complete = on_complete
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.current = None
+        self.running = []
+        self.finished = []
+        tracemalloc.start()
+
+    @contextlib.contextmanager
+    def segment(self, action, conn=None, job=None):
+        """Profile this thread, and trace conn's SQL, as part of an action"""
+        profiler = ThreadProfile()
+        if conn is not None:
+            conn.set_trace_callback(action.note_sql)
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            if conn is not None:
+                conn.set_trace_callback(None)
+            action.profiles.append(profiler)
+            if job:
+                action.jobs.append({
+                    'job': job,
+                    'seconds': round(time.perf_counter() - started, 6),
+                })
+
+    @contextlib.contextmanager
+    def resume(self, action):
+        """Run Tk-side code as part of an action"""
+        previous = self.current
+        self.current = action
+        try:
+            with self.segment(action, self.main_conn()):
+                yield
+        finally:
+            self.current = previous
+
+    @contextlib.contextmanager
+    def action(self, name):
+        """Capture a UI action; calls made within it join the same action"""
+        if self.current is not None or self.remaining == 0:
+            yield
+            return
+        
+        self.remaining -= 1
+        action = DiagnosticAction(name, len(self.running) + len(self.finished) + 1)
+        self.running.append(action)
+        try:
+            with self.resume(action):
+                yield
+        finally:
+            action.open = False
+            self.check(action)
+
+    def follow(self, job, trace_sql=True):
+        """Attach work leaving the Tk thread to the current action
+
+        Returns (job, deliver): the job profiles itself (and traces the
+        SQL of the connection it is given first) wherever it runs, and
+        deliver(callback) wraps the Tk-loop callback handling its result,
+        which settles the action once it has run.
+        """
+        action = self.current
+        if action is None:
+            return job, lambda callback: callback
+        action.pending += 1
+        
+        def run(*args):
+            conn = args[0] if trace_sql else None
+            with self.segment(action, conn, job.__name__):
+                return job(*args)
+        
+        def deliver(callback):
+            def handle(*args):
+                try:
+                    if callback:
+                        with self.resume(action):
+                            callback(*args)
+                finally:
+                    action.pending -= 1
+                    self.check(action)
+            return handle
+        
+        return run, deliver
+
+    def check(self, action):
+        """Finish an action once nothing of it is still running"""
+        if action.open or action.pending > 0 or action not in self.running:
+            return
+        action.summarize(self.started)
+        self.running.remove(action)
+        self.finished.append(action)
+        if self.remaining == 0 and not self.running:
+            self.complete()
+
+    def stop(self):
+        """Take no further actions; save once the running ones finish"""
+        self.remaining = 0
+        if not self.running:
+            self.complete()
+
+    def complete(self):
+        """Write the bundle and hand its path (None if empty) to on_complete"""
+        tracemalloc.stop()
+        path = None
+        if self.finished:
+            folder = os.path.join(os.path.dirname(self.db_path), DIAGNOSTICS_DIRNAME)
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(
+                folder,
+                f"diagnostics_{self.started_at:%Y%m%d_%H%M%S}.zip"
+            )
+            self.write_bundle(path)
+        self.on_complete(path)
+
+    def write_bundle(self, path):
+        """Zip the summary and each action's pstats file"""
+        actions = sorted(self.finished, key=lambda action: action.number)
+        summary = {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'database': self.db_path,
+            'python': sys.version.split()[0],
+            'sqlite': sqlite3.sqlite_version,
+            'platform': sys.platform,
+            'actions': [action.summary for action in actions],
+        }
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as bundle:
+            bundle.writestr('summary.json', json.dumps(summary, indent=2))
+            for action in actions:
+                # The format pstats.Stats(path) reads back
+                bundle.writestr(
+                    action.summary['profile'],
+                    marshal.dumps(action.stats.stats)
+                )
+
+
+def diagnosed(method):
+    """Name a UI action for the stall watchdog and the diagnostics capture
+
+    Calls made within an action keep the outer action's name.
+    """
+    @functools.wraps(method)
+    def capture(self, *args, **kwargs):
+        outer = self.current_action
+        self.current_action = outer or method.__name__
+        try:
+            if self.diagnostics is None:
+                return method(self, *args, **kwargs)
+            with self.diagnostics.action(method.__name__):
+                return method(self, *args, **kwargs)
+        finally:
+            self.current_action = outer
+    return capture
+
+
+# UI stall watchdog: how often the Tk loop beats and the helper thread
+# looks for a late beat, the stall duration buckets (the first bound is
+# the threshold), stalls kept with their stacks and stack frames kept each
+STALL_HEARTBEAT_MS = 50
+STALL_CHECK_MS = 25
+STALL_BUCKETS_MS = (200, 500, 1000, 2000, 5000)
+STALL_LOG_SIZE = 500
+STALL_STACK_DEPTH = 30
+
+
+def stall_bucket_labels():
+    """Column labels for the stall duration buckets"""
+    bounds = STALL_BUCKETS_MS + (None,)
+    return [
+        f"{low}-{high} ms" if high else f"{low}+ ms"
+        for low, high in zip(bounds, bounds[1:])
+    ]
+
+
+class StallWatchdog(threading.Thread):
+    """Record Tk event loop stalls with the main thread's stack
+
+    The Tk loop calls beat() every STALL_HEARTBEAT_MS; a beat arriving at
+    least STALL_BUCKETS_MS[0] late is a stall. This thread notices the
+    missing beat while the stall is still going and samples the main
+    thread's stack, so the record shows what blocked the loop rather than
+    what ran after it. current_action() names the UI action running on
+    the Tk thread, which each stall is counted under.
+    """
+
+    def __init__(self, current_action):
+        super().__init__(name='stall-watchdog', daemon=True)
+        self.current_action = current_action
+        self.main_ident = threading.get_ident()
+        self.since = datetime.now()
+        self.expected = None
+        # What the helper thread saw once the current beat was overdue:
+        # the action right away, the stack once it has been sampled
+        self.noticed = False
+        self.action = None
+        self.stack = None
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.stalls = deque(maxlen=STALL_LOG_SIZE)
+        # action -> [stall count per bucket, total seconds, longest ms]
+        self.histograms = {}
+
+    def beat(self):
+        """Note a heartbeat on the Tk loop; returns the stall it ended"""
+        now = time.monotonic()
+        with self.lock:
+            expected, noticed = self.expected, self.noticed
+            action, stack = self.action, self.stack
+            self.expected = now + STALL_HEARTBEAT_MS / 1000
+            self.noticed = False
+            self.action = None
+            self.stack = None
+        if expected is None:
+            return None
+        late_ms = (now - expected) * 1000
+        if late_ms < STALL_BUCKETS_MS[0]:
+            return None
+        
+        # A stall too short for the helper thread to notice is put down to
+        # whatever is running now
+        if not noticed:
+            action = self.current_action()
+        stall = {
+            'at': datetime.now().isoformat(timespec='milliseconds'),
+            'ms': round(late_ms),
+            'action': action or '(idle)',
+            'stack': stack or [],
+        }
+        self.stalls.append(stall)
+        histogram = self.histograms.setdefault(
+            stall['action'],
+            [[0] * len(STALL_BUCKETS_MS), 0.0, 0]
+        )
+        bucket = sum(late_ms >= bound for bound in STALL_BUCKETS_MS) - 1
+        histogram[0][bucket] += 1
+        histogram[1] += late_ms / 1000
+        histogram[2] = max(histogram[2], stall['ms'])
+        return stall
+
+    def main_stack(self):
+        """The main thread's stack as 'file:line in function' lines"""
+        frame = sys._current_frames().get(self.main_ident)
+        if frame is None:
+            return []
+        return [
+            f"{os.path.basename(entry.filename)}:{entry.lineno} in {entry.name}"
+            for entry in traceback.extract_stack(frame)[-STALL_STACK_DEPTH:]
+        ]
+
+    def run(self):
+        while not self.stopped.wait(STALL_CHECK_MS / 1000):
+            with self.lock:
+                expected = self.expected
+                sampled = self.stack is not None
+            if expected is None or sampled:
+                continue
+            if (time.monotonic() - expected) * 1000 < STALL_BUCKETS_MS[0]:
+                continue
+            with self.lock:
+                # The action is noted first, so a stall ending before the
+                # stack is sampled is still counted under it
+                if self.expected != expected:
+                    continue
+                if not self.noticed:
+                    self.noticed = True
+                    self.action = self.current_action()
+            stack = self.main_stack()
+            with self.lock:
+                # Keep it only if the loop has not beaten in the meantime
+                if self.expected == expected:
+                    self.stack = stack
+
+    def stop(self):
+        """Stop the helper thread"""
+        self.stopped.set()
+
+    def histogram_rows(self):
+        """(action, stalls, longest ms, total seconds, *bucket counts), worst first"""
+        rows = [
+            (action, sum(counts), longest, round(total, 3), *counts)
+            for action, (counts, total, longest) in self.histograms.items()
+        ]
+        return sorted(rows, key=lambda row: -row[3])
+
+    def export(self, path):
+        """Write the histograms and the recent stalls with stacks as JSON"""
+        labels = stall_bucket_labels()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'since': self.since.isoformat(timespec='seconds'),
+                'threshold_ms': STALL_BUCKETS_MS[0],
+                'histograms': [
+                    {
+                        'action': action,
+                        'stalls': stalls,
+                        'longest_ms': longest,
+                        'total_seconds': total,
+                        'buckets': dict(zip(labels, counts)),
+                    }
+                    for action, stalls, longest, total, *counts
+                    in self.histogram_rows()
+                ],
+                'stalls': list(self.stalls),
+            }, f, indent=2)
 
 
 class EngagementTracker:
-    def __init__(self):
+    def __init__(self, db_path=None, config=None, profile=None):
+        # Startup phases are timed when profiling with --profile-startup
+        self.profile = profile
+        load_gui()
+        self.note_startup('imports')
         self.root = ThemedTk(theme="arc")  # Modern looking theme
         self.root.title("EngageCRM")
         self.root.geometry("1200x800")
+        self.note_startup('theme')
         
         # Register datetime adapters
         sqlite3.register_adapter(datetime, self.adapt_datetime)
         sqlite3.register_converter("datetime", self.convert_datetime)
         
-        # Initialize database
-        self.init_database()
+        # Initialize database; connections to recently used databases stay
+        # open, most recent last, so switching back is instant
+        self.config = config or load_config()
+        self.workspaces = OrderedDict()
+        self.init_database(configured_database(self.config, db_path))
+        self.note_startup('init_database')
+        
+        # Start scheduled online backups
+        self.backup_events = queue.Queue()
+        self.backup_scheduler = BackupScheduler(
+            self.db_path,
+            on_complete=lambda path, error: self.backup_events.put(
+                (path, error)
+            )
+        )
+        self.backup_scheduler.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # List refreshes and saves run on the data service thread; their
+        # results come back through data_events, polled on the Tk loop
+        self.data_events = queue.Queue()
+        self.data = DataService(self.db_path, self.config)
+        self.data.start()
+        self.root.after(DATA_POLL_MS, self.poll_data_events)
+        
+        # Watch for event loop stalls, counted under the running UI action
+        self.current_action = None
+        self.longest_stall = 0
+        self.stall_watchdog = StallWatchdog(lambda: self.current_action)
+        self.stall_watchdog.start()
+        self.root.after(STALL_HEARTBEAT_MS, self.stall_heartbeat)
+        
+        # Run database maintenance once the user has been idle a while
+        self.last_activity = time.monotonic()
+        self.maintenance_started = 0.0
+        self.maintenance_thread = None
+        self.maintenance_events = queue.Queue()
+        for sequence in ('<Any-KeyPress>', '<Any-ButtonPress>'):
+            self.root.bind_all(sequence, self.note_activity, add='+')
+        self.root.after(60 * 1000, self.check_idle)
+        
+        # Full records shown in the detail panes, most recent last
+        self.detail_cache = OrderedDict()
+        # Workload matrices, only touched on the data service thread
+        self.workload_cache = {}
+        # Profiles of the next few UI actions, while armed from the Admin tab
+        self.diagnostics = None
+        
+        # Calendar windows by (first day, days), most recent last
+        self.calendar_cache = OrderedDict()
+        self.calendar_start = None
+        self.calendar_days = 0
+        self.note_startup('services')
+        
+        # Workspace switcher
+        workspace_frame = ttk.Frame(self.root)
+        workspace_frame.pack(fill='x', padx=10, pady=(5, 0))
+        
+        ttk.Label(workspace_frame, text="Workspace:").pack(side='left', padx=5)
+        self.workspace_choice = ttk.Combobox(
+            workspace_frame,
+            state='readonly',
+            width=60
+        )
+        self.workspace_choice.pack(side='left', padx=5)
+        self.workspace_choice.bind(
+            '<<ComboboxSelected>>',
+            lambda event: self.switch_workspace(
+                self.workspace_paths[self.workspace_choice.get()]
+            )
+        )
+        
+        ttk.Button(
+            workspace_frame,
+            text="Open Database...",
+            command=self.open_workspace_dialog
+        ).pack(side='left', padx=5)
+        self.update_workspace_choices()
         
         # Create main notebook for tabs
         self.notebook = ttk.Notebook(self.root)
@@ -31,22 +4497,42 @@ class EngagementTracker:
         self.projects_frame = ttk.Frame(self.notebook)
         self.engagements_frame = ttk.Frame(self.notebook)
         self.reviews_frame = ttk.Frame(self.notebook)
+        self.calendar_frame = ttk.Frame(self.notebook)
+        self.action_items_frame = ttk.Frame(self.notebook)
         self.admin_frame = ttk.Frame(self.notebook)
         
         self.notebook.add(self.units_frame, text='Organizations')
         self.notebook.add(self.researchers_frame, text='Personnel')
         self.notebook.add(self.projects_frame, text='Projects')
         self.notebook.add(self.engagements_frame, text='Engagements')
+        self.notebook.add(self.calendar_frame, text='Calendar')
+        self.notebook.add(self.action_items_frame, text='Action Items')
         self.notebook.add(self.reviews_frame, text='Reviews')
         self.notebook.add(self.admin_frame, text='Admin')
+        self.note_startup('notebook')
+        
+        # Initialize all tabs; action items refresh with the engagements,
+        # so they come first
+        for init_tab in (
+            self.init_units_tab,
+            self.init_researchers_tab,
+            self.init_projects_tab,
+            self.init_action_items_tab,
+            self.init_engagements_tab,
+            self.init_calendar_tab,
+            self.init_reviews_tab,
+            self.init_admin_tab,
+        ):
+            init_tab()
+            self.note_startup(init_tab.__name__)
         
-        # Initialize all tabs
-        self.init_units_tab()
-        self.init_researchers_tab()
-        self.init_projects_tab()
-        self.init_engagements_tab()
-        self.init_reviews_tab()
-        self.init_admin_tab()
+        # Global search shortcut
+        self.root.bind_all('<Control-f>', lambda event: self.search_dialog())
+
+    def note_startup(self, phase):
+        """End a startup phase when profiling startup"""
+        if self.profile:
+            self.profile.lap(phase)
 
     def adapt_datetime(self, val):
         """Convert datetime to SQLite TEXT format."""
@@ -59,9 +4545,10 @@ class EngagementTracker:
         except ValueError:
             return datetime.strptime(val, '%Y-%m-%d')
 
-    def init_database(self):
+    def init_database(self, db_path):
         """Initialize SQLite database and create tables if they don't exist"""
-        db_path = os.path.abspath('engagement_tracker.db')
+        db_path = os.path.abspath(db_path)
+        self.db_path = db_path
         
         # Connect to database
         self.conn = sqlite3.connect(
@@ -69,13 +4556,23 @@ class EngagementTracker:
             detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
         )
         self.cursor = self.conn.cursor()
+        apply_pragmas(self.conn, self.config)
+        
+        # Let deletes hand pages back through incremental vacuum. A new
+        # database starts out that way; an older one needs a full VACUUM,
+        # run only from the Admin tab so opening a database never waits
+        self.cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        
+        # WAL lets online backups read while the app keeps writing
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        self.cursor.execute("PRAGMA foreign_keys=ON")
         
         # Create Units table
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS units (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL,
-                type TEXT NOT NULL,
+                type_id INTEGER REFERENCES unit_types(id),
                 location TEXT,
                 commander TEXT,
                 poc TEXT,
@@ -101,7 +4598,7 @@ class EngagementTracker:
             CREATE TABLE IF NOT EXISTS projects (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL,
-                status TEXT,
+                status_id INTEGER REFERENCES project_statuses(id),
                 start_date DATE,
                 end_date DATE,
                 description TEXT,
@@ -109,21 +4606,13 @@ class EngagementTracker:
             )
         ''')
         
+        # Lookup tables for the coded type and status columns
+        create_lookup_tables(self.cursor)
+        
         # Create Engagements table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS engagements (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date_time DATE NOT NULL,
-                type TEXT NOT NULL,
-                unit_id INTEGER,
-                project_id INTEGER,
-                summary TEXT,
-                status TEXT,
-                action_items TEXT,
-                FOREIGN KEY (unit_id) REFERENCES units(id),
-                FOREIGN KEY (project_id) REFERENCES projects(id)
-            )
-        ''')
+        self.cursor.execute(
+            ENGAGEMENT_SCHEMAS['engagements'].format(table='engagements')
+        )
         
         # Create Weekly Reviews table
         self.cursor.execute('''
@@ -138,17 +4627,102 @@ class EngagementTracker:
         ''')
         
         # Create Engagement_Participants table
+        self.cursor.execute(
+            ENGAGEMENT_SCHEMAS['engagement_participants'].format(
+                table='engagement_participants'
+            )
+        )
+        
+        # Create Action Items table, parsed from engagements.action_items
+        self.cursor.execute(
+            ENGAGEMENT_SCHEMAS['action_items'].format(table='action_items')
+        )
+        
+        # Code type and status text saved before the lookup tables existed
+        migrate_lookup_codes(self.conn, db_path)
+        
+        # Enforce foreign keys, after sweeping links to deleted records
+        # and adding ON DELETE actions to databases created before them
+        migrate_foreign_keys(self.conn, db_path)
+        
+        # Index the researcher side of participations; engagement_id leads
+        # the primary key, and unit_id and project_id the indexes below
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_participants_researcher
+            ON engagement_participants (researcher_id)
+        ''')
+        
+        # Index date ranges for archiving and reports
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_engagements_date_time
+            ON engagements (date_time)
+        ''')
+        
+        # Index each unit's and project's engagement history
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_engagements_unit_date
+            ON engagements (unit_id, date_time)
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_engagements_project_date
+            ON engagements (project_id, date_time)
+        ''')
+        
+        # Open items by due date, overall and per owner, and each
+        # engagement's items for saves and cascades
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_action_items_status_due
+            ON action_items (status, due_date)
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_action_items_owner
+            ON action_items (owner_id, status, due_date)
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_action_items_engagement
+            ON action_items (engagement_id)
+        ''')
+        
+        # Split action item text saved before the table existed
+        migrate_action_items(self.conn, db_path)
+        
+        # Views spanning the hot tables and any attached yearly archives
+        create_archive_views(self.cursor, [])
+        
+        # Full-text search indexes
+        create_search_index(self.cursor)
+        
+        # Weekly engagement counts kept current by triggers
+        create_weekly_rollup(self.cursor)
+        
+        # Who works with which units and projects, for participant suggestions
+        create_participant_affinity(self.cursor)
+        
+        # Create Maintenance Log table
         self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS engagement_participants (
-                engagement_id INTEGER,
-                researcher_id INTEGER,
-                PRIMARY KEY (engagement_id, researcher_id),
-                FOREIGN KEY (engagement_id) REFERENCES engagements(id),
-                FOREIGN KEY (researcher_id) REFERENCES researchers(id)
+            CREATE TABLE IF NOT EXISTS maintenance_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_at TEXT NOT NULL,
+                step TEXT NOT NULL,
+                status TEXT NOT NULL,
+                seconds REAL,
+                size_before INTEGER,
+                size_after INTEGER,
+                free_pages_before INTEGER,
+                free_pages_after INTEGER,
+                probe_ms_before REAL,
+                probe_ms_after REAL
             )
         ''')
         
         self.conn.commit()
+        
+        # Keep the connection warm for workspace switching
+        self.workspaces[db_path] = self.conn
+        while len(self.workspaces) > WARM_WORKSPACES:
+            _, conn = self.workspaces.popitem(last=False)
+            conn.close()
+        remember_workspace(self.config, db_path)
 
     def init_units_tab(self):
         """Initialize the Units tab"""
@@ -185,10 +4759,13 @@ class EngagementTracker:
         )
         del_btn.pack(side='left', padx=5)
         
+        # List with the selected unit's details beside it
+        list_frame, details = self.add_detail_pane(self.units_frame)
+        
         # Treeview for units
         cols = ('ID', 'Name', 'Type', 'Location', 'Commander', 'POC')
         self.units_tree = ttk.Treeview(
-            self.units_frame,
+            list_frame,
             columns=cols,
             show='headings'
         )
@@ -199,15 +4776,16 @@ class EngagementTracker:
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(
-            self.units_frame,
+            list_frame,
             orient='vertical',
             command=self.units_tree.yview
         )
         self.units_tree.configure(yscrollcommand=scrollbar.set)
         
         # Pack everything
-        self.units_tree.pack(fill='both', expand=True, padx=5, pady=5)
+        self.units_tree.pack(side='left', fill='both', expand=True, padx=5, pady=5)
         scrollbar.pack(side='right', fill='y')
+        self.bind_detail_pane(self.units_tree, details, 'units')
 
     def init_researchers_tab(self):
         """Initialize the Researchers tab"""
@@ -349,6 +4927,12 @@ class EngagementTracker:
         self.engagement_search = ttk.Entry(search_frame)
         self.engagement_search.pack(side='left', fill='x', expand=True, padx=5)
         
+        ttk.Button(
+            search_frame,
+            text="Search All Records",
+            command=self.search_dialog
+        ).pack(side='left', padx=5)
+        
         # Buttons
         btn_frame = ttk.Frame(self.engagements_frame)
         btn_frame.pack(fill='x', padx=5, pady=5)
@@ -367,13 +4951,16 @@ class EngagementTracker:
         )
         edit_btn.pack(side='left', padx=5)
 
+        # List with the selected engagement's details beside it
+        list_frame, details = self.add_detail_pane(self.engagements_frame)
+        
         # Treeview for engagements
         cols = (
             'ID', 'Date', 'Type', 'Unit', 'Project',
             'Summary', 'Status', 'Participants'
         )
         self.engagements_tree = ttk.Treeview(
-            self.engagements_frame,
+            list_frame,
             columns=cols,
             show='headings'
         )
@@ -388,19 +4975,385 @@ class EngagementTracker:
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(
-            self.engagements_frame,
+            list_frame,
             orient='vertical',
             command=self.engagements_tree.yview
         )
         self.engagements_tree.configure(yscrollcommand=scrollbar.set)
         
         # Pack everything
-        self.engagements_tree.pack(fill='both', expand=True, padx=5, pady=5)
+        self.engagements_tree.pack(side='left', fill='both', expand=True, padx=5, pady=5)
         scrollbar.pack(side='right', fill='y')
+        self.bind_detail_pane(self.engagements_tree, details, 'engagements')
         
         # Initial load
         self.refresh_engagements()
 
+    def init_calendar_tab(self):
+        """Initialize the Calendar tab"""
+        # Navigation and display options
+        nav_frame = ttk.Frame(self.calendar_frame)
+        nav_frame.pack(fill='x', padx=5, pady=5)
+        
+        ttk.Button(
+            nav_frame,
+            text="< Previous",
+            command=lambda: self.page_calendar(-1)
+        ).pack(side='left', padx=5)
+        
+        ttk.Button(
+            nav_frame,
+            text="Today",
+            command=lambda: self.show_calendar(datetime.now().date())
+        ).pack(side='left', padx=5)
+        
+        ttk.Button(
+            nav_frame,
+            text="Next >",
+            command=lambda: self.page_calendar(1)
+        ).pack(side='left', padx=5)
+        
+        self.calendar_title = ttk.Label(nav_frame, text="")
+        self.calendar_title.pack(side='left', padx=15)
+        
+        ttk.Label(nav_frame, text="Color by:").pack(side='right', padx=5)
+        self.calendar_color_by = ttk.Combobox(
+            nav_frame,
+            values=['Type', 'Unit'],
+            state='readonly',
+            width=8
+        )
+        self.calendar_color_by.set('Type')
+        self.calendar_color_by.pack(side='right', padx=5)
+        
+        ttk.Label(nav_frame, text="View:").pack(side='right', padx=5)
+        self.calendar_mode = ttk.Combobox(
+            nav_frame,
+            values=['Month', 'Week'],
+            state='readonly',
+            width=8
+        )
+        self.calendar_mode.set('Month')
+        self.calendar_mode.pack(side='right', padx=5)
+        
+        for combo in (self.calendar_mode, self.calendar_color_by):
+            combo.bind(
+                '<<ComboboxSelected>>',
+                lambda event: self.show_calendar(self.calendar_anchor())
+            )
+        
+        # Legend of the colors used in the window shown
+        self.calendar_legend = ttk.Frame(self.calendar_frame)
+        self.calendar_legend.pack(fill='x', padx=5)
+        
+        # Day grid; double-click an engagement to open it in the list
+        self.calendar_canvas = tk.Canvas(
+            self.calendar_frame,
+            background='white',
+            highlightthickness=0
+        )
+        self.calendar_canvas.pack(fill='both', expand=True, padx=5, pady=5)
+        self.calendar_canvas.bind(
+            '<Configure>',
+            lambda event: self.draw_calendar()
+        )
+        
+        # Only drawn while the tab is shown
+        self.notebook.bind(
+            '<<NotebookTabChanged>>',
+            lambda event: self.show_calendar(self.calendar_anchor()),
+            add='+'
+        )
+
+    def calendar_anchor(self):
+        """A date inside the calendar window shown, or today"""
+        if self.calendar_start is None:
+            return datetime.now().date()
+        return self.calendar_start + timedelta(days=14 if self.calendar_days > 7 else 0)
+
+    def page_calendar(self, steps):
+        """Show the window before or after the current one"""
+        mode = self.calendar_mode.get()
+        start, _ = calendar_window(mode, self.calendar_anchor())
+        self.show_calendar(shift_calendar_window(mode, start, steps))
+
+    def calendar_visible(self):
+        return self.notebook.select() == str(self.calendar_frame)
+
+    def load_calendar_window(self, start, days, on_done=None):
+        """Fetch a window into the calendar cache on the data service"""
+        key = (start, days)
+        if key in self.calendar_cache:
+            self.calendar_cache.move_to_end(key)
+            if on_done:
+                on_done()
+            return
+        
+        def store(rows):
+            self.calendar_cache[key] = rows
+            while len(self.calendar_cache) > CALENDAR_CACHE_WINDOWS:
+                self.calendar_cache.popitem(last=False)
+            if on_done:
+                on_done()
+        
+        self.run_query(
+            fetch_calendar_window,
+            start,
+            start + timedelta(days=days),
+            on_done=store
+        )
+
+    def show_calendar(self, anchor):
+        """Show the window holding a date and prefetch its neighbours"""
+        if not self.calendar_visible():
+            return
+        mode = self.calendar_mode.get()
+        start, days = calendar_window(mode, anchor)
+        self.calendar_start, self.calendar_days = start, days
+        
+        last = start + timedelta(days=days - 1)
+        self.calendar_title.config(text=f"{start:%d %b %Y} - {last:%d %b %Y}")
+        
+        def loaded():
+            self.draw_calendar()
+            for steps in (-1, 1):
+                neighbour = shift_calendar_window(mode, start, steps)
+                self.load_calendar_window(*calendar_window(mode, neighbour))
+        
+        self.load_calendar_window(start, days, on_done=loaded)
+
+    def draw_calendar(self):
+        """Draw the cached window shown; cost follows the days in view"""
+        rows = self.calendar_cache.get((self.calendar_start, self.calendar_days))
+        canvas = self.calendar_canvas
+        canvas.delete('all')
+        for child in self.calendar_legend.winfo_children():
+            child.destroy()
+        if rows is None:
+            return
+        
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(row[1], []).append(row)
+        color_column = 2 if self.calendar_color_by.get() == 'Type' else 3
+        
+        width = max(canvas.winfo_width(), 100)
+        height = max(canvas.winfo_height(), 100)
+        weeks = self.calendar_days // 7
+        cell_w = width / 7
+        cell_h = (height - 20) / weeks
+        line_h = 16
+        fits = max(int((cell_h - 18) // line_h), 1)
+        chars = max(int((cell_w - 10) // 7), 4)
+        
+        for column, name in enumerate(('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')):
+            canvas.create_text(column * cell_w + cell_w / 2, 10, text=name)
+        
+        today = datetime.now().date()
+        middle_month = (self.calendar_start + timedelta(days=14)).month
+        for index in range(self.calendar_days):
+            day = self.calendar_start + timedelta(days=index)
+            x = (index % 7) * cell_w
+            y = 20 + (index // 7) * cell_h
+            shade = '#ffffff'
+            if weeks > 1 and day.month != middle_month:
+                shade = '#f4f4f4'
+            canvas.create_rectangle(
+                x, y, x + cell_w, y + cell_h,
+                fill=shade,
+                outline='#e2e2e2'
+            )
+            canvas.create_text(
+                x + 4, y + 2,
+                anchor='nw',
+                text=str(day.day),
+                fill='#c00000' if day == today else '#505050'
+            )
+            
+            engagements = by_day.get(day.isoformat(), [])
+            shown = engagements if len(engagements) <= fits else engagements[:fits - 1]
+            for line, row in enumerate(shown):
+                top = y + 18 + line * line_h
+                tag = f"engagement_{row[0]}"
+                canvas.create_rectangle(
+                    x + 3, top, x + cell_w - 3, top + line_h - 2,
+                    fill=calendar_color(row[color_column]),
+                    outline='',
+                    tags=(tag,)
+                )
+                label = f"{row[2]}: {row[4] or ''}"
+                canvas.create_text(
+                    x + 6, top + (line_h - 2) / 2,
+                    anchor='w',
+                    text=label if len(label) <= chars else label[:chars - 1] + '...',
+                    fill='white',
+                    tags=(tag,)
+                )
+                canvas.tag_bind(
+                    tag,
+                    '<Double-Button-1>',
+                    lambda event, record_id=row[0]: self.jump_to_record(
+                        'engagements', record_id
+                    )
+                )
+            if len(shown) < len(engagements):
+                canvas.create_text(
+                    x + 6, y + 18 + len(shown) * line_h,
+                    anchor='nw',
+                    text=f"+{len(engagements) - len(shown)} more",
+                    fill='#505050'
+                )
+        
+        # Legend
+        keys = sorted({row[color_column] or '' for row in rows})
+        for key in keys:
+            swatch = tk.Label(
+                self.calendar_legend,
+                text=f"  {key or 'None'}  ",
+                background=calendar_color(key or None),
+                foreground='white'
+            )
+            swatch.pack(side='left', padx=2, pady=2)
+
+    def init_action_items_tab(self):
+        """Initialize the Action Items tab"""
+        # Owner filter
+        filter_frame = ttk.Frame(self.action_items_frame)
+        filter_frame.pack(fill='x', padx=5, pady=5)
+        
+        ttk.Label(filter_frame, text="Owner:").pack(side='left', padx=5)
+        self.action_owner = ttk.Combobox(
+            filter_frame,
+            state='readonly',
+            postcommand=self.update_action_owner_choices
+        )
+        self.action_owner.pack(side='left', padx=5)
+        self.action_owner.set('Everyone')
+        self.action_owner.bind(
+            '<<ComboboxSelected>>',
+            lambda event: self.refresh_action_items()
+        )
+        self.action_owner_ids = {'Everyone': None}
+        
+        self.action_items_status = ttk.Label(filter_frame, text="")
+        self.action_items_status.pack(side='left', padx=5)
+        
+        # Buttons
+        btn_frame = ttk.Frame(self.action_items_frame)
+        btn_frame.pack(fill='x', padx=5, pady=5)
+        
+        ttk.Button(
+            btn_frame,
+            text="Mark Done",
+            command=self.complete_action_item
+        ).pack(side='left', padx=5)
+        
+        ttk.Button(
+            btn_frame,
+            text="Open Engagement",
+            command=self.open_action_item_engagement
+        ).pack(side='left', padx=5)
+        
+        # Treeview for open action items
+        cols = (
+            'ID', 'Due', 'Action Item', 'Owner',
+            'Engagement Date', 'Organization', 'Engagement'
+        )
+        self.action_items_tree = ttk.Treeview(
+            self.action_items_frame,
+            columns=cols,
+            show='headings'
+        )
+        for col in cols:
+            self.action_items_tree.heading(col, text=col)
+            if col == 'Action Item':
+                self.action_items_tree.column(col, width=350)
+            elif col in ('ID', 'Engagement'):
+                self.action_items_tree.column(col, width=70)
+            else:
+                self.action_items_tree.column(col, width=120)
+        self.action_items_tree.tag_configure('overdue', foreground='#c00000')
+        self.action_items_tree.bind(
+            '<Double-Button-1>',
+            lambda event: self.open_action_item_engagement()
+        )
+        
+        scrollbar = ttk.Scrollbar(
+            self.action_items_frame,
+            orient='vertical',
+            command=self.action_items_tree.yview
+        )
+        self.action_items_tree.configure(yscrollcommand=scrollbar.set)
+        
+        self.action_items_tree.pack(side='left', fill='both', expand=True, padx=5, pady=5)
+        scrollbar.pack(side='right', fill='y')
+
+    def update_action_owner_choices(self):
+        """List the researchers in the owner filter"""
+        self.cursor.execute("SELECT id, name FROM researchers ORDER BY name")
+        self.action_owner_ids = {'Everyone': None}
+        self.action_owner_ids.update(
+            (name, researcher_id) for researcher_id, name in self.cursor.fetchall()
+        )
+        self.action_owner['values'] = list(self.action_owner_ids)
+
+    @diagnosed
+    def refresh_action_items(self, on_done=None):
+        """Refresh the open action items, overdue ones highlighted"""
+        owner_id = self.action_owner_ids.get(self.action_owner.get())
+        
+        def fill(rows):
+            tree = self.action_items_tree
+            for item in tree.get_children():
+                tree.delete(item)
+            today = datetime.now().date()
+            overdue = 0
+            for row in rows:
+                late = row[1] is not None and row[1] < today
+                overdue += late
+                tree.insert(
+                    '', 'end',
+                    values=tuple('' if value is None else value for value in row),
+                    tags=('overdue',) if late else ()
+                )
+            limited = " (first of each group)" if len(rows) >= ACTION_ITEMS_PAGE else ""
+            self.action_items_status.config(
+                text=f"{len(rows)} open{limited}, {overdue} overdue"
+            )
+            if on_done:
+                on_done()
+        
+        self.run_query(open_action_items, owner_id, on_done=fill)
+
+    def selected_action_item(self):
+        """The selected action item's values, or None with a warning"""
+        selected = self.action_items_tree.selection()
+        if not selected:
+            messagebox.showwarning(
+                "No Selection",
+                "Please select an action item."
+            )
+            return None
+        return self.action_items_tree.item(selected[0])['values']
+
+    def complete_action_item(self):
+        """Mark the selected action item done"""
+        values = self.selected_action_item()
+        if values is None:
+            return
+        self.run_query(
+            set_action_item_status,
+            values[0],
+            'Done',
+            on_done=lambda result: self.refresh_engagements()
+        )
+
+    def open_action_item_engagement(self):
+        """Show the engagement an action item came from"""
+        values = self.selected_action_item()
+        if values is not None:
+            self.jump_to_record('engagements', values[6])
+
     def init_reviews_tab(self):
         """Initialize the Reviews tab"""
         # Search frame
@@ -429,13 +5382,16 @@ class EngagementTracker:
         )
         edit_btn.pack(side='left', padx=5)
 
+        # List with the selected review's details beside it
+        list_frame, details = self.add_detail_pane(self.reviews_frame)
+        
         # Treeview for reviews
         cols = (
             'ID', 'Week Start', 'Summary', 'Highlights',
             'Challenges', 'Next Steps'
         )
         self.reviews_tree = ttk.Treeview(
-            self.reviews_frame,
+            list_frame,
             columns=cols,
             show='headings'
         )
@@ -452,15 +5408,16 @@ class EngagementTracker:
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(
-            self.reviews_frame,
+            list_frame,
             orient='vertical',
             command=self.reviews_tree.yview
         )
         self.reviews_tree.configure(yscrollcommand=scrollbar.set)
         
         # Pack everything
-        self.reviews_tree.pack(fill='both', expand=True, padx=5, pady=5)
+        self.reviews_tree.pack(side='left', fill='both', expand=True, padx=5, pady=5)
         scrollbar.pack(side='right', fill='y')
+        self.bind_detail_pane(self.reviews_tree, details, 'weekly_reviews')
         
         # Initial load
         self.refresh_reviews()
@@ -496,61 +5453,250 @@ class EngagementTracker:
             foreground='white',
             borderwidth=2
         )
-        self.end_date.pack(side='left', padx=5)
+        self.end_date.pack(side='left', padx=5)
+        
+        # Report type selection
+        report_frame = ttk.Frame(options_frame)
+        report_frame.pack(fill='x', padx=5, pady=5)
+        
+        ttk.Label(report_frame, text="Report Type:").pack(
+            side='left',
+            padx=5
+        )
+        
+        report_values = list(REPORT_TYPES)
+        self.report_type = ttk.Combobox(
+            report_frame,
+            values=report_values
+        )
+        self.report_type.pack(side='left', padx=5)
+        self.report_type.set(report_values[0])
+        
+        ttk.Label(report_frame, text="Export Format:").pack(
+            side='left',
+            padx=5
+        )
+        
+        self.export_format = ttk.Combobox(
+            report_frame,
+            values=list(EXPORTERS),
+            state='readonly',
+            width=10
+        )
+        self.export_format.pack(side='left', padx=5)
+        self.export_format.set('csv')
+        
+        # Generate and export buttons
+        btn_frame = ttk.Frame(self.admin_frame)
+        btn_frame.pack(fill='x', padx=5, pady=5)
+        
+        gen_btn = ttk.Button(
+            btn_frame,
+            text="Generate Report",
+            command=self.generate_report
+        )
+        gen_btn.pack(side='left', padx=5)
+        
+        export_btn = ttk.Button(
+            btn_frame,
+            text="Export Report...",
+            command=self.export_report
+        )
+        export_btn.pack(side='left', padx=5)
+        
+        self.export_all_btn = ttk.Button(
+            btn_frame,
+            text="Export All Reports",
+            command=self.export_all_reports
+        )
+        self.export_all_btn.pack(side='left', padx=5)
+        
+        # Report preview area
+        preview_frame = ttk.LabelFrame(
+            self.admin_frame,
+            text="Preview"
+        )
+        preview_frame.pack(fill='both', expand=True, padx=5, pady=5)
+        
+        self.report_page_status = ttk.Label(preview_frame, text="")
+        self.report_page_status.pack(anchor='w', padx=5)
+        
+        self.report_text = tk.Text(
+            preview_frame,
+            wrap='word',
+            height=20
+        )
+        report_scrollbar = ttk.Scrollbar(
+            preview_frame,
+            orient='vertical',
+            command=self.report_text.yview
+        )
+        
+        # Pages are loaded and dropped as the view nears either end
+        self.report_pages = None
+        self.report_window = []
+        self.report_fill_pending = False
+        self.report_text.configure(
+            yscrollcommand=lambda first, last: self.on_report_scroll(
+                report_scrollbar, first, last
+            )
+        )
+        self.report_text.pack(side='left', fill='both', expand=True, padx=5, pady=5)
+        report_scrollbar.pack(side='right', fill='y')
+        
+        # Archive options
+        archive_frame = ttk.LabelFrame(
+            self.admin_frame,
+            text="Archive"
+        )
+        archive_frame.pack(fill='x', padx=5, pady=5)
+        
+        ttk.Label(archive_frame, text="Archive engagements before:").pack(
+            side='left',
+            padx=5
+        )
+        self.archive_cutoff = DateEntry(
+            archive_frame,
+            width=12,
+            background='darkblue',
+            foreground='white',
+            borderwidth=2
+        )
+        self.archive_cutoff.set_date(
+            datetime(datetime.now().year - 2, 1, 1)
+        )
+        self.archive_cutoff.pack(side='left', padx=5)
+        
+        archive_btn = ttk.Button(
+            archive_frame,
+            text="Archive Engagements",
+            command=self.archive_old_engagements
+        )
+        archive_btn.pack(side='left', padx=5)
+        
+        # Backup options
+        backup_frame = ttk.LabelFrame(
+            self.admin_frame,
+            text="Backups"
+        )
+        backup_frame.pack(fill='x', padx=5, pady=5)
+        
+        backup_btn = ttk.Button(
+            backup_frame,
+            text="Back Up Now",
+            command=self.backup_scheduler.backup_now
+        )
+        backup_btn.pack(side='left', padx=5)
+        
+        backups = list_backups(self.db_path)
+        self.backup_status = ttk.Label(
+            backup_frame,
+            text=(
+                f"Last backup: {os.path.basename(backups[-1])}"
+                if backups else "No backups yet"
+            )
+        )
+        self.backup_status.pack(side='left', padx=5)
+        self.poll_backup_events()
+        
+        # Data quality tools
+        quality_frame = ttk.LabelFrame(
+            self.admin_frame,
+            text="Data Quality"
+        )
+        quality_frame.pack(fill='x', padx=5, pady=5)
+        
+        ttk.Button(
+            quality_frame,
+            text="Find Duplicate Organizations",
+            command=lambda: self.duplicates_dialog('units')
+        ).pack(side='left', padx=5)
+        
+        ttk.Button(
+            quality_frame,
+            text="Find Duplicate Personnel",
+            command=lambda: self.duplicates_dialog('researchers')
+        ).pack(side='left', padx=5)
+        
+        # Workload across the report period
+        workload_frame = ttk.LabelFrame(
+            self.admin_frame,
+            text="Workload"
+        )
+        workload_frame.pack(fill='x', padx=5, pady=5)
         
-        # Report type selection
-        report_frame = ttk.Frame(options_frame)
-        report_frame.pack(fill='x', padx=5, pady=5)
+        ttk.Button(
+            workload_frame,
+            text="Researcher Workload Heatmap",
+            command=self.workload_dialog
+        ).pack(side='left', padx=5)
         
-        ttk.Label(report_frame, text="Report Type:").pack(
+        # Profiles of the next few actions, for slowdowns seen on this machine
+        diagnostics_frame = ttk.LabelFrame(
+            self.admin_frame,
+            text="Diagnostics"
+        )
+        diagnostics_frame.pack(fill='x', padx=5, pady=5)
+        
+        ttk.Label(diagnostics_frame, text="Profile the next").pack(
             side='left',
             padx=5
         )
-        
-        report_values = [
-            'Unit Engagement Summary',
-            'Researcher Activity',
-            'Project Status',
-            'Weekly Review Summary'
-        ]
-        self.report_type = ttk.Combobox(
-            report_frame,
-            values=report_values
+        self.diagnostics_count = ttk.Spinbox(
+            diagnostics_frame,
+            from_=1,
+            to=50,
+            width=4
         )
-        self.report_type.pack(side='left', padx=5)
-        self.report_type.set(report_values[0])
-        
-        # Generate and export buttons
-        btn_frame = ttk.Frame(self.admin_frame)
-        btn_frame.pack(fill='x', padx=5, pady=5)
-        
-        gen_btn = ttk.Button(
-            btn_frame,
-            text="Generate Report",
-            command=self.generate_report
+        self.diagnostics_count.set(DIAGNOSTICS_ACTIONS)
+        self.diagnostics_count.pack(side='left')
+        ttk.Label(diagnostics_frame, text="actions").pack(side='left', padx=5)
+        
+        self.diagnostics_btn = ttk.Button(
+            diagnostics_frame,
+            text="Start Capture",
+            command=self.toggle_diagnostics
         )
-        gen_btn.pack(side='left', padx=5)
+        self.diagnostics_btn.pack(side='left', padx=5)
         
-        export_btn = ttk.Button(
-            btn_frame,
-            text="Export to Excel",
-            command=self.export_to_excel
+        self.diagnostics_status = ttk.Label(
+            diagnostics_frame,
+            text="Saves timings, SQL and memory use for offline analysis"
         )
-        export_btn.pack(side='left', padx=5)
+        self.diagnostics_status.pack(side='left', padx=5)
         
-        # Report preview area
-        preview_frame = ttk.LabelFrame(
+        # Database maintenance
+        maintenance_frame = ttk.LabelFrame(
             self.admin_frame,
-            text="Preview"
+            text="Maintenance"
         )
-        preview_frame.pack(fill='both', expand=True, padx=5, pady=5)
+        maintenance_frame.pack(fill='x', padx=5, pady=5)
         
-        self.report_text = tk.Text(
-            preview_frame,
-            wrap='word',
-            height=20
+        ttk.Button(
+            maintenance_frame,
+            text="Run Maintenance Now",
+            command=self.start_maintenance
+        ).pack(side='left', padx=5)
+        
+        ttk.Button(
+            maintenance_frame,
+            text="Enable Incremental Vacuum",
+            command=self.convert_incremental_vacuum
+        ).pack(side='left', padx=5)
+        
+        self.maintenance_status = ttk.Label(
+            maintenance_frame,
+            text="Runs after 5 minutes idle and on exit"
         )
-        self.report_text.pack(fill='both', expand=True, padx=5, pady=5)
+        self.maintenance_status.pack(side='left', padx=5)
+        
+        ttk.Button(
+            maintenance_frame,
+            text="UI Stalls...",
+            command=self.stalls_dialog
+        ).pack(side='right', padx=5)
+        self.stall_status = ttk.Label(maintenance_frame, text="")
+        self.stall_status.pack(side='right', padx=5)
 
     def add_unit_dialog(self):
         """Dialog for adding a new unit"""
@@ -566,13 +5712,7 @@ class EngagementTracker:
         ttk.Label(dialog, text="Type:").pack(padx=5, pady=5)
         type_combo = ttk.Combobox(
             dialog,
-            values=[
-                'Combat Unit',
-                'Support Unit',
-                'Training Unit',
-                'Research Unit',
-                'Other'
-            ]
+            values=lookup_names(self.conn, 'unit_types')
         )
         type_combo.pack(fill='x', padx=5)
         
@@ -593,11 +5733,11 @@ class EngagementTracker:
         notes_text.pack(fill='x', padx=5)
         
         def save_unit():
-            self.cursor.execute('''
+            self.save_in_background(dialog, self.refresh_units, execute_write, f'''
                 INSERT INTO units (
-                    name, type, location, commander, poc, notes
+                    name, type_id, location, commander, poc, notes
                 )
-                VALUES (?, ?, ?, ?, ?, ?)
+                VALUES (?, {lookup_sql('unit_types')}, ?, ?, ?, ?)
             ''', (
                 name_entry.get(),
                 type_combo.get(),
@@ -605,10 +5745,7 @@ class EngagementTracker:
                 commander_entry.get(),
                 poc_entry.get(),
                 notes_text.get("1.0", "end-1c")
-            ))
-            self.conn.commit()
-            self.refresh_units()
-            dialog.destroy()
+            ), [('unit_types', type_combo.get())])
         
         ttk.Button(
             dialog,
@@ -629,10 +5766,12 @@ class EngagementTracker:
         unit_id = self.units_tree.item(selected[0])['values'][0]
         
         # Fetch unit details
-        self.cursor.execute(
-            "SELECT * FROM units WHERE id=?",
-            (unit_id,)
-        )
+        self.cursor.execute('''
+            SELECT u.id, u.name, t.name, u.location, u.commander, u.poc, u.notes
+            FROM units u
+            LEFT JOIN unit_types t ON u.type_id = t.id
+            WHERE u.id = ?
+        ''', (unit_id,))
         unit = self.cursor.fetchone()
         
         dialog = tk.Toplevel(self.root)
@@ -648,15 +5787,9 @@ class EngagementTracker:
         ttk.Label(dialog, text="Type:").pack(padx=5, pady=5)
         type_combo = ttk.Combobox(
             dialog,
-            values=[
-                'Combat Unit',
-                'Support Unit',
-                'Training Unit',
-                'Research Unit',
-                'Other'
-            ]
+            values=lookup_names(self.conn, 'unit_types')
         )
-        type_combo.set(unit[2])  # type
+        type_combo.set(unit[2] or "")  # type
         type_combo.pack(fill='x', padx=5)
         
         ttk.Label(dialog, text="Location:").pack(padx=5, pady=5)
@@ -680,10 +5813,10 @@ class EngagementTracker:
         notes_text.pack(fill='x', padx=5)
         
         def update_unit():
-            self.cursor.execute('''
+            self.save_in_background(dialog, self.refresh_units, execute_write, f'''
                 UPDATE units SET
                     name = ?,
-                    type = ?,
+                    type_id = {lookup_sql('unit_types')},
                     location = ?,
                     commander = ?,
                     poc = ?,
@@ -697,10 +5830,7 @@ class EngagementTracker:
                 poc_entry.get(),
                 notes_text.get("1.0", "end-1c"),
                 unit_id
-            ))
-            self.conn.commit()
-            self.refresh_units()
-            dialog.destroy()
+            ), [('unit_types', type_combo.get())])
         
         ttk.Button(
             dialog,
@@ -723,23 +5853,25 @@ class EngagementTracker:
             "Are you sure you want to delete this unit?"
         ):
             unit_id = self.units_tree.item(selected[0])['values'][0]
-            self.cursor.execute(
-                "DELETE FROM units WHERE id=?",
-                (unit_id,)
-            )
-            self.conn.commit()
-            self.refresh_units()
+            
+            # Clearing the unit from the archives can take a while, so the
+            # delete runs on the data service
+            def removed(result):
+                self.refresh_units()
+                self.refresh_engagements()
+            
+            self.run_query(remove_unit, self.db_path, unit_id, on_done=removed)
 
-    def refresh_units(self):
+    @diagnosed
+    def refresh_units(self, on_done=None):
         """Refresh the units treeview"""
-        for item in self.units_tree.get_children():
-            self.units_tree.delete(item)
-        
-        self.cursor.execute(
-            "SELECT * FROM units ORDER BY name"
-        )
-        for unit in self.cursor.fetchall():
-            self.units_tree.insert('', 'end', values=unit)
+        # Notes are only loaded into the detail pane
+        self.load_tree(self.units_tree, '''
+            SELECT u.id, u.name, t.name, u.location, u.commander, u.poc
+            FROM units u
+            LEFT JOIN unit_types t ON u.type_id = t.id
+            ORDER BY u.name
+        ''', 'units', on_done)
 
     def add_researcher_dialog(self):
         """Dialog for adding a new researcher"""
@@ -773,7 +5905,7 @@ class EngagementTracker:
         notes_text.pack(fill='x', padx=5)
         
         def save_researcher():
-            self.cursor.execute('''
+            self.save_in_background(dialog, self.refresh_researchers, execute_write, '''
                 INSERT INTO researchers (
                     name, department, expertise, email, phone, notes
                 )
@@ -786,9 +5918,6 @@ class EngagementTracker:
                 phone_entry.get(),
                 notes_text.get("1.0", "end-1c")
             ))
-            self.conn.commit()
-            self.refresh_researchers()
-            dialog.destroy()
         
         ttk.Button(
             dialog,
@@ -851,7 +5980,7 @@ class EngagementTracker:
         notes_text.pack(fill='x', padx=5)
         
         def update_researcher():
-            self.cursor.execute('''
+            self.save_in_background(dialog, self.refresh_researchers, execute_write, '''
                 UPDATE researchers SET
                     name = ?,
                     department = ?,
@@ -869,9 +5998,6 @@ class EngagementTracker:
                 notes_text.get("1.0", "end-1c"),
                 researcher_id
             ))
-            self.conn.commit()
-            self.refresh_researchers()
-            dialog.destroy()
         
         ttk.Button(
             dialog,
@@ -879,16 +6005,14 @@ class EngagementTracker:
             command=update_researcher
         ).pack(pady=20)
 
-    def refresh_researchers(self):
+    @diagnosed
+    def refresh_researchers(self, on_done=None):
         """Refresh the researchers treeview"""
-        for item in self.researchers_tree.get_children():
-            self.researchers_tree.delete(item)
-        
-        self.cursor.execute(
-            "SELECT * FROM researchers ORDER BY name"
+        self.load_tree(
+            self.researchers_tree,
+            "SELECT * FROM researchers ORDER BY name",
+            on_done=on_done
         )
-        for researcher in self.cursor.fetchall():
-            self.researchers_tree.insert('', 'end', values=researcher)
 
     def add_project_dialog(self):
         """Dialog for adding a new project"""
@@ -904,13 +6028,7 @@ class EngagementTracker:
         ttk.Label(dialog, text="Status:").pack(padx=5, pady=5)
         status_combo = ttk.Combobox(
             dialog,
-            values=[
-                'Planning',
-                'In Progress',
-                'On Hold',
-                'Completed',
-                'Cancelled'
-            ]
+            values=lookup_names(self.conn, 'project_statuses')
         )
         status_combo.pack(fill='x', padx=5)
         
@@ -943,12 +6061,12 @@ class EngagementTracker:
         notes_text.pack(fill='x', padx=5)
         
         def save_project():
-            self.cursor.execute('''
+            self.save_in_background(dialog, self.refresh_projects, execute_write, f'''
                 INSERT INTO projects (
-                    name, status, start_date, end_date,
+                    name, status_id, start_date, end_date,
                     description, notes
                 )
-                VALUES (?, ?, ?, ?, ?, ?)
+                VALUES (?, {lookup_sql('project_statuses')}, ?, ?, ?, ?)
             ''', (
                 name_entry.get(),
                 status_combo.get(),
@@ -956,10 +6074,7 @@ class EngagementTracker:
                 end_date.get_date().strftime('%Y-%m-%d'),
                 description_text.get("1.0", "end-1c"),
                 notes_text.get("1.0", "end-1c")
-            ))
-            self.conn.commit()
-            self.refresh_projects()
-            dialog.destroy()
+            ), [('project_statuses', status_combo.get())])
         
         ttk.Button(
             dialog,
@@ -980,10 +6095,14 @@ class EngagementTracker:
         project_id = self.projects_tree.item(selected[0])['values'][0]
         
         # Fetch project details
-        self.cursor.execute(
-            "SELECT * FROM projects WHERE id=?",
-            (project_id,)
-        )
+        self.cursor.execute('''
+            SELECT
+                p.id, p.name, s.name, p.start_date, p.end_date,
+                p.description, p.notes
+            FROM projects p
+            LEFT JOIN project_statuses s ON p.status_id = s.id
+            WHERE p.id = ?
+        ''', (project_id,))
         project = self.cursor.fetchone()
         
         dialog = tk.Toplevel(self.root)
@@ -999,13 +6118,7 @@ class EngagementTracker:
         ttk.Label(dialog, text="Status:").pack(padx=5, pady=5)
         status_combo = ttk.Combobox(
             dialog,
-            values=[
-                'Planning',
-                'In Progress',
-                'On Hold',
-                'Completed',
-                'Cancelled'
-            ]
+            values=lookup_names(self.conn, 'project_statuses')
         )
         status_combo.set(project[2] or 'Planning')  # status
         status_combo.pack(fill='x', padx=5)
@@ -1051,10 +6164,10 @@ class EngagementTracker:
         notes_text.pack(fill='x', padx=5)
         
         def update_project():
-            self.cursor.execute('''
+            self.save_in_background(dialog, self.refresh_projects, execute_write, f'''
                 UPDATE projects SET
                     name = ?,
-                    status = ?,
+                    status_id = {lookup_sql('project_statuses')},
                     start_date = ?,
                     end_date = ?,
                     description = ?,
@@ -1068,10 +6181,7 @@ class EngagementTracker:
                 description_text.get("1.0", "end-1c"),
                 notes_text.get("1.0", "end-1c"),
                 project_id
-            ))
-            self.conn.commit()
-            self.refresh_projects()
-            dialog.destroy()
+            ), [('project_statuses', status_combo.get())])
         
         ttk.Button(
             dialog,
@@ -1079,16 +6189,17 @@ class EngagementTracker:
             command=update_project
         ).pack(pady=20)
 
-    def refresh_projects(self):
+    @diagnosed
+    def refresh_projects(self, on_done=None):
         """Refresh the projects treeview"""
-        for item in self.projects_tree.get_children():
-            self.projects_tree.delete(item)
-        
-        self.cursor.execute(
-            "SELECT * FROM projects ORDER BY name"
-        )
-        for project in self.cursor.fetchall():
-            self.projects_tree.insert('', 'end', values=project)
+        self.load_tree(self.projects_tree, '''
+            SELECT
+                p.id, p.name, s.name, p.start_date, p.end_date,
+                p.description, p.notes
+            FROM projects p
+            LEFT JOIN project_statuses s ON p.status_id = s.id
+            ORDER BY p.name
+        ''', on_done=on_done)
 
     def add_review_dialog(self):
         """Dialog for adding a new weekly review"""
@@ -1106,6 +6217,7 @@ class EngagementTracker:
             borderwidth=2
         )
         week_start.pack(fill='x', padx=5)
+        self.add_week_stats(dialog, week_start)
         
         ttk.Label(dialog, text="Summary:").pack(padx=5, pady=5)
         summary_text = tk.Text(dialog, height=4)
@@ -1124,7 +6236,7 @@ class EngagementTracker:
         next_steps_text.pack(fill='x', padx=5)
         
         def save_review():
-            self.cursor.execute('''
+            self.save_in_background(dialog, self.refresh_reviews, execute_write, '''
                 INSERT INTO weekly_reviews (
                     week_start, summary, highlights,
                     challenges, next_steps
@@ -1137,9 +6249,6 @@ class EngagementTracker:
                 challenges_text.get("1.0", "end-1c"),
                 next_steps_text.get("1.0", "end-1c")
             ))
-            self.conn.commit()
-            self.refresh_reviews()
-            dialog.destroy()
         
         ttk.Button(
             dialog,
@@ -1147,6 +6256,31 @@ class EngagementTracker:
             command=save_review
         ).pack(pady=20)
 
+    def add_week_stats(self, dialog, week_start):
+        """Show the engagement counts for the week picked in a review dialog"""
+        stats_label = ttk.Label(dialog, justify='left', wraplength=380)
+        stats_label.pack(fill='x', padx=5, pady=5)
+        
+        def show_stats(event=None):
+            stats = weekly_stats(self.conn, week_start.get_date())
+            total = stats.get('total', [('', 0)])[0][1]
+            lines = [f"Engagements this week: {total}"]
+            for dimension, title in (
+                ('type', 'By type'),
+                ('unit', 'Units'),
+                ('project', 'Projects'),
+                ('researcher', 'Personnel'),
+            ):
+                if dimension in stats:
+                    counts = ', '.join(
+                        f"{name} ({count})" for name, count in stats[dimension]
+                    )
+                    lines.append(f"{title}: {counts}")
+            stats_label.config(text="\n".join(lines))
+        
+        week_start.bind('<<DateEntrySelected>>', show_stats)
+        show_stats()
+
     def edit_review(self):
         """Edit an existing weekly review"""
         selected = self.reviews_tree.selection()
@@ -1185,6 +6319,7 @@ class EngagementTracker:
             else:
                 week_start.set_date(review[1])  # Already a datetime object
         week_start.pack(fill='x', padx=5)
+        self.add_week_stats(dialog, week_start)
         
         ttk.Label(dialog, text="Summary:").pack(padx=5, pady=5)
         summary_text = tk.Text(dialog, height=4)
@@ -1201,338 +6336,915 @@ class EngagementTracker:
         challenges_text.insert("1.0", review[4] or "")  # challenges
         challenges_text.pack(fill='x', padx=5)
         
-        ttk.Label(dialog, text="Next Steps:").pack(padx=5, pady=5)
-        next_steps_text = tk.Text(dialog, height=4)
-        next_steps_text.insert("1.0", review[5] or "")  # next_steps
-        next_steps_text.pack(fill='x', padx=5)
+        ttk.Label(dialog, text="Next Steps:").pack(padx=5, pady=5)
+        next_steps_text = tk.Text(dialog, height=4)
+        next_steps_text.insert("1.0", review[5] or "")  # next_steps
+        next_steps_text.pack(fill='x', padx=5)
+        
+        def update_review():
+            self.save_in_background(dialog, self.refresh_reviews, execute_write, '''
+                UPDATE weekly_reviews SET
+                    week_start = ?,
+                    summary = ?,
+                    highlights = ?,
+                    challenges = ?,
+                    next_steps = ?
+                WHERE id = ?
+            ''', (
+                week_start.get_date().strftime('%Y-%m-%d'),
+                summary_text.get("1.0", "end-1c"),
+                highlights_text.get("1.0", "end-1c"),
+                challenges_text.get("1.0", "end-1c"),
+                next_steps_text.get("1.0", "end-1c"),
+                review_id
+            ))
+        
+        ttk.Button(
+            dialog,
+            text="Update",
+            command=update_review
+        ).pack(pady=20)
+
+    @diagnosed
+    def refresh_reviews(self, on_done=None):
+        """Refresh the reviews treeview"""
+        self.load_tree(self.reviews_tree, f'''
+            SELECT
+                id,
+                week_start,
+                {preview_sql('summary')},
+                {preview_sql('highlights')},
+                {preview_sql('challenges')},
+                {preview_sql('next_steps')}
+            FROM weekly_reviews
+            ORDER BY week_start DESC
+        ''', 'weekly_reviews', on_done)
+
+    def attach_report_archives(self, start_date, end_date):
+        """Attach the archived years a report period needs"""
+        try:
+            attach_archives(self.conn, self.db_path, start_date, end_date)
+        except (ValueError, sqlite3.Error) as e:
+            messagebox.showerror("Archive Error", str(e))
+            return False
+        return True
+
+    @diagnosed
+    def archive_old_engagements(self):
+        """Move engagements before the cutoff date into yearly archives"""
+        cutoff = self.archive_cutoff.get_date()
+        if not messagebox.askyesno(
+            "Confirm Archive",
+            f"Move all engagements dated before {cutoff} into the "
+            f"yearly archive files?"
+        ):
+            return
+        
+        def archived(moved):
+            self.refresh_engagements()
+            if moved:
+                details = "\n".join(
+                    f"{year}: {count} engagements"
+                    for year, count in moved.items()
+                )
+            else:
+                details = "No engagements before the cutoff date."
+            messagebox.showinfo("Archive Complete", details)
+        
+        def failed(error):
+            messagebox.showerror("Archive Error", str(error))
+        
+        # Years of engagements are rewritten, so this runs on the data service
+        self.run_query(
+            archive_engagements,
+            self.db_path,
+            cutoff,
+            on_done=archived,
+            on_error=failed
+        )
+
+    def workload_dialog(self):
+        """Heatmap of engagements per researcher per week"""
+        start_date = self.start_date.get_date()
+        end_date = self.end_date.get_date()
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title(f"Researcher Workload {start_date} - {end_date}")
+        dialog.geometry("900x600")
+        
+        status = ttk.Label(dialog, text="Loading...")
+        status.pack(anchor='w', padx=5, pady=5)
+        
+        btn_frame = ttk.Frame(dialog)
+        btn_frame.pack(side='bottom', fill='x', padx=5, pady=5)
+        
+        legend = ttk.Frame(dialog)
+        legend.pack(side='bottom', fill='x', padx=5)
+        ttk.Label(legend, text="Engagements per week:").pack(side='left', padx=5)
+        for level, color in enumerate(WORKLOAD_PALETTE):
+            label = f"{level}+" if level == len(WORKLOAD_PALETTE) - 1 else str(level)
+            tk.Label(legend, text=label, bg=color, width=3).pack(side='left')
+        
+        canvas = tk.Canvas(dialog, background='white', highlightthickness=0)
+        y_scroll = ttk.Scrollbar(dialog, orient='vertical', command=canvas.yview)
+        x_scroll = ttk.Scrollbar(dialog, orient='horizontal', command=canvas.xview)
+        x_scroll.pack(side='bottom', fill='x')
+        y_scroll.pack(side='right', fill='y')
+        canvas.pack(fill='both', expand=True, padx=5)
+        
+        cell_w, cell_h, name_w, header_h = 12, 14, 180, 40
+        matrix = {}
+        
+        def draw_band():
+            """Render only the rows in view, so cost follows the window size"""
+            if not matrix:
+                return
+            names, weeks, counts, order, levels = (
+                matrix['names'], matrix['weeks'], matrix['counts'],
+                matrix['order'], matrix['levels']
+            )
+            canvas.delete('band')
+            top = max(int((canvas.canvasy(0) - header_h) // cell_h), 0)
+            bottom = min(top + canvas.winfo_height() // cell_h + 2, len(order))
+            if bottom <= top or not weeks:
+                return
+            
+            rows = levels[order[top:bottom]]
+            image = tk.PhotoImage(width=len(weeks), height=bottom - top)
+            image.put(' '.join(
+                '{' + ' '.join(WORKLOAD_PALETTE[level] for level in row) + '}'
+                for row in rows.tolist()
+            ))
+            image = image.zoom(cell_w, cell_h)
+            matrix['image'] = image
+            y = header_h + top * cell_h
+            canvas.create_image(name_w, y, anchor='nw', image=image, tags=('band',))
+            for offset, index in enumerate(order[top:bottom]):
+                canvas.create_text(
+                    name_w - 6, y + offset * cell_h + cell_h / 2,
+                    anchor='e',
+                    text=f"{names[index]} ({int(counts[index].sum())})",
+                    tags=('band',)
+                )
+        
+        def on_scroll(first, last):
+            y_scroll.set(first, last)
+            draw_band()
+        
+        def on_motion(event):
+            if not matrix:
+                return
+            week = int((canvas.canvasx(event.x) - name_w) // cell_w)
+            row = int((canvas.canvasy(event.y) - header_h) // cell_h)
+            if 0 <= week < len(matrix['weeks']) and 0 <= row < len(matrix['order']):
+                index = matrix['order'][row]
+                status.config(
+                    text=(
+                        f"{matrix['names'][index]}, week of "
+                        f"{matrix['weeks'][week]:%d %b %Y}: "
+                        f"{matrix['counts'][index, week]} engagements"
+                    )
+                )
+        
+        canvas.configure(
+            xscrollcommand=x_scroll.set,
+            yscrollcommand=on_scroll
+        )
+        canvas.bind('<Motion>', on_motion)
+        canvas.bind('<MouseWheel>', lambda event: canvas.yview_scroll(-event.delta // 120, 'units'))
+        canvas.bind('<Button-4>', lambda event: canvas.yview_scroll(-3, 'units'))
+        canvas.bind('<Button-5>', lambda event: canvas.yview_scroll(3, 'units'))
+        
+        def show(result):
+            import numpy as np
+            
+            if not dialog.winfo_exists():
+                return
+            names, weeks, counts = result
+            matrix.update(
+                names=names,
+                weeks=weeks,
+                counts=counts,
+                order=workload_order(counts),
+                levels=np.minimum(counts, len(WORKLOAD_PALETTE) - 1)
+            )
+            busy = int((counts >= WORKLOAD_HIGH).sum())
+            status.config(
+                text=(
+                    f"{len(names)} researchers over {len(weeks)} weeks; "
+                    f"{busy} researcher-weeks with {WORKLOAD_HIGH} or more engagements"
+                )
+            )
+            
+            canvas.delete('all')
+            for column, week in enumerate(weeks):
+                if week.day <= 7:
+                    canvas.create_text(
+                        name_w + column * cell_w, header_h - 4,
+                        anchor='sw',
+                        text=f"{week:%b %y}"
+                    )
+            canvas.configure(
+                scrollregion=(
+                    0, 0,
+                    name_w + len(weeks) * cell_w + 10,
+                    header_h + len(names) * cell_h
+                )
+            )
+            canvas.yview_moveto(0)
+            draw_band()
+        
+        def failed(error):
+            if dialog.winfo_exists():
+                status.config(text=f"Could not load workload: {error}")
+        
+        self.run_query(
+            cached_workload,
+            self.db_path,
+            start_date,
+            end_date,
+            self.workload_cache,
+            on_done=show,
+            on_error=failed
+        )
+        
+        def export():
+            if not matrix:
+                return
+            file_format = self.export_format.get()
+            extension, label, _ = EXPORTERS[file_format]
+            filename = filedialog.asksaveasfilename(
+                parent=dialog,
+                title="Export Workload",
+                initialfile=os.path.basename(
+                    report_filename('Researcher Workload', extension)
+                ),
+                defaultextension=f".{extension}",
+                filetypes=[(label, f"*.{extension}"), ("All files", "*.*")]
+            )
+            if not filename:
+                return
+            
+            columns, rows = workload_table(
+                matrix['names'],
+                matrix['weeks'],
+                matrix['counts']
+            )
+            try:
+                write_report(filename, columns, rows, file_format)
+            except ImportError as e:
+                messagebox.showerror(
+                    "Export Error",
+                    f"{label} export needs an optional package: {e.name}",
+                    parent=dialog
+                )
+                return
+            except OSError as e:
+                messagebox.showerror("Export Error", str(e), parent=dialog)
+                return
+            messagebox.showinfo(
+                "Export Complete",
+                f"Workload exported to {filename}",
+                parent=dialog
+            )
+        
+        ttk.Button(
+            btn_frame,
+            text="Export...",
+            command=export
+        ).pack(side='left', padx=5)
+        
+        ttk.Button(
+            btn_frame,
+            text="Close",
+            command=dialog.destroy
+        ).pack(side='right', padx=5)
+
+    def stalls_dialog(self):
+        """Histograms of UI stalls per action, with the stack of each stall"""
+        watchdog = self.stall_watchdog
+        labels = stall_bucket_labels()
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("UI Stalls")
+        dialog.geometry("900x600")
+        
+        status = ttk.Label(dialog, text="")
+        status.pack(anchor='w', padx=5, pady=5)
+        
+        btn_frame = ttk.Frame(dialog)
+        btn_frame.pack(side='bottom', fill='x', padx=5, pady=5)
+        
+        columns = ('Action', 'Stalls', 'Longest ms', 'Total s', *labels)
+        histograms = ttk.Treeview(dialog, columns=columns, show='headings', height=8)
+        for col in columns:
+            histograms.heading(col, text=col)
+            histograms.column(col, width=200 if col == 'Action' else 80)
+        histograms.pack(fill='x', padx=5)
+        
+        panes = ttk.PanedWindow(dialog, orient='horizontal')
+        panes.pack(fill='both', expand=True, padx=5, pady=5)
+        
+        recent = ttk.Treeview(panes, columns=('Time', 'ms', 'Action'), show='headings')
+        for col, width in (('Time', 170), ('ms', 60), ('Action', 180)):
+            recent.heading(col, text=col)
+            recent.column(col, width=width)
+        panes.add(recent, weight=1)
+        
+        stack = tk.Text(panes, wrap='none', height=10)
+        panes.add(stack, weight=1)
+        
+        stalls = []
+        
+        def refresh():
+            rows = watchdog.histogram_rows()
+            histograms.delete(*histograms.get_children())
+            for row in rows:
+                histograms.insert('', 'end', values=row)
+            
+            stalls[:] = reversed(watchdog.stalls)
+            recent.delete(*recent.get_children())
+            for index, stall in enumerate(stalls):
+                recent.insert(
+                    '', 'end',
+                    iid=str(index),
+                    values=(stall['at'], stall['ms'], stall['action'])
+                )
+            stack.delete('1.0', 'end')
+            status.config(
+                text=(
+                    f"{sum(row[1] for row in rows)} stalls of "
+                    f"{STALL_BUCKETS_MS[0]} ms or more since "
+                    f"{watchdog.since:%d %b %Y %H:%M}"
+                )
+            )
+        
+        def show_stack(event):
+            selection = recent.selection()
+            stack.delete('1.0', 'end')
+            if selection:
+                stall = stalls[int(selection[0])]
+                stack.insert('1.0', '\n'.join(stall['stack']) or "(stack not captured)")
+        
+        recent.bind('<<TreeviewSelect>>', show_stack)
+        
+        def export():
+            filename = filedialog.asksaveasfilename(
+                parent=dialog,
+                title="Export UI Stalls",
+                initialfile=f"ui_stalls_{datetime.now():%Y%m%d_%H%M%S}.json",
+                defaultextension=".json",
+                filetypes=[("JSON", "*.json"), ("All files", "*.*")]
+            )
+            if not filename:
+                return
+            try:
+                watchdog.export(filename)
+            except OSError as e:
+                messagebox.showerror("Export Error", str(e), parent=dialog)
+                return
+            messagebox.showinfo(
+                "Export Complete",
+                f"UI stalls exported to {filename}",
+                parent=dialog
+            )
+        
+        refresh()
+        
+        ttk.Button(
+            btn_frame,
+            text="Refresh",
+            command=refresh
+        ).pack(side='left', padx=5)
+        
+        ttk.Button(
+            btn_frame,
+            text="Export...",
+            command=export
+        ).pack(side='left', padx=5)
+        
+        ttk.Button(
+            btn_frame,
+            text="Close",
+            command=dialog.destroy
+        ).pack(side='right', padx=5)
+
+    def duplicates_dialog(self, table):
+        """Dialog listing likely duplicates with actions to merge them"""
+        if table == 'units':
+            title = "Duplicate Organizations"
+            find, merge, refresh = (
+                find_duplicate_units,
+                merge_units,
+                self.refresh_units
+            )
+        else:
+            title = "Duplicate Personnel"
+            find, merge, refresh = (
+                find_duplicate_researchers,
+                merge_researchers,
+                self.refresh_researchers
+            )
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title(title)
+        dialog.geometry("800x500")
+        
+        cols = (
+            'Score', 'ID A', 'Name A', 'Engagements A',
+            'ID B', 'Name B', 'Engagements B'
+        )
+        tree = ttk.Treeview(dialog, columns=cols, show='headings')
+        for col in cols:
+            tree.heading(col, text=col)
+            if col.startswith('Name'):
+                tree.column(col, width=200)
+            else:
+                tree.column(col, width=80)
+        
+        scrollbar = ttk.Scrollbar(
+            dialog,
+            orient='vertical',
+            command=tree.yview
+        )
+        tree.configure(yscrollcommand=scrollbar.set)
+        
+        btn_frame = ttk.Frame(dialog)
+        btn_frame.pack(side='bottom', fill='x', padx=5, pady=5)
+        tree.pack(side='left', fill='both', expand=True, padx=5, pady=5)
+        scrollbar.pack(side='right', fill='y')
+        
+        for score, a, b in find(self.conn):
+            tree.insert('', 'end', values=(score,) + tuple(a) + tuple(b))
+        
+        def merge_selected(keep_first):
+            selected = tree.selection()
+            if not selected:
+                messagebox.showwarning(
+                    "No Selection",
+                    "Please select a pair to merge.",
+                    parent=dialog
+                )
+                return
+            
+            values = tree.item(selected[0])['values']
+            keep, drop = (values[1:4], values[4:7])
+            if not keep_first:
+                keep, drop = drop, keep
+            if not messagebox.askyesno(
+                "Confirm Merge",
+                f"Merge '{drop[1]}' into '{keep[1]}'? "
+                f"'{drop[1]}' will be deleted.",
+                parent=dialog
+            ):
+                return
+            
+            try:
+                merge(self.conn, self.db_path, keep[0], drop[0])
+            except sqlite3.Error as e:
+                messagebox.showerror("Merge Error", str(e), parent=dialog)
+                return
+            
+            # Drop every pair that mentions the merged record
+            for item in tree.get_children():
+                item_values = tree.item(item)['values']
+                if drop[0] in (item_values[1], item_values[4]):
+                    tree.delete(item)
+            refresh()
+            self.refresh_engagements()
+        
+        ttk.Button(
+            btn_frame,
+            text="Merge B into A",
+            command=lambda: merge_selected(True)
+        ).pack(side='left', padx=5)
+        
+        ttk.Button(
+            btn_frame,
+            text="Merge A into B",
+            command=lambda: merge_selected(False)
+        ).pack(side='left', padx=5)
+
+    def note_activity(self, event=None):
+        """Remember when the user last pressed a key or button"""
+        self.last_activity = time.monotonic()
+
+    def check_idle(self):
+        """Start maintenance once the application has been idle"""
+        idle = time.monotonic() - self.last_activity
+        already_ran = self.maintenance_started > self.last_activity
+        if idle >= MAINTENANCE_IDLE_SECONDS and not already_ran:
+            self.start_maintenance()
+        self.root.after(60 * 1000, self.check_idle)
+
+    def toggle_diagnostics(self):
+        """Start profiling the next actions, or stop and save what is done"""
+        if self.diagnostics:
+            self.diagnostics.stop()
+            return
+        try:
+            actions = max(int(self.diagnostics_count.get()), 1)
+        except ValueError:
+            actions = DIAGNOSTICS_ACTIONS
+        self.diagnostics = DiagnosticsCapture(
+            self.db_path,
+            actions,
+            lambda: self.conn,
+            self.diagnostics_saved
+        )
+        self.diagnostics_btn.config(text="Stop Capture")
+        self.diagnostics_status.config(
+            text=f"Capturing the next {actions} actions..."
+        )
+
+    def diagnostics_saved(self, path):
+        """Show where a diagnostics capture was saved"""
+        self.diagnostics = None
+        self.diagnostics_btn.config(text="Start Capture")
+        self.diagnostics_status.config(
+            text=f"Saved {path}" if path else "No actions were captured"
+        )
+
+    def start_maintenance(self):
+        """Run maintenance on its own connection off the UI thread"""
+        if self.maintenance_thread and self.maintenance_thread.is_alive():
+            return
+        self.maintenance_started = time.monotonic()
+        self.maintenance_status.config(text="Maintenance running...")
+        
+        db_path = self.db_path
+        
+        def maintain():
+            conn = sqlite3.connect(db_path)
+            try:
+                results = run_maintenance(conn, db_path)
+                self.maintenance_events.put((results, None))
+            except sqlite3.Error as e:
+                self.maintenance_events.put((None, e))
+            finally:
+                conn.close()
+        
+        self.maintenance_thread = threading.Thread(
+            target=maintain,
+            name='maintenance',
+            daemon=True
+        )
+        self.maintenance_thread.start()
+        self.poll_maintenance_events()
+
+    @diagnosed
+    def convert_incremental_vacuum(self):
+        """Rebuild an older database so deletes can hand pages back"""
+        if not messagebox.askyesno(
+            "Enable Incremental Vacuum",
+            "This rebuilds the whole database file with a full VACUUM, "
+            "which can take a while for a large database. Saves wait "
+            "until it is done. Continue?"
+        ):
+            return
+        self.maintenance_status.config(text="Rebuilding the database...")
+        
+        def done(converted):
+            self.maintenance_status.config(
+                text="Incremental vacuum enabled" if converted
+                else "Incremental vacuum was already enabled"
+            )
+        
+        def failed(error):
+            self.maintenance_status.config(text=f"Rebuild failed: {error}")
         
-        def update_review():
-            self.cursor.execute('''
-                UPDATE weekly_reviews SET
-                    week_start = ?,
-                    summary = ?,
-                    highlights = ?,
-                    challenges = ?,
-                    next_steps = ?
-                WHERE id = ?
-            ''', (
-                week_start.get_date().strftime('%Y-%m-%d'),
-                summary_text.get("1.0", "end-1c"),
-                highlights_text.get("1.0", "end-1c"),
-                challenges_text.get("1.0", "end-1c"),
-                next_steps_text.get("1.0", "end-1c"),
-                review_id
-            ))
-            self.conn.commit()
-            self.refresh_reviews()
-            dialog.destroy()
+        self.run_query(enable_incremental_vacuum, on_done=done, on_error=failed)
+
+    def poll_maintenance_events(self):
+        """Show the maintenance outcome on the Tk loop"""
+        try:
+            results, error = self.maintenance_events.get_nowait()
+        except queue.Empty:
+            self.root.after(200, self.poll_maintenance_events)
+            return
         
-        ttk.Button(
-            dialog,
-            text="Update",
-            command=update_review
-        ).pack(pady=20)
+        if error:
+            self.maintenance_status.config(text=f"Maintenance failed: {error}")
+            return
+        size_before = results[0][4]
+        size_after = results[-1][5]
+        probe_before = results[0][8]
+        probe_after = results[-1][9]
+        self.maintenance_status.config(
+            text=(
+                f"Last run {results[0][0]}: "
+                f"{size_before / 1024:.0f} KB -> {size_after / 1024:.0f} KB, "
+                f"list query {probe_before:.1f} ms -> {probe_after:.1f} ms"
+            )
+        )
 
-    def refresh_reviews(self):
-        """Refresh the reviews treeview"""
-        for item in self.reviews_tree.get_children():
-            self.reviews_tree.delete(item)
+    def run_query(self, job, *args, on_done=None, on_error=None):
+        """Run job(conn, *args) on the data service
+
+        on_done(result) or on_error(exception) is called on the Tk loop;
+        errors are shown in a message box by default.
+        """
+        # A diagnostics capture follows the job onto the data service, and
+        # the result is handled as part of the action that asked for it
+        action = self.current_action
+        job, deliver = self.follow_work(job)
+        on_done = self.within_action(action, deliver(on_done))
+        on_error = self.within_action(
+            action,
+            deliver(on_error or self.show_data_error)
+        )
+        future = self.data.submit(job, *args)
+        future.add_done_callback(
+            lambda done: self.data_events.put((done, on_done, on_error))
+        )
+        return future
+
+    def follow_work(self, job, trace_sql=True):
+        """Attach work leaving the Tk thread to a running diagnostics capture
+
+        Returns (job, deliver) as DiagnosticsCapture.follow() does; both
+        leave the job and callbacks as they are when nothing is captured.
+        """
+        if self.diagnostics is None:
+            return job, lambda callback: callback
+        return self.diagnostics.follow(job, trace_sql)
+
+    def within_action(self, action, callback):
+        """Wrap a callback to run under the name of a UI action"""
+        if action is None or callback is None:
+            return callback
+        
+        def run(*args):
+            outer = self.current_action
+            self.current_action = action
+            try:
+                return callback(*args)
+            finally:
+                self.current_action = outer
+        return run
+
+    def show_data_error(self, error):
+        """Report a failed data service request"""
+        messagebox.showerror("Database Error", str(error))
+
+    def stall_heartbeat(self):
+        """Beat the stall watchdog and show the longest stall so far"""
+        stall = self.stall_watchdog.beat()
+        if stall and stall['ms'] > self.longest_stall:
+            self.longest_stall = stall['ms']
+            self.stall_status.config(
+                text=f"Longest UI stall: {stall['ms']} ms ({stall['action']})"
+            )
+        self.root.after(STALL_HEARTBEAT_MS, self.stall_heartbeat)
+
+    def poll_data_events(self):
+        """Deliver finished data service requests"""
+        try:
+            while True:
+                future, on_done, on_error = self.data_events.get_nowait()
+                error = future.exception()
+                if error is None:
+                    if on_done:
+                        on_done(future.result())
+                else:
+                    (on_error or self.show_data_error)(error)
+        except queue.Empty:
+            pass
+        self.root.after(DATA_POLL_MS, self.poll_data_events)
+
+    def load_tree(self, tree, sql, table=None, on_done=None):
+        """Reload a treeview from a query run on the data service"""
+        def fill(rows):
+            for item in tree.get_children():
+                tree.delete(item)
+            if table:
+                self.forget_details(table)
+            for row in rows:
+                tree.insert('', 'end', values=row)
+            if on_done:
+                on_done()
+        
+        self.run_query(fetch_all, sql, on_done=fill)
+
+    @diagnosed
+    def save_in_background(self, dialog, refresh, job, *args):
+        """Run a dialog's save on the data service
+
+        The dialog closes and its list refreshes once the save commits; if
+        it fails the dialog stays open with its input.
+        """
+        def saved(result):
+            refresh()
+            dialog.destroy()
         
-        self.cursor.execute('''
-            SELECT
-                id,
-                week_start,
-                summary,
-                highlights,
-                challenges,
-                next_steps
-            FROM weekly_reviews
-            ORDER BY week_start DESC
-        ''')
+        def failed(error):
+            messagebox.showerror("Save Error", str(error), parent=dialog)
         
-        for review in self.cursor.fetchall():
-            self.reviews_tree.insert('', 'end', values=review)
+        self.run_query(job, *args, on_done=saved, on_error=failed)
+
+    def poll_backup_events(self):
+        """Show results from the backup thread on the Tk loop"""
+        try:
+            while True:
+                path, error = self.backup_events.get_nowait()
+                if error:
+                    self.backup_status.config(text=f"Backup failed: {error}")
+                else:
+                    self.backup_status.config(
+                        text=f"Last backup: {os.path.basename(path)}"
+                    )
+        except queue.Empty:
+            pass
+        self.root.after(1000, self.poll_backup_events)
 
+    @diagnosed
     def generate_report(self):
         """Generate a report based on selected type and date range"""
         report_type = self.report_type.get()
         start_date = self.start_date.get_date()
         end_date = self.end_date.get_date()
         
+        if not self.attach_report_archives(start_date, end_date):
+            return
+        
         self.report_text.delete(1.0, tk.END)
-        report = []
+        prepare_report_window(self.conn, start_date, end_date)
+        columns, rows = run_report(
+            self.conn,
+            report_type,
+            start_date,
+            end_date
+        )
         
-        if report_type == 'Unit Engagement Summary':
-            self.cursor.execute('''
-                SELECT
-                    u.name as unit_name,
-                    COUNT(e.id) as engagement_count,
-                    GROUP_CONCAT(DISTINCT p.name) as projects,
-                    GROUP_CONCAT(DISTINCT r.name) as researchers
-                FROM units u
-                LEFT JOIN engagements e ON u.id = e.unit_id
-                    AND date(e.date_time) BETWEEN date(?) AND date(?)
-                LEFT JOIN projects p ON e.project_id = p.id
-                LEFT JOIN engagement_participants ep ON e.id = ep.engagement_id
-                LEFT JOIN researchers r ON ep.researcher_id = r.id
-                GROUP BY u.id
-                ORDER BY engagement_count DESC
-            ''', (start_date, end_date))
-            
-            report.append("Unit Engagement Summary Report")
-            report.append(f"Period: {start_date} to {end_date}\n")
-            
-            for row in self.cursor.fetchall():
-                report.append(f"Unit: {row[0]}")
-                report.append(f"Total Engagements: {row[1]}")
-                if row[2]:
-                    report.append("Projects Involved:")
-                    for proj in row[2].split(','):
-                        report.append(f"  - {proj.strip()}")
-                if row[3]:
-                    report.append("Researchers Involved:")
-                    for res in row[3].split(','):
-                        report.append(f"  - {res.strip()}")
-                report.append("-" * 50)
-        
-        elif report_type == 'Researcher Activity':
-            self.cursor.execute('''
-                SELECT
-                    r.name as researcher_name,
-                    COUNT(e.id) as engagement_count,
-                    GROUP_CONCAT(DISTINCT u.name) as units,
-                    GROUP_CONCAT(DISTINCT p.name) as projects
-                FROM researchers r
-                LEFT JOIN engagement_participants ep ON r.id = ep.researcher_id
-                LEFT JOIN engagements e ON ep.engagement_id = e.id
-                    AND date(e.date_time) BETWEEN date(?) AND date(?)
-                LEFT JOIN units u ON e.unit_id = u.id
-                LEFT JOIN projects p ON e.project_id = p.id
-                GROUP BY r.id
-                ORDER BY engagement_count DESC
-            ''', (start_date, end_date))
-            
-            report.append("Researcher Activity Report")
-            report.append(f"Period: {start_date} to {end_date}\n")
-            
-            for row in self.cursor.fetchall():
-                report.append(f"Researcher: {row[0]}")
-                report.append(f"Total Engagements: {row[1]}")
-                if row[2]:
-                    report.append("Units Engaged:")
-                    for unit in row[2].split(','):
-                        report.append(f"  - {unit.strip()}")
-                if row[3]:
-                    report.append("Projects Involved:")
-                    for proj in row[3].split(','):
-                        report.append(f"  - {proj.strip()}")
-                report.append("-" * 50)
-        
-        elif report_type == 'Project Status':
-            self.cursor.execute('''
-                SELECT
-                    p.name as project_name,
-                    p.status,
-                    COUNT(e.id) as engagement_count,
-                    GROUP_CONCAT(DISTINCT u.name) as units,
-                    GROUP_CONCAT(DISTINCT r.name) as researchers
-                FROM projects p
-                LEFT JOIN engagements e ON p.id = e.project_id
-                    AND date(e.date_time) BETWEEN date(?) AND date(?)
-                LEFT JOIN units u ON e.unit_id = u.id
-                LEFT JOIN engagement_participants ep ON e.id = ep.engagement_id
-                LEFT JOIN researchers r ON ep.researcher_id = r.id
-                GROUP BY p.id
-                ORDER BY engagement_count DESC
-            ''', (start_date, end_date))
-            
-            report.append("Project Status Report")
-            report.append(f"Period: {start_date} to {end_date}\n")
-            
-            for row in self.cursor.fetchall():
-                report.append(f"Project: {row[0]}")
-                report.append(f"Status: {row[1] or 'Not Started'}")
-                report.append(f"Total Engagements: {row[2]}")
-                if row[3]:
-                    report.append("Units Involved:")
-                    for unit in row[3].split(','):
-                        report.append(f"  - {unit.strip()}")
-                if row[4]:
-                    report.append("Researchers Involved:")
-                    for res in row[4].split(','):
-                        report.append(f"  - {res.strip()}")
-                report.append("-" * 50)
-        
-        elif report_type == 'Weekly Review Summary':
-            self.cursor.execute('''
-                SELECT
-                    week_start,
-                    summary,
-                    highlights,
-                    challenges,
-                    next_steps
-                FROM weekly_reviews
-                WHERE date(week_start) BETWEEN date(?) AND date(?)
-                ORDER BY week_start DESC
-            ''', (start_date, end_date))
-            
-            report.append("Weekly Review Summary Report")
-            report.append(f"Period: {start_date} to {end_date}\n")
-            
-            for row in self.cursor.fetchall():
-                report.append(f"Week Starting: {row[0]}")
-                if row[1]:
-                    report.append("Summary:")
-                    report.append(row[1])
-                if row[2]:
-                    report.append("\nHighlights:")
-                    report.append(row[2])
-                if row[3]:
-                    report.append("\nChallenges:")
-                    report.append(row[3])
-                if row[4]:
-                    report.append("\nNext Steps:")
-                    report.append(row[4])
-                report.append("-" * 50)
-        
-        # Display report
-        self.report_text.insert(tk.END, "\n".join(report))
-
-    def export_to_excel(self):
-        """Export the current report to Excel"""
+        # Display report, formatting pages only as they are scrolled to
+        self.show_report_preview(
+            report_lines(report_type, rows, start_date, end_date)
+        )
+
+    def show_report_preview(self, lines):
+        """Start a paged preview of report lines"""
+        self.report_text.delete(1.0, tk.END)
+        self.report_pages = ReportPages(lines)
+        # (page number, text lines) of each page in the widget, top first
+        self.report_window = []
+        self.append_report_page()
+        self.update_report_page_status()
+
+    def update_report_page_status(self):
+        """Show which pages of the report are in the preview"""
+        if not self.report_window:
+            self.report_page_status.configure(text="")
+            return
+        first = self.report_window[0][0] + 1
+        last = self.report_window[-1][0] + 1
+        total = len(self.report_pages.pages)
+        of = f"{total}" if self.report_pages.complete else f"{total}+"
+        self.report_page_status.configure(text=f"Pages {first}-{last} of {of}")
+
+    def append_report_page(self):
+        """Add the page after the window, dropping the top page if full"""
+        number = self.report_window[-1][0] + 1 if self.report_window else 0
+        page = self.report_pages.page(number)
+        if page is None:
+            return False
+        text = "\n".join(page) + "\n"
+        self.report_text.insert(tk.END, text)
+        self.report_window.append((number, text.count("\n")))
+        
+        if len(self.report_window) > REPORT_WINDOW_PAGES:
+            top = int(self.report_text.index('@0,0').split('.')[0])
+            _, height = self.report_window.pop(0)
+            self.report_text.delete('1.0', f"{height + 1}.0")
+            self.report_text.yview(f"{max(top - height, 1)}.0")
+        return True
+
+    def prepend_report_page(self):
+        """Add the page before the window, dropping the bottom page if full"""
+        if not self.report_window or self.report_window[0][0] == 0:
+            return False
+        number = self.report_window[0][0] - 1
+        text = "\n".join(self.report_pages.page(number)) + "\n"
+        height = text.count("\n")
+        top = int(self.report_text.index('@0,0').split('.')[0])
+        self.report_text.insert('1.0', text)
+        self.report_window.insert(0, (number, height))
+        self.report_text.yview(f"{top + height}.0")
+        
+        if len(self.report_window) > REPORT_WINDOW_PAGES:
+            self.report_window.pop()
+            start = sum(height for _, height in self.report_window) + 1
+            self.report_text.delete(f"{start}.0", tk.END)
+        return True
+
+    def on_report_scroll(self, scrollbar, first, last):
+        """Move the scrollbar and load pages once the view settles"""
+        scrollbar.set(first, last)
+        if self.report_pages and not self.report_fill_pending:
+            self.report_fill_pending = True
+            self.root.after_idle(self.fill_report_view)
+
+    def fill_report_view(self):
+        """Load the next or previous page when the view nears an end"""
+        self.report_fill_pending = False
+        first, last = self.report_text.yview()
+        if last > 0.9 and self.append_report_page():
+            self.update_report_page_status()
+        elif first < 0.1 and self.prepend_report_page():
+            self.update_report_page_status()
+
+    @diagnosed
+    def export_report(self):
+        """Export the current report in the chosen format and location"""
         report_type = self.report_type.get()
+        file_format = self.export_format.get()
         start_date = self.start_date.get_date()
         end_date = self.end_date.get_date()
         
-        if report_type == 'Unit Engagement Summary':
-            self.cursor.execute('''
-                SELECT
-                    u.name as Unit,
-                    COUNT(e.id) as "Total Engagements",
-                    GROUP_CONCAT(DISTINCT p.name) as "Projects",
-                    GROUP_CONCAT(DISTINCT r.name) as "Researchers"
-                FROM units u
-                LEFT JOIN engagements e ON u.id = e.unit_id
-                    AND date(e.date_time) BETWEEN date(?) AND date(?)
-                LEFT JOIN projects p ON e.project_id = p.id
-                LEFT JOIN engagement_participants ep ON e.id = ep.engagement_id
-                LEFT JOIN researchers r ON ep.researcher_id = r.id
-                GROUP BY u.id
-                ORDER BY "Total Engagements" DESC
-            ''', (start_date, end_date))
-            
-            df = pd.DataFrame(
-                self.cursor.fetchall(),
-                columns=['Unit', 'Total Engagements', 'Projects', 'Researchers']
-            )
-            
-            filename = (
-                f"unit_engagement_report_"
-                f"{datetime.now():%Y%m%d_%H%M%S}.xlsx"
-            )
+        extension, label, _ = EXPORTERS[file_format]
+        filename = filedialog.asksaveasfilename(
+            title="Export Report",
+            initialfile=os.path.basename(report_filename(report_type, extension)),
+            defaultextension=f".{extension}",
+            filetypes=[(label, f"*.{extension}"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
         
-        elif report_type == 'Researcher Activity':
-            self.cursor.execute('''
-                SELECT
-                    r.name as "Researcher",
-                    COUNT(e.id) as "Total Engagements",
-                    GROUP_CONCAT(DISTINCT u.name) as "Units",
-                    GROUP_CONCAT(DISTINCT p.name) as "Projects"
-                FROM researchers r
-                LEFT JOIN engagement_participants ep ON r.id = ep.researcher_id
-                LEFT JOIN engagements e ON ep.engagement_id = e.id
-                    AND date(e.date_time) BETWEEN date(?) AND date(?)
-                LEFT JOIN units u ON e.unit_id = u.id
-                LEFT JOIN projects p ON e.project_id = p.id
-                GROUP BY r.id
-                ORDER BY "Total Engagements" DESC
-            ''', (start_date, end_date))
-            
-            df = pd.DataFrame(
-                self.cursor.fetchall(),
-                columns=[
-                    'Researcher',
-                    'Total Engagements',
-                    'Units',
-                    'Projects'
-                ]
-            )
-            
-            filename = (
-                f"researcher_activity_report_"
-                f"{datetime.now():%Y%m%d_%H%M%S}.xlsx"
-            )
+        if not self.attach_report_archives(start_date, end_date):
+            return
         
-        elif report_type == 'Project Status':
-            self.cursor.execute('''
-                SELECT
-                    p.name as "Project",
-                    p.status as "Status",
-                    COUNT(e.id) as "Total Engagements",
-                    GROUP_CONCAT(DISTINCT u.name) as "Units",
-                    GROUP_CONCAT(DISTINCT r.name) as "Researchers"
-                FROM projects p
-                LEFT JOIN engagements e ON p.id = e.project_id
-                    AND date(e.date_time) BETWEEN date(?) AND date(?)
-                LEFT JOIN units u ON e.unit_id = u.id
-                LEFT JOIN engagement_participants ep ON e.id = ep.engagement_id
-                LEFT JOIN researchers r ON ep.researcher_id = r.id
-                GROUP BY p.id
-                ORDER BY "Total Engagements" DESC
-            ''', (start_date, end_date))
-            
-            df = pd.DataFrame(
-                self.cursor.fetchall(),
-                columns=[
-                    'Project',
-                    'Status',
-                    'Total Engagements',
-                    'Units',
-                    'Researchers'
-                ]
-            )
-            
-            filename = (
-                f"project_status_report_"
-                f"{datetime.now():%Y%m%d_%H%M%S}.xlsx"
-            )
+        prepare_report_window(self.conn, start_date, end_date)
+        columns, rows = run_report(
+            self.conn,
+            report_type,
+            start_date,
+            end_date
+        )
         
-        elif report_type == 'Weekly Review Summary':
-            self.cursor.execute('''
-                SELECT
-                    week_start as "Week Starting",
-                    summary as "Summary",
-                    highlights as "Highlights",
-                    challenges as "Challenges",
-                    next_steps as "Next Steps"
-                FROM weekly_reviews
-                WHERE date(week_start) BETWEEN date(?) AND date(?)
-                ORDER BY week_start DESC
-            ''', (start_date, end_date))
-            
-            df = pd.DataFrame(
-                self.cursor.fetchall(),
-                columns=[
-                    'Week Starting',
-                    'Summary',
-                    'Highlights',
-                    'Challenges',
-                    'Next Steps'
-                ]
-            )
-            
-            filename = (
-                f"weekly_review_report_"
-                f"{datetime.now():%Y%m%d_%H%M%S}.xlsx"
+        try:
+            write_report(filename, columns, rows, file_format)
+        except ImportError as e:
+            messagebox.showerror(
+                "Export Error",
+                f"{label} export needs an optional package: {e.name}"
             )
-        
-        # Export to Excel
-        df.to_excel(filename, index=False)
+            return
+        except OSError as e:
+            messagebox.showerror("Export Error", str(e))
+            return
         messagebox.showinfo(
             "Export Complete",
             f"Report exported to {filename}"
         )
 
+    @diagnosed
+    def export_all_reports(self):
+        """Export every report type as sheets of one Excel workbook"""
+        start_date = self.start_date.get_date()
+        end_date = self.end_date.get_date()
+        filename = (
+            f"all_reports_"
+            f"{datetime.now():%Y%m%d_%H%M%S}.xlsx"
+        )
+        
+        def export():
+            reports = compute_reports(
+                self.db_path,
+                list(REPORT_TYPES),
+                start_date,
+                end_date
+            )
+            write_workbook(filename, reports)
+        
+        # The reports run off the UI thread; poll until they are written
+        self.conn.commit()
+        self.export_all_btn.config(state='disabled')
+        export, deliver = self.follow_work(export, trace_sql=False)
+        worker = ThreadPoolExecutor(max_workers=1)
+        future = worker.submit(export)
+        worker.shutdown(wait=False)
+        
+        def exported():
+            self.export_all_btn.config(state='normal')
+            error = future.exception()
+            if error:
+                messagebox.showerror("Export Error", str(error))
+            else:
+                messagebox.showinfo(
+                    "Export Complete",
+                    f"Reports exported to {filename}"
+                )
+        
+        finish_export = deliver(exported)
+        
+        def check_done():
+            if not future.done():
+                self.root.after(100, check_done)
+                return
+            finish_export()
+        
+        check_done()
+
     def add_engagement_dialog(self):
         """Dialog for adding a new engagement"""
         dialog = tk.Toplevel(self.root)
@@ -1553,14 +7265,7 @@ class EngagementTracker:
         ttk.Label(dialog, text="Type:").pack(padx=5, pady=5)
         type_combo = ttk.Combobox(
             dialog,
-            values=[
-                'Initial Meeting',
-                'Follow-up Meeting',
-                'Training Session',
-                'Field Test',
-                'Demonstration',
-                'Other'
-            ]
+            values=lookup_names(self.conn, 'engagement_types')
         )
         type_combo.pack(fill='x', padx=5)
         
@@ -1590,10 +7295,18 @@ class EngagementTracker:
             "SELECT id, name FROM researchers ORDER BY name"
         )
         researchers = self.cursor.fetchall()
+        researcher_vars = []
+        self.add_participant_suggestions(
+            dialog,
+            unit_combo,
+            units,
+            project_combo,
+            projects,
+            researcher_vars
+        )
         researcher_frame = ttk.Frame(dialog)
         researcher_frame.pack(fill='x', padx=5)
         
-        researcher_vars = []
         for researcher in researchers:
             var = tk.BooleanVar()
             researcher_vars.append((researcher[0], var))
@@ -1626,39 +7339,22 @@ class EngagementTracker:
                 None
             )
             
-            # Insert engagement
-            self.cursor.execute('''
-                INSERT INTO engagements (
-                    date_time, type, unit_id, project_id,
-                    summary, action_items
-                )
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                date_entry.get_date().strftime('%Y-%m-%d'),
-                type_combo.get(),
-                unit_id,
-                project_id,
-                summary_text.get("1.0", "end-1c"),
-                action_items_text.get("1.0", "end-1c")
-            ))
-            self.conn.commit()
-            
-            # Get the ID of the inserted engagement
-            engagement_id = self.cursor.lastrowid
-            
-            # Insert participants
-            for researcher_id, var in researcher_vars:
-                if var.get():
-                    self.cursor.execute('''
-                        INSERT INTO engagement_participants (
-                            engagement_id, researcher_id
-                        )
-                        VALUES (?, ?)
-                    ''', (engagement_id, researcher_id))
-            
-            self.conn.commit()
-            self.refresh_engagements()
-            dialog.destroy()
+            # Insert engagement and participants
+            self.save_in_background(
+                dialog,
+                self.refresh_engagements,
+                write_engagement,
+                (
+                    date_entry.get_date().strftime('%Y-%m-%d'),
+                    type_combo.get(),
+                    unit_id,
+                    project_id,
+                    summary_text.get("1.0", "end-1c"),
+                    None,
+                    action_items_text.get("1.0", "end-1c")
+                ),
+                [researcher_id for researcher_id, var in researcher_vars if var.get()]
+            )
         
         ttk.Button(
             dialog,
@@ -1666,6 +7362,59 @@ class EngagementTracker:
             command=save_engagement
         ).pack(pady=20)
 
+    def add_participant_suggestions(self, parent, unit_combo, units,
+                                    project_combo, projects, researcher_vars):
+        """Suggested participants for the chosen unit and project
+
+        Each suggestion shares its check box variable with the full list,
+        which researcher_vars is filled with once the list is built.
+        """
+        suggestion_frame = ttk.Frame(parent)
+        suggestion_frame.pack(fill='x', padx=5)
+        shown = {'request': None}
+        
+        def show(rows, request):
+            if request != shown['request'] or not suggestion_frame.winfo_exists():
+                return
+            for child in suggestion_frame.winfo_children():
+                child.destroy()
+            variables = dict(researcher_vars)
+            rows = [row for row in rows if row[0] in variables]
+            if not rows:
+                return
+            ttk.Label(suggestion_frame, text="Suggested:").pack(anchor='w')
+            for researcher_id, name, together in rows:
+                ttk.Checkbutton(
+                    suggestion_frame,
+                    text=f"{name} ({together} together)",
+                    variable=variables[researcher_id]
+                ).pack(anchor='w', padx=10)
+        
+        def suggest(event=None):
+            unit_id = next(
+                (unit[0] for unit in units if unit[1] == unit_combo.get()),
+                None
+            )
+            project_id = next(
+                (proj[0] for proj in projects if proj[1] == project_combo.get()),
+                None
+            )
+            request = (unit_id, project_id)
+            if request == shown['request']:
+                return
+            shown['request'] = request
+            self.run_query(
+                suggest_participants,
+                unit_id,
+                project_id,
+                on_done=lambda rows: show(rows, request)
+            )
+        
+        for combo in (unit_combo, project_combo):
+            combo.bind('<<ComboboxSelected>>', suggest, add='+')
+            combo.bind('<FocusOut>', suggest, add='+')
+        suggest()
+
     def edit_engagement(self):
         """Edit an existing engagement"""
         selected = self.engagements_tree.selection()
@@ -1681,9 +7430,18 @@ class EngagementTracker:
         # Fetch engagement details
         self.cursor.execute('''
             SELECT
-                e.*,
+                e.id,
+                e.date_time,
+                t.name,
+                e.unit_id,
+                e.project_id,
+                e.summary,
+                s.name,
+                e.action_items,
                 GROUP_CONCAT(ep.researcher_id) as participant_ids
             FROM engagements e
+            LEFT JOIN engagement_types t ON e.type_id = t.id
+            LEFT JOIN engagement_statuses s ON e.status_id = s.id
             LEFT JOIN engagement_participants ep
                 ON e.id = ep.engagement_id
             WHERE e.id = ?
@@ -1732,19 +7490,11 @@ class EngagementTracker:
         type_frame.pack(fill='x', padx=5, pady=5)
         
         ttk.Label(type_frame, text="Type:").pack(side='left', padx=5)
-        type_values = [
-            'Initial Meeting',
-            'Follow-up',
-            'Project Review',
-            'Demo/Presentation',
-            'Training',
-            'Other'
-        ]
         type_combo = ttk.Combobox(
             type_frame,
-            values=type_values
+            values=lookup_names(self.conn, 'engagement_types')
         )
-        type_combo.set(engagement[2])
+        type_combo.set(engagement[2] or "")
         type_combo.pack(side='left', padx=5)
         
         # Unit selection
@@ -1799,6 +7549,14 @@ class EngagementTracker:
                 int(pid) for pid in engagement[-1].split(',')
             ]
         
+        self.add_participant_suggestions(
+            participants_frame,
+            unit_combo,
+            units,
+            project_combo,
+            projects,
+            researcher_vars
+        )
         for researcher in researchers:
             var = tk.BooleanVar()
             var.set(researcher[0] in participant_ids)
@@ -1832,7 +7590,7 @@ class EngagementTracker:
         ttk.Label(status_frame, text="Status:").pack(side='left', padx=5)
         status_combo = ttk.Combobox(
             status_frame,
-            values=['Open', 'In Progress', 'Completed', 'Cancelled']
+            values=lookup_names(self.conn, 'engagement_statuses')
         )
         status_combo.set(engagement[6] or 'Open')  # status
         status_combo.pack(side='left', padx=5)
@@ -1851,47 +7609,23 @@ class EngagementTracker:
                 None
             )
             
-            # Update engagement
-            self.cursor.execute('''
-                UPDATE engagements SET
-                    date_time = ?,
-                    type = ?,
-                    unit_id = ?,
-                    project_id = ?,
-                    summary = ?,
-                    status = ?,
-                    action_items = ?
-                WHERE id = ?
-            ''', (
-                date_entry.get_date().strftime('%Y-%m-%d'),
-                type_combo.get(),
-                unit_id,
-                project_id,
-                summary_text.get("1.0", "end-1c"),
-                status_combo.get(),
-                action_text.get("1.0", "end-1c"),
+            # Update engagement and participants
+            self.save_in_background(
+                dialog,
+                self.refresh_engagements,
+                write_engagement,
+                (
+                    date_entry.get_date().strftime('%Y-%m-%d'),
+                    type_combo.get(),
+                    unit_id,
+                    project_id,
+                    summary_text.get("1.0", "end-1c"),
+                    status_combo.get(),
+                    action_text.get("1.0", "end-1c")
+                ),
+                [researcher_id for researcher_id, var in researcher_vars if var.get()],
                 engagement_id
-            ))
-            
-            # Update participants
-            self.cursor.execute(
-                "DELETE FROM engagement_participants WHERE engagement_id = ?",
-                (engagement_id,)
             )
-            
-            for researcher_id, var in researcher_vars:
-                if var.get():
-                    self.cursor.execute('''
-                        INSERT INTO engagement_participants (
-                            engagement_id,
-                            researcher_id
-                        )
-                        VALUES (?, ?)
-                    ''', (engagement_id, researcher_id))
-            
-            self.conn.commit()
-            self.refresh_engagements()
-            dialog.destroy()
         
         # Update button
         ttk.Button(
@@ -1900,62 +7634,656 @@ class EngagementTracker:
             command=update_engagement
         ).pack(pady=20)
 
-    def refresh_engagements(self):
+    @diagnosed
+    def refresh_engagements(self, on_done=None):
         """Refresh the engagements treeview"""
-        # Clear existing items
-        for item in self.engagements_tree.get_children():
-            self.engagements_tree.delete(item)
+        # Calendar windows are refetched on the next view
+        self.calendar_cache.clear()
+        if self.calendar_visible():
+            self.show_calendar(self.calendar_anchor())
         
-        # First get all engagements with basic info
-        self.cursor.execute('''
+        # Action items are parsed from engagements on every save
+        self.refresh_action_items()
+        
+        # Participants come from a correlated subquery, one query in all
+        self.load_tree(self.engagements_tree, f'''
             SELECT DISTINCT
                 e.id,
                 e.date_time,
-                e.type,
+                t.name AS type_name,
                 u.name AS unit_name,
                 p.name AS project_name,
-                e.summary,
-                e.status
+                {preview_sql('e.summary')},
+                s.name AS status_name,
+                COALESCE((
+                    SELECT GROUP_CONCAT(r.name)
+                    FROM engagement_participants ep
+                    JOIN researchers r ON ep.researcher_id = r.id
+                    WHERE ep.engagement_id = e.id
+                ), '') AS participants
             FROM engagements e
+            LEFT JOIN engagement_types t ON e.type_id = t.id
+            LEFT JOIN engagement_statuses s ON e.status_id = s.id
             LEFT JOIN units u ON e.unit_id = u.id
             LEFT JOIN projects p ON e.project_id = p.id
             ORDER BY e.date_time DESC
-        ''')
+        ''', 'engagements', on_done)
+
+    def add_detail_pane(self, frame):
+        """Split a tab into a list area and a read-only detail pane
+
+        Returns (frame for the list, Text widget for the details).
+        """
+        paned = ttk.PanedWindow(frame, orient='horizontal')
+        paned.pack(fill='both', expand=True)
+        
+        list_frame = ttk.Frame(paned)
+        detail_frame = ttk.Frame(paned)
+        paned.add(list_frame, weight=3)
+        paned.add(detail_frame, weight=1)
+        
+        details = tk.Text(detail_frame, wrap='word', width=40, state='disabled')
+        details.tag_configure('label', font=('TkDefaultFont', 9, 'bold'))
+        details.pack(fill='both', expand=True, padx=5, pady=5)
+        return list_frame, details
+
+    def bind_detail_pane(self, tree, details, table):
+        """Show the selected row's full record in its detail pane"""
+        tree.bind(
+            '<<TreeviewSelect>>',
+            lambda event: self.show_details(tree, details, table)
+        )
+
+    def forget_details(self, table):
+        """Drop cached records of a table after its list is reloaded"""
+        for key in [key for key in self.detail_cache if key[0] == table]:
+            del self.detail_cache[key]
+
+    def cache_details(self, table, record_ids):
+        """Load the records not cached yet, evicting the least recently used"""
+        missing = [
+            record_id for record_id in record_ids
+            if (table, record_id) not in self.detail_cache
+        ]
+        if missing:
+            for record_id, fields in load_details(self.conn, table, missing).items():
+                self.detail_cache[(table, record_id)] = fields
+        for record_id in record_ids:
+            if (table, record_id) in self.detail_cache:
+                self.detail_cache.move_to_end((table, record_id))
+        while len(self.detail_cache) > DETAIL_CACHE_SIZE:
+            self.detail_cache.popitem(last=False)
+
+    def show_details(self, tree, details, table):
+        """Fill the detail pane and prefetch the rows around the selection"""
+        details.configure(state='normal')
+        details.delete('1.0', 'end')
+        selected = tree.selection()
+        if not selected:
+            details.configure(state='disabled')
+            return
+        
+        record_id = tree.item(selected[0])['values'][0]
+        self.cache_details(table, [record_id])
+        for label, value in self.detail_cache.get((table, record_id), []):
+            details.insert('end', f"{label}\n", 'label')
+            details.insert('end', f"{value if value is not None else ''}\n\n")
+        details.configure(state='disabled')
+        
+        # Neighbours load once the pane is drawn, so arrow keys find them cached
+        neighbours = []
+        before = after = selected[0]
+        for _ in range(DETAIL_PREFETCH):
+            before = tree.prev(before) if before else ''
+            after = tree.next(after) if after else ''
+            neighbours.extend(item for item in (before, after) if item)
+        if neighbours:
+            ids = [tree.item(item)['values'][0] for item in neighbours]
+            self.root.after_idle(lambda: self.cache_details(table, ids))
+
+    def on_close(self, maintain=True):
+        """Stop background work and close the application"""
+        # Save whatever a diagnostics capture has finished so far
+        if self.diagnostics:
+            self.diagnostics.complete()
+        self.stall_watchdog.stop()
+        self.backup_scheduler.stop()
+        self.data.stop()
+        self.data.join()
+        if self.maintenance_thread and self.maintenance_thread.is_alive():
+            self.maintenance_thread.join()
+        if maintain:
+            try:
+                run_maintenance(self.conn, self.db_path, step_seconds=1.0)
+            except sqlite3.Error:
+                pass
+        for conn in self.workspaces.values():
+            conn.close()
+        self.root.destroy()
+
+    def update_workspace_choices(self):
+        """List the named and recent workspaces, showing the current one"""
+        self.workspace_paths = workspace_choices(self.config)
+        self.workspace_choice.configure(values=list(self.workspace_paths))
+        for label, path in self.workspace_paths.items():
+            if path == self.db_path:
+                self.workspace_choice.set(label)
+                break
+        self.root.title(f"EngageCRM - {os.path.basename(self.db_path)}")
+
+    def open_workspace_dialog(self):
+        """Pick a database file to work in, creating it if it is new"""
+        path = filedialog.asksaveasfilename(
+            title="Open or Create Database",
+            initialdir=os.path.dirname(self.db_path),
+            defaultextension=".db",
+            filetypes=[("SQLite database", "*.db"), ("All files", "*.*")],
+            confirmoverwrite=False
+        )
+        if path:
+            self.switch_workspace(path)
+
+    def switch_workspace(self, db_path):
+        """Point every tab at another database, reusing a warm connection"""
+        db_path = os.path.abspath(db_path)
+        if db_path == self.db_path:
+            return
+        if self.maintenance_thread and self.maintenance_thread.is_alive():
+            self.maintenance_thread.join()
         
-        engagements = self.cursor.fetchall()
+        self.conn.commit()
+        conn = self.workspaces.pop(db_path, None)
+        if conn is None:
+            previous = (self.db_path, self.conn, self.cursor)
+            try:
+                self.init_database(db_path)
+            except (ValueError, sqlite3.Error) as e:
+                if self.conn is not previous[1]:
+                    self.conn.close()
+                self.db_path, self.conn, self.cursor = previous
+                messagebox.showerror("Workspace Error", str(e))
+                self.update_workspace_choices()
+                return
+        else:
+            self.workspaces[db_path] = conn
+            self.db_path = db_path
+            self.conn = conn
+            self.cursor = conn.cursor()
+            remember_workspace(self.config, db_path)
+        
+        # Background work follows the open database
+        self.backup_scheduler.db_path = db_path
+        self.data.switch(db_path)
+        self.detail_cache.clear()
+        self.show_report_preview([])
+        self.update_workspace_choices()
         
-        # Then for each engagement, get its participants
-        for engagement in engagements:
-            # Convert to list to allow modification
-            values = list(engagement)
-            
-            # Get participants for this engagement
-            self.cursor.execute('''
-                SELECT GROUP_CONCAT(r.name)
-                FROM engagement_participants ep
-                JOIN researchers r ON ep.researcher_id = r.id
-                WHERE ep.engagement_id = ?
-                GROUP BY ep.engagement_id
-            ''', (values[0],))  # values[0] is engagement ID
+        self.refresh_units()
+        self.refresh_researchers()
+        self.refresh_projects()
+        self.refresh_engagements()
+        self.refresh_reviews()
+
+    def search_dialog(self):
+        """Dialog for full-text search across all records"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Search All Records")
+        dialog.geometry("700x600")
+        
+        query_entry = ttk.Entry(dialog)
+        query_entry.pack(fill='x', padx=5, pady=5)
+        query_entry.focus_set()
+        
+        status_label = ttk.Label(dialog, text="Type to search")
+        status_label.pack(anchor='w', padx=5)
+        
+        results_text = tk.Text(dialog, wrap='word', cursor='arrow')
+        results_text.pack(fill='both', expand=True, padx=5, pady=5)
+        results_text.tag_configure('title', font=('TkDefaultFont', 10, 'bold'))
+        results_text.tag_configure('label', foreground='gray')
+        results_text.tag_configure('match', background='yellow')
+        
+        pending = []
+        
+        def show_results():
+            pending.clear()
+            results_text.config(state='normal')
+            results_text.delete("1.0", tk.END)
             
-            # Get participant names
-            participants = self.cursor.fetchone()
-            participant_names = participants[0] if participants else ""
-            values.append(participant_names)
+            text = query_entry.get()
+            started = datetime.now()
+            try:
+                results = search_records(self.conn, text, db_path=self.db_path)
+            except sqlite3.Error as e:
+                status_label.config(text=f"Search failed: {e}")
+                return
+            elapsed = (datetime.now() - started).total_seconds() * 1000
+            status_label.config(
+                text=f"{len(results)} results in {elapsed:.0f} ms"
+                if text.strip() else "Type to search"
+            )
             
-            # Insert into treeview
-            self.engagements_tree.insert('', 'end', values=values)
+            for i, (table, row_id, label, title, snippet) in enumerate(results):
+                tag = f"result{i}"
+                results_text.insert(tk.END, f"{label}  ", ('label', tag))
+                results_text.insert(tk.END, f"{title}\n", ('title', tag))
+                
+                # Highlight the matched terms marked in the snippet
+                for j, part in enumerate(
+                    re.split(f"[{MATCH_START}{MATCH_END}]", snippet or "")
+                ):
+                    tags = (tag, 'match') if j % 2 else (tag,)
+                    results_text.insert(tk.END, part.replace('\n', ' '), tags)
+                results_text.insert(tk.END, "\n\n")
+                
+                results_text.tag_bind(
+                    tag,
+                    '<Double-Button-1>',
+                    lambda event, t=table, r=row_id: (
+                        dialog.destroy(),
+                        self.jump_to_record(t, r)
+                    )
+                )
+            results_text.config(state='disabled')
+        
+        def schedule_search(event=None):
+            # Wait for a pause in typing before querying
+            for after_id in pending:
+                dialog.after_cancel(after_id)
+            pending.clear()
+            pending.append(dialog.after(200, show_results))
+        
+        query_entry.bind('<KeyRelease>', schedule_search)
+        ttk.Label(
+            dialog,
+            text="Double-click a result to open it"
+        ).pack(anchor='w', padx=5, pady=5)
+
+    def jump_to_record(self, table, record_id):
+        """Switch to the tab showing a record and select it"""
+        targets = {
+            'units': (self.units_frame, self.units_tree, self.refresh_units),
+            'researchers': (
+                self.researchers_frame,
+                self.researchers_tree,
+                self.refresh_researchers
+            ),
+            'projects': (
+                self.projects_frame,
+                self.projects_tree,
+                self.refresh_projects
+            ),
+            'engagements': (
+                self.engagements_frame,
+                self.engagements_tree,
+                self.refresh_engagements
+            ),
+            'weekly_reviews': (
+                self.reviews_frame,
+                self.reviews_tree,
+                self.refresh_reviews
+            ),
+        }
+        if table not in targets:
+            # Archived engagements are only listed in reports
+            messagebox.showinfo(
+                "Archived Engagement",
+                "This engagement has been archived. Run a report covering "
+                "its date to see it."
+            )
+            return
+        frame, tree, refresh = targets[table]
+        self.notebook.select(frame)
+        
+        def find_item():
+            for item in tree.get_children():
+                if tree.item(item)['values'][0] == record_id:
+                    return item
+            return None
+        
+        def select_item(item):
+            if item is not None:
+                tree.selection_set(item)
+                tree.focus(item)
+                tree.see(item)
+        
+        item = find_item()
+        if item is None:
+            # Not listed yet; look again once the list has reloaded
+            refresh(on_done=lambda: select_item(find_item()))
+        else:
+            select_item(item)
 
     def run(self):
         """Start the application"""
         # Load initial data
-        self.refresh_units()
-        self.refresh_researchers()
-        self.refresh_engagements()
-        self.refresh_reviews()
+        refreshes = (
+            self.refresh_units,
+            self.refresh_researchers,
+            self.refresh_engagements,
+            self.refresh_reviews,
+        )
+        if self.profile:
+            self.profile_refreshes(refreshes)
+        else:
+            for refresh in refreshes:
+                refresh()
         self.root.mainloop()
 
+    def profile_refreshes(self, refreshes):
+        """Time the initial refreshes, then write the profile and close
 
-if __name__ == "__main__":
-    app = EngagementTracker()
+        Each refresh is timed until its list is filled; the window closes,
+        skipping the exit maintenance, once it has drawn the loaded lists.
+        """
+        started = time.perf_counter()
+        pending = {refresh.__name__ for refresh in refreshes}
+        
+        def finish():
+            drawn = time.perf_counter()
+            self.root.update_idletasks()
+            self.profile.record('first_draw', drawn)
+            self.profile.finish(self.db_path)
+            self.on_close(maintain=False)
+        
+        def done(name):
+            self.profile.record(name, started)
+            pending.discard(name)
+            if not pending:
+                self.root.after_idle(finish)
+        
+        for refresh in refreshes:
+            refresh(on_done=lambda name=refresh.__name__: done(name))
+
+
+def run_reports(args):
+    """Generate reports from the command line without starting the GUI"""
+    try:
+        db_path = configured_database(load_config(args.config), args.db)
+    except configparser.Error as e:
+        print(f"Report failed: invalid settings file: {e}", file=sys.stderr)
+        return 1
+    if not os.path.exists(db_path):
+        print(f"Database not found: {db_path}", file=sys.stderr)
+        return 1
+    
+    report_types = args.type or list(REPORT_TYPES)
+    if 'all' in report_types:
+        report_types = list(REPORT_TYPES)
+    
+    start_date = args.start_date
+    end_date = args.end_date
+    try:
+        os.makedirs(args.output_dir, exist_ok=True)
+    except OSError as e:
+        print(f"Report failed: {e}", file=sys.stderr)
+        return 1
+    
+    if args.workbook:
+        filename = os.path.join(
+            args.output_dir,
+            f"all_reports_{datetime.now():%Y%m%d_%H%M%S}.xlsx"
+        )
+        try:
+            reports = compute_reports(
+                db_path,
+                report_types,
+                start_date,
+                end_date
+            )
+            write_workbook(filename, reports)
+        except (ValueError, ImportError, OSError, sqlite3.Error) as e:
+            print(f"Report failed: {e}", file=sys.stderr)
+            return 1
+        print(filename)
+        return 0
+    
+    try:
+        # One window of engagements shared by every requested report
+        conn = open_report_connection(db_path, start_date, end_date)
+    except (ValueError, sqlite3.Error) as e:
+        print(f"Report failed: {e}", file=sys.stderr)
+        return 1
+    
+    try:
+        for report_type in report_types:
+            columns, rows = run_report(conn, report_type, start_date, end_date)
+            filename = report_filename(
+                report_type,
+                args.format,
+                args.output_dir
+            )
+            write_report(filename, columns, rows, args.format)
+            print(filename)
+    except (ValueError, ImportError, OSError, sqlite3.Error) as e:
+        print(f"Report failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+
+def run_server(args):
+    """Serve the database as a read-only JSON API on localhost"""
+    db_path = configured_database(load_config(args.config), args.db)
+    if not os.path.exists(db_path):
+        print(f"Database not found: {db_path}", file=sys.stderr)
+        return 1
+    
+    server = ApiServer(db_path, args.port, args.pool_size)
+    host, port = server.server_address
+    print(f"Serving {db_path} on http://{host}:{port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def run_benchmark(args):
+    """Print the cost of cascading deletes, the export formats or the network report"""
+    if args.target == 'exporters':
+        print(f"{'format':<10} {'seconds':>10} {'rows/s':>12} {'MB':>10}")
+        with tempfile.TemporaryDirectory() as folder:
+            for file_format, seconds, rate, size in benchmark_exporters(
+                args.rows, folder
+            ):
+                print(
+                    f"{file_format:<10} {seconds:>10.3f} {rate:>12,.0f} "
+                    f"{size / 1e6:>10.2f}"
+                )
+        return 0
+    
+    if args.target == 'network':
+        print(f"{'engagements':>12} {'participants':>13} {'prepare s':>10} {'report s':>10}")
+        for size, participations, prepare, report in benchmark_network(
+            args.sizes, args.researchers
+        ):
+            print(f"{size:>12} {participations:>13} {prepare:>10.2f} {report:>10.2f}")
+        return 0
+    
+    print(f"{'engagements':>12} {'delete from':<12} {'child index':<12} {'ms/delete':>10}")
+    for size, parent, indexed, ms in benchmark_deletes(args.sizes, args.deletes):
+        print(f"{size:>12} {parent:<12} {'yes' if indexed else 'no':<12} {ms:>10.3f}")
+    return 0
+
+
+def parse_date(value):
+    """argparse type for YYYY-MM-DD dates"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+
+
+def main(argv=None):
+    """Run the GUI, or a headless command when one is given"""
+    parser = argparse.ArgumentParser(
+        prog='engagecrm',
+        description="Track engagements, organizations, personnel and projects."
+    )
+    parser.add_argument(
+        '--db',
+        help="database file to open (default: from the settings file)"
+    )
+    parser.add_argument(
+        '--config',
+        help=f"settings file (default: {CONFIG_FILENAME} next to engagecrm.py)"
+    )
+    parser.add_argument(
+        '--profile-startup',
+        metavar='JSON',
+        help="time each startup phase into a JSON file, then close the window"
+    )
+    parser.add_argument(
+        '--cprofile',
+        metavar='FILE',
+        help="with --profile-startup, also save cProfile stats of the startup"
+    )
+    parser.add_argument(
+        '--startup-budget',
+        type=float,
+        metavar='SECONDS',
+        help="with --profile-startup, exit with status 1 if startup takes longer"
+    )
+    subparsers = parser.add_subparsers(dest='command')
+    
+    report_parser = subparsers.add_parser(
+        'report',
+        help="generate reports without opening the window"
+    )
+    report_parser.add_argument(
+        '--type',
+        action='append',
+        choices=list(REPORT_TYPES) + ['all'],
+        help="report to generate; repeat for several (default: all)"
+    )
+    report_parser.add_argument(
+        '--from',
+        dest='start_date',
+        type=parse_date,
+        required=True,
+        help="first day of the period (YYYY-MM-DD)"
+    )
+    report_parser.add_argument(
+        '--to',
+        dest='end_date',
+        type=parse_date,
+        required=True,
+        help="last day of the period (YYYY-MM-DD)"
+    )
+    report_parser.add_argument(
+        '--format',
+        choices=list(EXPORTERS),
+        default='xlsx',
+        help="file format of each report (--workbook is always xlsx)"
+    )
+    report_parser.add_argument(
+        '--workbook',
+        action='store_true',
+        help="compute the reports in parallel into one xlsx workbook"
+    )
+    report_parser.add_argument(
+        '--output-dir',
+        default='.',
+        help="folder for the report files"
+    )
+    report_parser.add_argument(
+        '--db',
+        default=argparse.SUPPRESS,
+        help="database file (default: from the settings file)"
+    )
+    
+    serve_parser = subparsers.add_parser(
+        'serve',
+        help="serve the database as a read-only JSON API on 127.0.0.1"
+    )
+    serve_parser.add_argument(
+        '--port',
+        type=int,
+        default=8765
+    )
+    serve_parser.add_argument(
+        '--pool-size',
+        type=int,
+        default=API_POOL_SIZE,
+        help="read-only connections shared by the request threads"
+    )
+    
+    bench_parser = subparsers.add_parser(
+        'bench',
+        help="time cascading deletes, the report export formats or the network report"
+    )
+    bench_parser.add_argument(
+        'target',
+        nargs='?',
+        choices=['deletes', 'exporters', 'network'],
+        default='deletes'
+    )
+    bench_parser.add_argument(
+        '--sizes',
+        nargs='+',
+        type=int,
+        default=[10000, 100000, 1000000],
+        help="engagement counts to build in memory"
+    )
+    bench_parser.add_argument(
+        '--deletes',
+        type=int,
+        default=50,
+        help="parent rows deleted per measurement"
+    )
+    bench_parser.add_argument(
+        '--rows',
+        type=int,
+        default=200000,
+        help="report rows written per export format"
+    )
+    bench_parser.add_argument(
+        '--researchers',
+        type=int,
+        default=10000,
+        help="researchers in the synthetic network"
+    )
+    
+    args = parser.parse_args(argv)
+    if args.command == 'report':
+        return run_reports(args)
+    if args.command == 'serve':
+        return run_server(args)
+    if args.command == 'bench':
+        return run_benchmark(args)
+    
+    profile = None
+    if args.profile_startup:
+        profile = StartupProfile(
+            args.profile_startup,
+            args.startup_budget,
+            args.cprofile
+        )
+    try:
+        config = load_config(args.config)
+    except configparser.Error as e:
+        print(f"Invalid settings file: {e}", file=sys.stderr)
+        return 1
+    if profile:
+        profile.lap('config')
+    app = EngagementTracker(args.db, config, profile)
     app.run()
+    
+    if profile and profile.result:
+        result = profile.result
+        print(f"Startup took {result['total_seconds']:.3f} s; see {args.profile_startup}")
+        if result['over_budget']:
+            print(
+                f"Over the startup budget of {args.startup_budget} s",
+                file=sys.stderr
+            )
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())